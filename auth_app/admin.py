@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import RevokedToken
 
-# Register your models here.
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ['jti', 'token_type', 'user_id', 'expires_at', 'revoked_at']
+    list_filter = ['token_type', 'revoked_at']
+    search_fields = ['jti', 'user_id']
+    readonly_fields = ['revoked_at']
+    ordering = ['-revoked_at']
@@ -0,0 +1,167 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from monitoring.metrics import record_cache
+from .revocation import revocation_list
+
+
+def _user_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def _version_key(user_id):
+    return f'auth:user-version:{user_id}'
+
+
+def _user_key(user_id, version):
+    # Field dicts; the old prefix held pickled User instances
+    return f'auth:user-fields:{user_id}:{version}'
+
+
+# All request.user carries; views needing the full profile load it themselves.
+# No password hash or personal data goes into the shared cache.
+CACHED_USER_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _load_user_fields(user_id):
+    user_model = get_user_model()
+    fields = list(dict.fromkeys((*CACHED_USER_FIELDS, api_settings.USER_ID_FIELD)))
+    if api_settings.CHECK_REVOKE_TOKEN:
+        fields.append('password')
+    row = user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(*fields).first()
+    if row is not None and api_settings.CHECK_REVOKE_TOKEN:
+        # Only the digest the token claim is compared with
+        row['password_md5'] = get_md5_hash_password(row.pop('password'))
+    return row
+
+
+def _refuse_write(*args, **kwargs):
+    # Like AnonymousUser: the object doesn't represent the whole row
+    raise NotImplementedError(
+        "request.user only carries the cached authentication fields; load the user to change it."
+    )
+
+
+def _build_user(row):
+    """
+    User carrying just the cached fields. Its primary key is set, so save()
+    would UPDATE the row and blank every other column; save() and delete()
+    raise instead.
+    """
+    row = dict(row)
+    password_md5 = row.pop('password_md5', None)
+    user = get_user_model()(**row)
+    user.password_md5 = password_md5
+    user.save = user.delete = _refuse_write
+    return user
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with the given id, built from the shared cache when possible.
+
+    Entries are keyed by user id plus a random version stamp. Invalidation
+    replaces the stamp, so a lookup racing with an invalidation can only write
+    an entry nobody will read again. The stamp is rotated by the post_save and
+    post_delete signals; QuerySet.update() and raw SQL send neither, so code
+    changing users that way (e.g. bulk deactivation) must call
+    invalidate_cached_user() for each of them, or the old entry is served for
+    up to AUTH_USER_CACHE_TIMEOUT seconds.
+    """
+    cache = _user_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        record_cache('auth_user', False)
+        cache.add(_version_key(user_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(user_id))
+    else:
+        row = cache.get(_user_key(user_id, version))
+        record_cache('auth_user', row is not None)
+        if row is not None:
+            return _build_user(row)
+
+    row = _load_user_fields(user_id)
+    if row is None:
+        return None
+    if version is not None:
+        cache.set(_user_key(user_id, version), row, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+    return _build_user(row)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop every cached copy of a user by rotating its version stamp
+    """
+    _user_cache().set(_version_key(user_id), uuid.uuid4().hex, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves request.user from a short-TTL shared cache
+    instead of querying the users table on every request
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user.password_md5:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Claims-only authentication for read-only admin endpoints.
+
+    When AUTH_STATELESS_ADMIN_READS is enabled, safe requests are authenticated
+    from the token claims alone (a TokenUser, no cache or database access), so a
+    deactivated account keeps read access until its token expires. Otherwise this
+    behaves exactly like CachedJWTAuthentication.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS or not getattr(settings, 'AUTH_STATELESS_ADMIN_READS', False):
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        return api_settings.TOKEN_USER_CLASS(validated_token), validated_token
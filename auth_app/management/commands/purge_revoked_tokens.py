@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from auth_app.revocation import purge_expired
+
+
+class Command(BaseCommand):
+    """
+    Delete revoked token rows past their expiry. Logout purges them too; run
+    this from cron for deployments where nobody logs out for long stretches.
+    """
+    help = 'Delete expired rows from the token revocation list'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Deleted {purge_expired()} expired revocations.')
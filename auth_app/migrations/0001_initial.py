@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('token_type', models.CharField(max_length=20)),
+                ('user_id', models.CharField(blank=True, max_length=255)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('revoked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Revoked Token',
+                'verbose_name_plural': 'Revoked Tokens',
+                'db_table': 'revoked_tokens',
+                'ordering': ['-revoked_at'],
+            },
+        ),
+    ]
@@ -1,3 +1,21 @@
 from django.db import models
 
-# Create your models here.
+
+class RevokedToken(models.Model):
+    """
+    JWT revoked before its natural expiry (e.g. on logout)
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=20)
+    user_id = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+        ordering = ['-revoked_at']
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
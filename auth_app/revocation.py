@@ -0,0 +1,152 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import IntegrityError
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (no false negatives)
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """
+    jti-based token revocation checked on every authenticated request.
+
+    The revoked_tokens table is the shared store. Each process keeps a Bloom
+    filter of unexpired revoked jtis, pulls new rows from the table every
+    AUTH_REVOCATION_SYNC_INTERVAL seconds, and periodically rebuilds the filter
+    from the unexpired rows. A token whose jti is not in
+    the filter (the common case) is accepted without any I/O; a filter hit is
+    confirmed against the table to rule out false positives.
+
+    The request path only reads the table: expired rows are purged on logout
+    (revoke()) and by `manage.py purge_revoked_tokens`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(1024)
+        self._confirmed = {}
+        self._last_id = 0
+        self._synced_at = None
+        self._rebuilt_at = None
+
+    @property
+    def sync_interval(self):
+        return getattr(settings, 'AUTH_REVOCATION_SYNC_INTERVAL', 5)
+
+    @property
+    def rebuild_interval(self):
+        return getattr(settings, 'AUTH_REVOCATION_REBUILD_INTERVAL', 600)
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self._maybe_sync()
+        if jti not in self._filter:
+            return False
+        if jti in self._confirmed:
+            return True
+        if RevokedToken.objects.filter(jti=jti).exists():
+            self._confirmed[jti] = True
+            return True
+        return False
+
+    def revoke(self, token):
+        """
+        Revoke a validated simplejwt token until its expiry
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        try:
+            RevokedToken.objects.create(
+                jti=jti,
+                token_type=token.get(api_settings.TOKEN_TYPE_CLAIM, ''),
+                user_id=str(token.get(api_settings.USER_ID_CLAIM, '')),
+                expires_at=datetime.fromtimestamp(token['exp'], tz=timezone.utc),
+            )
+        except IntegrityError:
+            pass  # Already revoked
+        purge_expired()
+        with self._lock:
+            self._filter.add(jti)
+            self._confirmed[jti] = True
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already syncing
+        try:
+            if self._rebuilt_at is None or now - self._rebuilt_at >= self.rebuild_interval:
+                self._rebuild()
+                self._rebuilt_at = now
+            else:
+                self._pull()
+            self._synced_at = now
+        finally:
+            self._lock.release()
+
+    def _pull(self):
+        rows = RevokedToken.objects.filter(id__gt=self._last_id).values_list('id', 'jti').order_by('id')
+        for row_id, jti in rows:
+            self._filter.add(jti)
+            self._last_id = row_id
+        if self._filter.count > self._filter.capacity:
+            # Past capacity the false-positive rate climbs; resize on next sync
+            self._rebuilt_at = None
+
+    def _rebuild(self):
+        unexpired = RevokedToken.objects.filter(expires_at__gt=datetime.now(timezone.utc))
+        rows = list(unexpired.values_list('id', 'jti').order_by('id'))
+        bloom = BloomFilter(max(len(rows) * 2, 1024))
+        for _, jti in rows:
+            bloom.add(jti)
+        self._filter = bloom
+        self._confirmed = {}
+        self._last_id = rows[-1][0] if rows else 0
+
+
+def purge_expired():
+    """
+    Delete revocations whose token has expired anyway; returns the count
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=datetime.now(timezone.utc)).delete()
+    return deleted
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Any save (profile edits, password changes, deactivation) or delete of a
+    user drops its cached copy used by CachedJWTAuthentication
+    """
+    invalidate_cached_user(instance.pk)
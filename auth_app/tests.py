@@ -1,3 +1,183 @@
-from django.test import TestCase
+import io
+import pickle
+import threading
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from monitoring.testing import EndpointTestCase, seed_rows
+from .authentication import CACHED_USER_FIELDS, get_cached_user, invalidate_cached_user
+from .models import RevokedToken
+from .revocation import revocation_list
+from .throttling import LoginThrottle
+
+
+def seed_users(count):
+    seed_rows(User, count, lambda i: User(username=f'user{i}', email=f'user{i}@example.com'))
+
+
+class AuthEndpointTests(EndpointTestCase):
+    covers = ('login', 'logout', 'verify_token')
+
+    def login(self, password='admin-password'):
+        return self.client.post(
+            reverse('login'), {'username': 'admin', 'password': password}, content_type='application/json'
+        )
+
+    def test_login(self):
+        self.assertQueryCountConstant(self.login, seed_users)
+        response = self.login()
+        self.assertTrue(response.json()['token'])
+        self.assertLatencyWithinBaseline('login', self.login, runs=5)
+
+    def test_login_invalid_credentials(self):
+        response = self.login('wrong-password')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(LOGIN_THROTTLE_USERNAME_ATTEMPTS=2)
+    def test_login_lockout(self):
+        for _ in range(3):
+            self.login('wrong-password')
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(LOGIN_THROTTLE_IP_ATTEMPTS=2)
+    def test_login_lockout_ignores_forwarded_for(self):
+        # No trusted proxy by default: rotating X-Forwarded-For changes nothing
+        for index in range(4):
+            response = self.client.post(
+                reverse('login'), {'username': f'user{index}', 'password': 'wrong'},
+                content_type='application/json', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}'
+            )
+        self.assertEqual(response.status_code, 429)
+
+    def test_verify_token(self):
+        headers = self.auth()
+        self.assertQueryCountConstant(lambda: self.client.get(reverse('verify_token'), **headers), seed_users)
+        self.assertLatencyWithinBaseline('verify_token', lambda: self.client.get(reverse('verify_token'), **headers))
+
+    def test_logout(self):
+        self.assertQueryCountConstant(
+            lambda: self.client.post(reverse('logout'), **self.auth()), seed_users
+        )
+
+    def test_logout_revokes_token(self):
+        headers = self.auth()
+        self.assertEqual(self.client.post(reverse('logout'), **headers).status_code, 200)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+        self.assertEqual(self.client.get(reverse('verify_token'), **headers).status_code, 401)
+
+
+class RevocationPurgeTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.expired = RevokedToken.objects.create(
+            jti='expired-jti', token_type='access', expires_at=timezone.now() - timedelta(hours=1)
+        )
+
+    def test_authentication_does_not_write(self):
+        # Force a full rebuild of the filter on the next authenticated request
+        revocation_list._rebuilt_at = revocation_list._synced_at = None
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('verify_token'), **self.auth()).status_code, 200)
+        self.assertFalse([query for query in queries if query['sql'].lstrip().upper().startswith('DELETE')])
+        self.assertTrue(RevokedToken.objects.filter(pk=self.expired.pk).exists())
+
+    def test_logout_purges_expired(self):
+        self.client.post(reverse('logout'), **self.auth())
+        self.assertFalse(RevokedToken.objects.filter(pk=self.expired.pk).exists())
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+    def test_purge_command(self):
+        out = io.StringIO()
+        call_command('purge_revoked_tokens', stdout=out)
+        self.assertIn('Deleted 1 expired', out.getvalue())
+        self.assertFalse(RevokedToken.objects.exists())
+
+
+class UserCacheTests(EndpointTestCase):
+
+    def test_cache_holds_only_auth_fields(self):
+        self.client.get(reverse('verify_token'), **self.auth())
+        cache = caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+        version = cache.get(f'auth:user-version:{self.staff.pk}')
+        row = cache.get(f'auth:user-fields:{self.staff.pk}:{version}')
+        self.assertEqual(set(row) - {'password_md5'}, set(CACHED_USER_FIELDS))
+        self.assertNotIn(self.staff.password, row.values())
+
+        user = get_cached_user(self.staff.pk)
+        self.assertEqual((user.pk, user.username, user.is_staff), (self.staff.pk, 'admin', True))
+        self.assertEqual(user.email, '')
+        # The profile endpoint loads the rest itself
+        response = self.client.get(reverse('verify_token'), **self.auth())
+        self.assertEqual(response.json()['user']['email'], 'admin@example.com')
+
+    def test_cached_user_cannot_be_saved(self):
+        user = get_cached_user(self.staff.pk)
+        with self.assertRaises(NotImplementedError):
+            user.save(update_fields=['last_login'])
+        with self.assertRaises(NotImplementedError):
+            user.delete()
+        self.staff.refresh_from_db()
+        self.assertEqual(self.staff.email, 'admin@example.com')
+        self.assertTrue(self.staff.check_password('admin-password'))
+
+    def test_update_needs_explicit_invalidation(self):
+        headers = self.auth()
+        self.assertEqual(self.client.get(reverse('verify_token'), **headers).status_code, 200)
+        # update() sends no post_save, so the cached entry still says active...
+        User.objects.filter(pk=self.staff.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('verify_token'), **headers).status_code, 200)
+        # ...until the caller invalidates it
+        invalidate_cached_user(self.staff.pk)
+        self.assertEqual(self.client.get(reverse('verify_token'), **headers).status_code, 401)
+
+    def test_save_invalidates(self):
+        headers = self.auth()
+        self.client.get(reverse('verify_token'), **headers)
+        self.staff.is_active = False
+        self.staff.save()
+        self.assertEqual(self.client.get(reverse('verify_token'), **headers).status_code, 401)
+
+
+class LoginThrottleCounterTests(SimpleTestCase):
+    key = 'auth:login-fail:test:counter'
+
+    def setUp(self):
+        self.throttle = LoginThrottle()
+        self.throttle.cache.delete(self.key)
+        self.addCleanup(self.throttle.cache.delete, self.key)
+
+    def test_counter_lasts_the_window(self):
+        self.throttle._incr(self.key, 900)
+        started = time.time()
+        self.assertEqual(self.throttle._incr(self.key, 900), 2)
+        cache = self.throttle.cache
+        if isinstance(cache, FileBasedCache):
+            # Not the cache's default TIMEOUT of 300 s
+            with open(cache._key_to_file(self.key), 'rb') as file:
+                self.assertGreater(pickle.load(file) - started, 800)
+
+    def test_concurrent_failures_are_all_counted(self):
+        def fail():
+            for _ in range(5):
+                self.throttle._incr(self.key, 900)
+
+        threads = [threading.Thread(target=fail) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.throttle._incr(self.key, 900), 41)
@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+from clickexpress_api.cache import _Lock
+from monitoring.metrics import LOGIN_HASHES_SAVED
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottle(BaseThrottle):
+    """
+    Failed-login lockout per client IP and per username.
+
+    Every login costs a full password hash, so attempts are checked against
+    the shared cache before the credentials are looked at. Each scope gets a
+    number of free failures inside a sliding window; every failure past that
+    locks the scope for an exponentially growing period (capped). A rejected
+    attempt never reaches authenticate(), which is counted as a saved hash
+    (clickexpress_login_hashes_saved_total).
+    """
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', 'default')]
+
+    def _limits(self, scope):
+        if scope == 'ip':
+            return getattr(settings, 'LOGIN_THROTTLE_IP_ATTEMPTS', 20)
+        return getattr(settings, 'LOGIN_THROTTLE_USERNAME_ATTEMPTS', 5)
+
+    def _keys(self, ip, username):
+        username_hash = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+        return {'ip': ip or 'unknown', 'username': username_hash}
+
+    def check(self, request, username):
+        """
+        Return the number of seconds the caller must wait, or 0 if the attempt may proceed
+        """
+        keys = self._keys(self.get_ident(request), username)
+        lock_keys = {f'auth:login-lock:{scope}:{ident}': scope for scope, ident in keys.items()}
+        locks = self.cache.get_many(list(lock_keys))
+        now = time.time()
+        retry_after = max([until - now for until in locks.values()] or [0])
+        if retry_after <= 0:
+            return 0
+
+        LOGIN_HASHES_SAVED.inc()
+        logger.warning(
+            "Login attempt refused for %s (locked: %s)",
+            keys['ip'], ', '.join(sorted(lock_keys[key] for key in locks))
+        )
+        return int(retry_after) + 1
+
+    def record_failure(self, request, username):
+        window = getattr(settings, 'LOGIN_THROTTLE_WINDOW', 900)
+        base = getattr(settings, 'LOGIN_THROTTLE_BASE_LOCKOUT', 1)
+        ceiling = getattr(settings, 'LOGIN_THROTTLE_MAX_LOCKOUT', 900)
+
+        for scope, ident in self._keys(self.get_ident(request), username).items():
+            failures = self._incr(f'auth:login-fail:{scope}:{ident}', window)
+            excess = failures - self._limits(scope)
+            if excess > 0:
+                lockout = min(base * 2 ** (excess - 1), ceiling)
+                self.cache.set(f'auth:login-lock:{scope}:{ident}', time.time() + lockout, lockout)
+
+    def record_success(self, request, username):
+        ident = self._keys(self.get_ident(request), username)['username']
+        self.cache.delete_many([f'auth:login-fail:username:{ident}', f'auth:login-lock:username:{ident}'])
+
+    def _incr(self, key, window):
+        """
+        Count one failure in the window that started with the first one
+        """
+        if isinstance(self.cache, RedisCache):
+            # INCR is atomic and keeps the expiry add() set
+            self.cache.add(key, 0, window)
+            try:
+                return self.cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr()
+                self.cache.set(key, 1, window)
+                return 1
+
+        # Elsewhere incr() is a get() and a set() with the default timeout:
+        # keep the window's end in the value and serialise the workers
+        lock = _Lock(self.cache, key, timeout=5)
+        locked = False
+        for _ in range(50):
+            locked = lock.acquire()
+            if locked:
+                break
+            time.sleep(0.005)
+        try:
+            now = time.time()
+            count, expires_at = self.cache.get(key) or (0, now + window)
+            if expires_at <= now:
+                count, expires_at = 0, now + window
+            count += 1
+            self.cache.set(key, (count, expires_at), max(expires_at - now, 1))
+            return count
+        finally:
+            if locked:
+                lock.release()
+
+
+login_throttle = LoginThrottle()
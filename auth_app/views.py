@@ -4,7 +4,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from .revocation import revocation_list
 from .serializers import UserSerializer, LoginSerializer
+from .throttling import login_throttle
 
 
 @api_view(['POST'])
@@ -14,15 +17,32 @@ def login(request):
     Admin login endpoint
     POST /auth/login
     """
+    username = str(request.data.get('username') or '')
+    retry_after = login_throttle.check(request, username)
+    if retry_after:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'TOO_MANY_ATTEMPTS',
+                'message': 'Too many failed login attempts. Please try again later.'
+            }
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(retry_after)})
+
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
+        login_throttle.record_success(request, username)
         refresh = RefreshToken.for_user(user)
+        # Claims used by ClaimsJWTAuthentication's stateless mode
+        refresh['username'] = user.username
+        refresh['is_staff'] = user.is_staff
         return Response({
             'success': True,
             'token': str(refresh.access_token),
             'user': UserSerializer(user).data
         }, status=status.HTTP_200_OK)
+    if username and request.data.get('password'):
+        login_throttle.record_failure(request, username)
     return Response({
         'success': False,
         'error': {
@@ -41,10 +61,11 @@ def logout(request):
     POST /auth/logout
     """
     try:
+        if request.auth is not None:
+            revocation_list.revoke(request.auth)
         refresh_token = request.data.get("refresh")
         if refresh_token:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            revocation_list.revoke(RefreshToken(refresh_token))
         return Response({
             'success': True,
             'message': 'Logged out successfully'
@@ -66,7 +87,9 @@ def verify_token(request):
     Verify token endpoint
     GET /auth/verify
     """
+    # request.user only carries the fields authentication needs
+    user = User.objects.filter(pk=request.user.pk).first() or request.user
     return Response({
         'success': True,
-        'user': UserSerializer(request.user).data
+        'user': UserSerializer(user).data
     }, status=status.HTTP_200_OK)
\ No newline at end of file
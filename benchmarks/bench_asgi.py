@@ -0,0 +1,200 @@
+"""
+Concurrent throughput of the public endpoints under gunicorn sync workers
+(WSGI) vs uvicorn workers (ASGI, async views), same worker count.
+
+Each mode starts its own server against the configured database, with the
+response cache off so every request reaches the views. Two workloads:
+
+  read     GET /api/v1/blog-posts/<id>/
+  contact  POST /api/v1/contact/ with Mailgun pointed at a local stub that
+           answers after --mailgun-latency ms (the I/O the async path
+           stops blocking on)
+
+The database must be migrated; a few published posts are created if there
+are none. Against SQLite, concurrent contact inserts can hit "database is
+locked"; use PostgreSQL for the contact numbers.
+
+    python -m benchmarks.bench_asgi [--workers 3] [--concurrency 1,16,64] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from benchmarks.common import setup_django
+from monitoring.loadtest import Recorder
+
+MODES = {
+    'wsgi': ('clickexpress_api.wsgi:application', 'sync'),
+    'asgi': ('clickexpress_api.asgi:application', 'uvicorn.workers.UvicornWorker'),
+}
+
+CONTACT = {
+    'name': 'Load Test',
+    'email': 'loadtest@example.com',
+    'subject': 'Benchmark',
+    'message': 'Concurrent throughput benchmark message.',
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_mailgun_stub(latency):
+    """
+    A threaded HTTP server that accepts any POST after `latency` seconds
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency)
+            body = b'{"id":"stub","message":"Queued"}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def ensure_posts():
+    from django.contrib.auth.models import User
+    from blog_app.models import BlogPost
+
+    ids = list(BlogPost.objects.filter(status='published').values_list('id', flat=True)[:50])
+    if ids:
+        return ids
+    author = User.objects.filter(is_staff=True).first() or User.objects.create_user('bench-author', is_staff=True)
+    for i in range(20):
+        ids.append(BlogPost.objects.create(
+            title=f'Benchmark post {i}', excerpt='Excerpt', content='Content ' * 200,
+            author=author, status='published',
+        ).pk)
+    return ids
+
+
+def start_server(mode, port, workers, mailgun_port, multiproc_dir):
+    app, worker_class = MODES[mode]
+    env = {
+        **os.environ,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_WORKER_CLASS': worker_class,
+        'PROMETHEUS_MULTIPROC_DIR': multiproc_dir,
+        'RESPONSE_CACHE_ENABLED': 'False',
+        'MAILGUN_API_KEY': 'benchmark',
+        'MAILGUN_DOMAIN': 'benchmark.test',
+        'MAILGUN_API_BASE': f'http://127.0.0.1:{mailgun_port}/v3',
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{mode} server exited:\n{process.stderr.read().decode()}')
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/api/v1/blog-posts/', timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+async def run_load(base_url, workload, ids, concurrency, duration, warmup):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def user(index):
+            i = index
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    if workload == 'read':
+                        response = await client.get(f'/api/v1/blog-posts/{ids[i % len(ids)]}/')
+                    else:
+                        response = await client.post('/api/v1/contact/', json=CONTACT)
+                    status = response.status_code
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                recorder.record(workload, time.perf_counter() - start, status)
+                i += concurrency
+
+        deadline = time.perf_counter() + warmup + duration
+        tasks = [asyncio.create_task(user(index)) for index in range(concurrency)]
+        await asyncio.sleep(warmup)
+        recorder.start()
+        await asyncio.gather(*tasks)
+        recorder.stop()
+    return recorder.summary()['total']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--concurrency', default='1,16,64')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--mailgun-latency', type=float, default=150, help='Stub Mailgun response time (ms)')
+    parser.add_argument('--workloads', default='read,contact')
+    parser.add_argument('--modes', default=','.join(MODES))
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    setup_django()
+    ids = ensure_posts()
+    mailgun = start_mailgun_stub(args.mailgun_latency / 1000)
+
+    results = {}
+    for mode in args.modes.split(','):
+        port = free_port()
+        with tempfile.TemporaryDirectory(prefix='bench-prometheus-') as multiproc_dir:
+            server = start_server(mode, port, args.workers, mailgun.server_port, multiproc_dir)
+            try:
+                for workload in args.workloads.split(','):
+                    for level in levels:
+                        results[mode, workload, level] = asyncio.run(run_load(
+                            f'http://127.0.0.1:{port}', workload, ids, level, args.duration, args.warmup
+                        ))
+            finally:
+                server.terminate()
+                server.wait()
+    mailgun.shutdown()
+
+    print(f"{args.workers} workers per mode, {args.duration:.0f}s per run, Mailgun stub {args.mailgun_latency:.0f} ms")
+    print(f"{'workload':<9} {'conc':>5} {'mode':<5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'vs wsgi':>8}")
+    for workload in args.workloads.split(','):
+        for level in levels:
+            baseline = results.get(('wsgi', workload, level))
+            for mode in args.modes.split(','):
+                row = results[mode, workload, level]
+                ratio = f"{row['rps'] / baseline['rps']:.2f}x" if baseline and baseline['rps'] else '-'
+                print(
+                    f"{workload:<9} {level:>5} {mode:<5} {row['rps']:>9,.1f} {row['p50_ms']:>9.1f} "
+                    f"{row['p99_ms']:>9.1f} {row['error_rate']:>7.1%} {ratio:>8}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Query + serialize time of the public blog and gallery lists: DRF
+ModelSerializer over model instances vs CompiledReadSerializer over
+values_list() rows, with the rendered output checked to be identical.
+
+Uses a throwaway test database on the configured backend.
+
+    python -m benchmarks.bench_compiled_serializers [--rows 10000] [--repeat 5]
+"""
+import argparse
+
+from benchmarks.common import make_blog_posts, make_gallery_images, measure, setup_django, summarize, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from blog_app.models import BlogPost
+    from blog_app.serializers import BlogPostSerializer, compiled_blog_post_serializer
+    from clickexpress_api.renderers import ORJSONRenderer
+    from gallery.models import GalleryImage
+    from gallery.serializers import GalleryImageSerializer, compiled_gallery_image_serializer
+
+    with test_database():
+        author = User.objects.create_user('admin')
+        posts = make_blog_posts(args.rows)
+        for post in posts:
+            post.id = None
+            post.author = author
+        BlogPost.objects.bulk_create(posts, batch_size=2000)
+        images = make_gallery_images(args.rows)
+        for image in images:
+            image.id = None
+        GalleryImage.objects.bulk_create(images, batch_size=2000)
+        del posts, images
+
+        cases = [
+            ('blog', lambda: BlogPost.objects.select_related('author').filter(status='published').order_by('-created_at'),
+             BlogPostSerializer, compiled_blog_post_serializer),
+            ('gallery', lambda: GalleryImage.objects.order_by('display_order', '-created_at'),
+             GalleryImageSerializer, compiled_gallery_image_serializer),
+        ]
+        renderer = ORJSONRenderer()
+        for name, queryset, serializer_class, compiled in cases:
+            drf = renderer.render(serializer_class(queryset(), many=True).data)
+            fast = renderer.render(compiled.serialize(queryset()))
+            assert drf == fast, f'{name}: compiled output differs'
+
+            print(f"\n{name} list: {args.rows} rows, {len(fast) / 1024:,.0f} KiB")
+            baseline = summarize(
+                'ModelSerializer', measure(lambda: serializer_class(queryset(), many=True).data, args.repeat), args.rows
+            )
+            best = summarize('CompiledReadSerializer', measure(lambda: compiled.serialize(queryset()), args.repeat), args.rows)
+            print(f"{'speedup':<40} {baseline / best:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
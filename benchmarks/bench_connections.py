@@ -0,0 +1,146 @@
+"""
+Requests per second on a database-backed endpoint (blog post detail) with
+connections closed after every request, persistent connections
+(CONN_MAX_AGE + health checks) and the in-process pool, from N threads
+calling the WSGI handler directly so request_finished closes or returns
+connections exactly as under gunicorn.
+
+Needs PostgreSQL: each mode runs in a fresh process with its settings taken
+from the environment, against a throwaway test database. The response cache
+is disabled so every request reaches the database.
+
+    python -m benchmarks.bench_connections [--threads 16] [--duration 10] [--pool-size 8]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import setup_django, test_database
+
+MODES = {
+    'close': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_CONN_HEALTH_CHECKS': 'True', 'DB_POOL': 'False'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+def child(args):
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.client import RequestFactory
+    from prometheus_client import REGISTRY
+    from blog_app.models import BlogPost
+
+    if settings.DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        sys.exit('bench_connections needs PostgreSQL; unset DB_ENGINE=sqlite')
+
+    with test_database():
+        author = User.objects.create_user('admin')
+        ids = [
+            BlogPost.objects.create(title=f'Post {i}', excerpt='Excerpt', content='Content ' * 200,
+                                    author=author, status='published').pk
+            for i in range(50)
+        ]
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        environs = [factory.get(f'/api/v1/blog-posts/{pk}/').environ for pk in ids]
+
+        def opened():
+            return REGISTRY.get_sample_value('clickexpress_db_connections_opened_total', {'alias': 'default'}) or 0
+
+        def call(environ):
+            statuses = []
+            response = handler(dict(environ), lambda status, headers, exc_info=None: statuses.append(status))
+            try:
+                b''.join(response)
+            finally:
+                # Fires request_finished: close_old_connections() runs here
+                response.close()
+            if not statuses[0].startswith('200'):
+                raise AssertionError(f'Unexpected response {statuses[0]}')
+
+        deadline = None
+        counts = [0] * args.threads
+        errors = []
+        start_gate = threading.Barrier(args.threads + 1)
+
+        def worker(index):
+            start_gate.wait()
+            i = index
+            try:
+                while time.perf_counter() < deadline:
+                    call(environs[i % len(environs)])
+                    counts[index] += 1
+                    i += args.threads
+            except Exception as exc:
+                errors.append(repr(exc))
+
+        # Warm up imports, URL resolution and the compiled serializers
+        for environ in environs:
+            call(environ)
+
+        before = opened()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        deadline = time.perf_counter() + args.duration
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        print(json.dumps({
+            'requests': sum(counts),
+            'rps': sum(counts) / elapsed,
+            'connections_opened': opened() - before,
+            'errors': errors[:5],
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{args.threads} threads, {args.duration:.0f}s per mode, pool size {args.pool_size}")
+    print(f"{'mode':<12} {'requests':>10} {'req/s':>10} {'connections':>12} {'vs close':>9}")
+    baseline = None
+    for mode in args.modes.split(','):
+        env = {
+            **os.environ,
+            **MODES[mode],
+            'RESPONSE_CACHE_ENABLED': 'False',
+            'DB_POOL_MAX_SIZE': str(args.pool_size),
+        }
+        command = [sys.executable, '-m', 'benchmarks.bench_connections', '--child', mode,
+                   '--threads', str(args.threads), '--duration', str(args.duration)]
+        output = subprocess.run(command, env=env, capture_output=True, text=True)
+        if output.returncode:
+            sys.exit(f'{mode} failed:\n{output.stderr}')
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        baseline = baseline or result['rps']
+        print(
+            f"{mode:<12} {result['requests']:>10,} {result['rps']:>10,.0f} {result['connections_opened']:>12,.0f} "
+            f"{result['rps'] / baseline:>8.2f}x"
+        )
+        for error in result['errors']:
+            print(f'  error: {error}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Per-request middleware overhead on the root, public API, JWT API and admin
+routes with the full stack (session, CSRF, auth and messages on every route,
+as before) vs the route-scoped stack (those four only under /admin/).
+
+Requests go through Django's WSGI handler in-process, so the numbers include
+URL resolution, middleware and the view but no network. Overhead is the time
+per request minus the same request with no middleware at all (for the
+admin, which cannot run without them, with only the four scoped ones).
+
+Uses a throwaway test database and an in-memory cache.
+
+    python -m benchmarks.bench_middleware [--requests 2000] [--repeat 5]
+"""
+import argparse
+import gc
+import time
+
+from benchmarks.common import setup_django, test_database
+
+SCOPED = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+
+def stacks(settings):
+    scoped = list(settings.MIDDLEWARE)
+    full = []
+    for path in scoped:
+        if path == 'clickexpress_api.middleware.RouteScopedMiddleware':
+            full.extend(SCOPED)
+        else:
+            full.append(path)
+    return {'none': [], 'admin only': SCOPED, 'full': full, 'scoped': scoped}
+
+
+def time_route(handler, environ, requests, repeat):
+    def call():
+        statuses = []
+        response = handler(dict(environ), lambda status, headers, exc_info=None: statuses.append(status))
+        b''.join(response)
+        response.close()
+        return statuses[0]
+
+    status = call()
+    if not status.startswith('200'):
+        raise AssertionError(f"{environ['PATH_INFO']}: {status}")
+    best = float('inf')
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(requests):
+                call()
+            best = min(best, (time.perf_counter() - start) / requests)
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+    from django.test.client import RequestFactory
+    from rest_framework_simplejwt.tokens import AccessToken
+    from monitoring.testing import seed_blog_posts, seed_contact_messages
+
+    caches = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    with override_settings(CACHES=caches), test_database():
+        staff = User.objects.create_user('admin', 'admin@example.com', 'admin-password', is_staff=True)
+        seed_blog_posts(20, staff)
+        seed_contact_messages(20)
+        factory = RequestFactory()
+        jwt = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(staff)}'}
+        # route -> (environ, baseline stack)
+        routes = {
+            'root': (factory.get('/').environ, 'none'),
+            'public API (cached)': (factory.get('/api/v1/blog-posts/').environ, 'none'),
+            'JWT API': (factory.get('/api/v1/contact/messages/', **jwt).environ, 'none'),
+            'admin login page': (factory.get('/admin/login/').environ, 'admin only'),
+        }
+
+        results = {}
+        for stack, middleware in stacks(settings).items():
+            with override_settings(MIDDLEWARE=middleware):
+                handler = WSGIHandler()
+                for route, (environ, baseline) in routes.items():
+                    if stack in ('full', 'scoped') or stack == baseline:
+                        results[stack, route] = time_route(handler, environ, args.requests, args.repeat)
+
+    print(f"{'route':<22} {'full us':>9} {'scoped us':>10} {'overhead full':>14} {'overhead scoped':>16} {'saved':>7}")
+    for route, (_, baseline) in routes.items():
+        base = results[baseline, route]
+        full, scoped = results['full', route], results['scoped', route]
+        print(
+            f"{route:<22} {full * 1e6:>9.1f} {scoped * 1e6:>10.1f} {(full - base) * 1e6:>14.1f} "
+            f"{(scoped - base) * 1e6:>16.1f} {(1 - (scoped - base) / (full - base)) if full > base else 0:>7.0%}"
+        )
+
+
+if __name__ == '__main__':
+    main()
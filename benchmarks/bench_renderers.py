@@ -0,0 +1,42 @@
+"""
+Rendering throughput of DRF's stdlib JSONRenderer vs ORJSONRenderer for
+10k-row blog and gallery list payloads.
+
+    python -m benchmarks.bench_renderers [--rows 10000] [--repeat 5]
+"""
+import argparse
+
+from benchmarks.common import make_blog_posts, make_gallery_images, measure, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from blog_app.serializers import BlogPostSerializer
+    from clickexpress_api.renderers import ORJSONRenderer
+    from gallery.serializers import GalleryImageSerializer
+
+    payloads = {
+        'blog': BlogPostSerializer(make_blog_posts(args.rows), many=True).data,
+        'gallery': GalleryImageSerializer(make_gallery_images(args.rows), many=True).data,
+    }
+
+    for name, data in payloads.items():
+        envelope = {'success': True, 'data': data, 'total': len(data)}
+        stdlib = JSONRenderer().render(envelope)
+        fast = ORJSONRenderer().render(envelope)
+        assert stdlib == fast, f'{name}: renderer output differs'
+
+        print(f"\n{name} payload: {args.rows} rows, {len(fast) / 1024:,.0f} KiB")
+        baseline = summarize('JSONRenderer', measure(lambda: JSONRenderer().render(envelope), args.repeat), args.rows)
+        best = summarize('ORJSONRenderer', measure(lambda: ORJSONRenderer().render(envelope), args.repeat), args.rows)
+        print(f"{'speedup':<40} {baseline / best:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
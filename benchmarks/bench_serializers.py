@@ -0,0 +1,290 @@
+"""
+Per-row cost of the hot serializers: serialize (instances -> .data) and
+deserialize (payload -> is_valid()) throughput, plus tracemalloc allocation
+counts (blocks and bytes still held by the result, and peak traced memory)
+at 1/100/10k rows.
+
+No database is needed: serialization runs on unsaved instances, and
+deserialization drops the UniqueValidators that would query the database.
+Any query raises, so a serializer that starts touching the database shows up
+here instead of silently skewing the numbers.
+
+Each run is written to benchmarks/results/serializers-<commit>.json; pass
+--compare with an earlier file to print the relative change.
+
+    python -m benchmarks.bench_serializers [--rows 1,100,10000] [--repeat 5] [--compare OLD.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from benchmarks.common import (
+    make_blog_posts,
+    make_contact_messages,
+    make_gallery_images,
+    make_newsletter_subscribers,
+    make_users,
+    setup_django,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Rows processed per timed sample; small row counts are looped up to this
+TARGET_ROWS_PER_SAMPLE = 2000
+
+
+@dataclass
+class Case:
+    name: str
+    read_serializer: type
+    write_serializer: type
+    factory: object
+    # Writable fields that can't be fed back as JSON values
+    exclude: tuple = ()
+    # Writable fields sent as a freshly built upload per row
+    uploads: tuple = ()
+
+
+def build_cases():
+    from auth_app.serializers import UserSerializer
+    from blog_app.serializers import BlogPostSerializer
+    from contact.serializers import (
+        ContactMessageCreateSerializer,
+        ContactMessageSerializer,
+        NewsletterSubscribeSerializer,
+        NewsletterSubscriberSerializer,
+    )
+    from gallery.serializers import GalleryImageSerializer
+
+    # Deserialization uses the serializer the corresponding write endpoint validates with
+    return [
+        Case('BlogPostSerializer', BlogPostSerializer, BlogPostSerializer, make_blog_posts,
+             exclude=('featured_image',)),
+        Case('GalleryImageSerializer', GalleryImageSerializer, GalleryImageSerializer, make_gallery_images,
+             uploads=('src',)),
+        Case('ContactMessageSerializer', ContactMessageSerializer, ContactMessageCreateSerializer,
+             make_contact_messages),
+        Case('NewsletterSubscriberSerializer', NewsletterSubscriberSerializer, NewsletterSubscribeSerializer,
+             make_newsletter_subscribers),
+        Case('UserSerializer', UserSerializer, UserSerializer, make_users),
+    ]
+
+
+def png_bytes():
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 16), (40, 90, 160)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def without_db_validators(serializer):
+    from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+    child = getattr(serializer, 'child', serializer)
+    for field in child.fields.values():
+        field.validators = [validator for validator in field.validators if not isinstance(validator, UniqueValidator)]
+    child.validators = [validator for validator in child.validators if not isinstance(validator, UniqueTogetherValidator)]
+    return serializer
+
+
+def make_payload_factory(case, rows):
+    """
+    Return a callable building `rows` input dicts for the write serializer.
+    Uploads are consumed by validation, so the payload is rebuilt per sample.
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    template = case.read_serializer(case.factory(rows), many=True).data
+    writable = [
+        name for name, field in case.write_serializer().fields.items()
+        if not field.read_only and name not in case.exclude and name not in case.uploads
+    ]
+    base = [{name: item[name] for name in writable if name in item} for item in template]
+    image = png_bytes() if case.uploads else None
+
+    def build():
+        if not case.uploads:
+            return base
+        return [
+            {**item, **{name: SimpleUploadedFile('image.png', image, content_type='image/png') for name in case.uploads}}
+            for item in base
+        ]
+
+    return build
+
+
+def forbid_queries(execute, sql, params, many, context):
+    raise AssertionError(f'Benchmark issued a database query: {sql}')
+
+
+def time_samples(prepare, run, repeat, loops):
+    timings = []
+    for _ in range(repeat):
+        inputs = [prepare() for _ in range(loops)]
+        start = time.perf_counter()
+        for value in inputs:
+            run(value)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def allocations(prepare, run):
+    """
+    Blocks and bytes allocated by one run that are still live when it returns
+    (the result), and the peak traced memory during the run
+    """
+    value = prepare()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = run(value)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'filename')
+    blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+    return blocks, size, peak
+
+
+def bench(case, operation, rows, repeat):
+    if operation == 'serialize':
+        instances = case.factory(rows)
+
+        def prepare():
+            return instances
+
+        def run(value):
+            return case.read_serializer(value, many=True).data
+    else:
+        build = make_payload_factory(case, rows)
+
+        def prepare():
+            return build()
+
+        def run(value):
+            serializer = without_db_validators(case.write_serializer(data=value, many=True))
+            if not serializer.is_valid():
+                raise AssertionError(f'{case.name} rejected the benchmark payload: {serializer.errors}')
+            return serializer.validated_data
+
+    loops = max(1, TARGET_ROWS_PER_SAMPLE // rows)
+    run(prepare())  # Warm up field caches
+    timings = time_samples(prepare, run, repeat, loops)
+    blocks, size, peak = allocations(prepare, run)
+    best = min(timings) / loops
+    return {
+        'serializer': case.name,
+        'operation': operation,
+        'rows': rows,
+        'loops': loops,
+        'best_s': best,
+        'median_s': statistics.median(timings) / loops,
+        'us_per_row': best / rows * 1e6,
+        'rows_per_s': rows / best,
+        'alloc_blocks': blocks,
+        'alloc_blocks_per_row': blocks / rows,
+        'alloc_bytes_per_row': size / rows,
+        'peak_kib': peak / 1024,
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def metadata(args):
+    import django
+    import rest_framework
+
+    commit, dirty = git_commit()
+    return {
+        'benchmark': 'serializers',
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'django': django.get_version(),
+        'djangorestframework': rest_framework.VERSION,
+        'platform': platform.platform(),
+        'machine': platform.node(),
+        'rows': args.rows,
+        'repeat': args.repeat,
+    }
+
+
+def print_result(result, previous=None):
+    line = (
+        f"{result['serializer']:<32} {result['operation']:<12} {result['rows']:>6} "
+        f"{result['us_per_row']:10.2f} {result['rows_per_s']:12,.0f} "
+        f"{result['alloc_blocks_per_row']:10.1f} {result['alloc_bytes_per_row']:10.0f} {result['peak_kib']:10.1f}"
+    )
+    if previous:
+        line += f"  {previous['us_per_row'] / result['us_per_row']:5.2f}x"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1,100,10000', help='Comma-separated row counts')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='Run only serializers whose name contains this')
+    parser.add_argument('--output', help='Results file (default benchmarks/results/serializers-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+    args.rows = [int(rows) for rows in args.rows.split(',')]
+
+    setup_django()
+    from django.db import connections
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as handle:
+            for result in json.load(handle)['results']:
+                previous[(result['serializer'], result['operation'], result['rows'])] = result
+
+    cases = [case for case in build_cases() if not args.only or args.only in case.name]
+    results = []
+    print(
+        f"{'serializer':<32} {'operation':<12} {'rows':>6} {'us/row':>10} {'rows/s':>12} "
+        f"{'blocks/row':>10} {'bytes/row':>10} {'peak KiB':>10}" + ('  speedup' if previous else '')
+    )
+    with connections['default'].execute_wrapper(forbid_queries):
+        for case in cases:
+            for operation in ('serialize', 'deserialize'):
+                for rows in args.rows:
+                    result = bench(case, operation, rows, args.repeat)
+                    results.append(result)
+                    print_result(result, previous.get((case.name, operation, rows)))
+
+    meta = metadata(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"serializers-{meta['commit']}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump({'meta': meta, 'results': results}, handle, indent=2)
+    print(f'\nResults written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Peak memory and time-to-first-byte of the gallery list endpoint, buffered
+(serializer.data + Response) vs streamed (stream_list_response), at 100k rows.
+
+Uses a throwaway test database on the configured backend; against PostgreSQL
+the streamed variant reads through a server-side cursor.
+
+    python -m benchmarks.bench_streaming [--rows 100000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import make_gallery_images, setup_django, test_database
+
+
+def run(label, build_response, consume):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = build_response()
+    first_byte, size = consume(response)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<12} total {elapsed * 1000:9.1f} ms  first byte {(first_byte - start) * 1000:9.1f} ms  "
+        f"peak {peak / 1024 / 1024:8.1f} MiB  body {size / 1024 / 1024:6.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from clickexpress_api.renderers import ORJSONRenderer
+    from clickexpress_api.streaming import stream_list_response
+    from gallery.models import GalleryImage
+    from gallery.serializers import GalleryImageSerializer
+
+    with test_database():
+        images = make_gallery_images(args.rows)
+        for image in images:
+            image.id = None
+        GalleryImage.objects.bulk_create(images, batch_size=2000)
+        del images
+
+        def queryset():
+            return GalleryImage.objects.all().order_by('display_order', '-created_at')
+
+        def buffered():
+            images = queryset()
+            data = GalleryImageSerializer(images, many=True).data
+            return {'success': True, 'data': data, 'total': images.count()}
+
+        def consume_buffered(envelope):
+            body = ORJSONRenderer().render(envelope)
+            return time.perf_counter(), len(body)
+
+        def consume_streaming(response):
+            first_byte, size = None, 0
+            for chunk in response.streaming_content:
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                size += len(chunk)
+            return first_byte, size
+
+        print(f"gallery list, {args.rows} rows")
+        run('buffered', buffered, consume_buffered)
+        run('streaming', lambda: stream_list_response(queryset(), GalleryImageSerializer), consume_streaming)
+
+        streamed = b''.join(stream_list_response(queryset(), GalleryImageSerializer).streaming_content)
+        assert streamed == JSONRenderer().render(buffered()), 'streamed body differs from buffered body'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the project root, e.g.:
+    python -m benchmarks.bench_renderers
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clickexpress_api.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Create a throwaway test database on the configured backend (the same way
+    `manage.py test` does) and drop it afterwards
+    """
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    old_config = runner.setup_databases()
+    try:
+        yield
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5):
+    """
+    Call func `repeat` times and return the timings in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(label, timings, rows):
+    best = min(timings)
+    print(
+        f"{label:<40} best {best * 1000:9.2f} ms  "
+        f"median {statistics.median(timings) * 1000:9.2f} ms  "
+        f"{rows / best:12,.0f} rows/s"
+    )
+    return best
+
+
+def make_blog_posts(count):
+    """
+    Unsaved BlogPost instances with realistic field sizes
+    """
+    from django.contrib.auth.models import User
+    from blog_app.models import BlogPost
+
+    author = User(id=1, username='admin')
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(count):
+        post = BlogPost(
+            id=i + 1,
+            title=f'Blog post number {i}',
+            excerpt='A short excerpt describing the post. ' * 3,
+            content='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 40,
+            featured_image=f'blog/images/image_{i:06d}.jpg',
+            author=author,
+            status='published',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i, seconds=30),
+        )
+        posts.append(post)
+    return posts
+
+
+def make_gallery_images(count):
+    """
+    Unsaved GalleryImage instances spread over every category
+    """
+    from gallery.models import GalleryImage
+
+    categories = [choice for choice, _ in GalleryImage.CATEGORY_CHOICES]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        GalleryImage(
+            id=i + 1,
+            src=f'gallery/images/image_{i:06d}.jpg',
+            alt=f'Gallery image {i}',
+            caption='A caption for the gallery image. ' * 2,
+            category=categories[i % len(categories)],
+            display_order=i,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def make_contact_messages(count):
+    """
+    Unsaved ContactMessage instances
+    """
+    from contact.models import ContactMessage
+
+    statuses = [choice for choice, _ in ContactMessage.STATUS_CHOICES]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        ContactMessage(
+            id=i + 1,
+            name=f'Sender {i}',
+            email=f'sender{i}@example.com',
+            subject=f'Question about service {i}',
+            message='I would like to know more about your services and pricing. ' * 4,
+            phone='+1234567890',
+            status=statuses[i % len(statuses)],
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def make_newsletter_subscribers(count):
+    """
+    Unsaved NewsletterSubscriber instances
+    """
+    from contact.models import NewsletterSubscriber
+
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        NewsletterSubscriber(id=i + 1, email=f'subscriber{i}@example.com', subscribed_at=now - timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def make_users(count):
+    """
+    Unsaved User instances
+    """
+    from django.contrib.auth.models import User
+
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        User(
+            id=i + 1,
+            username=f'user{i}',
+            email=f'user{i}@example.com',
+            first_name='First',
+            last_name=f'Last{i}',
+            date_joined=now - timedelta(days=i),
+        )
+        for i in range(count)
+    ]
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BlogAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .serializers import compiled_blog_post_serializer
+        compiled_blog_post_serializer.compile()
@@ -0,0 +1,44 @@
+from clickexpress_api.async_views import public_async_view, render_json
+from clickexpress_api.cache import cached_async_view
+from .models import BlogPost
+from .serializers import BlogPostSerializer, compiled_blog_post_serializer
+
+
+@cached_async_view('blog')
+@public_async_view(['GET'])
+async def get_all_blog_posts(request):
+    """
+    Get all published blog posts (public endpoint, ASGI mode)
+    GET /blog-posts
+    """
+    blog_posts = BlogPost.objects.filter(status='published').order_by('-created_at')
+    rows = [row async for row in compiled_blog_post_serializer.values(blog_posts)]
+    data = compiled_blog_post_serializer.serialize_rows(rows)
+    return render_json({
+        'success': True,
+        'data': data,
+        'total': len(data)
+    })
+
+
+@cached_async_view('blog')
+@public_async_view(['GET'])
+async def get_blog_post(request, pk):
+    """
+    Get single blog post (public endpoint, ASGI mode)
+    GET /blog-posts/:id
+    """
+    try:
+        blog_post = await BlogPost.objects.select_related('author').aget(pk=pk, status='published')
+    except BlogPost.DoesNotExist:
+        return render_json({
+            'success': False,
+            'error': {
+                'code': 'NOT_FOUND',
+                'message': 'Blog post not found'
+            }
+        }, status=404)
+    return render_json({
+        'success': True,
+        'data': BlogPostSerializer(blog_post).data
+    })
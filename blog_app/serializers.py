@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from clickexpress_api.bulk import MediaPathField
+from clickexpress_api.compiled_serializers import CompiledReadSerializer
 from .models import BlogPost
 
 
@@ -17,5 +19,34 @@ class BlogPostSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
     
     def create(self, validated_data):
-        validated_data['author'] = self.context['request'].user
+        if 'author' not in validated_data:
+            validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class BlogPostSummarySerializer(serializers.ModelSerializer):
+    """
+    Blog post without its content, for listings
+    """
+    author_name = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = BlogPost
+        fields = ['id', 'title', 'excerpt', 'featured_image', 'author_name', 'created_at']
+        read_only_fields = fields
+
+
+class BlogPostBulkSerializer(serializers.ModelSerializer):
+    """
+    Blog post input for the bulk endpoints, with images already uploaded
+    """
+    featured_image = MediaPathField(required=False, allow_null=True)
+
+    class Meta:
+        model = BlogPost
+        fields = ['title', 'excerpt', 'content', 'featured_image', 'status']
+
+
+# Read path for the public list endpoint; see clickexpress_api.compiled_serializers
+compiled_blog_post_serializer = CompiledReadSerializer(BlogPostSerializer)
+compiled_blog_post_summary_serializer = CompiledReadSerializer(BlogPostSummarySerializer)
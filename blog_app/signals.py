@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clickexpress_api.cache import invalidate_on_commit
+from .models import BlogPost
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_blog_cache(sender, instance, **kwargs):
+    """
+    Any change to a post drops every cached blog and home page response, once
+    the change is committed
+    """
+    invalidate_on_commit('blog', kwargs.get('using'))
+    invalidate_on_commit('home', kwargs.get('using'))
@@ -1,3 +1,398 @@
-from django.test import TestCase
+import threading
+import time
+from unittest import mock
+from datetime import datetime, timezone as dt_timezone
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from clickexpress_api import cache as cache_module
+from clickexpress_api.cache import _Lock, get_or_compute, make_key
+from clickexpress_api.renderers import ORJSONRenderer
+from monitoring.testing import ASGI_URLCONF, EndpointTestCase, seed_blog_posts
+from .models import BlogPost
+from .serializers import BlogPostSerializer, compiled_blog_post_serializer
+
+
+class BlogEndpointTests(EndpointTestCase):
+    covers = (
+        'get_all_blog_posts', 'get_blog_post', 'create_blog_post',
+        'update_blog_post', 'delete_blog_post',
+    )
+
+    def seed(self, size):
+        seed_blog_posts(size, self.staff)
+        self.post = BlogPost.objects.order_by('id').first()
+
+    def test_get_all_blog_posts(self):
+        url = reverse('get_all_blog_posts')
+        self.assertQueryCountConstant(lambda: self.client.get(url), self.seed)
+        response = self.client.get(url)
+        self.assertEqual(response.json()['total'], BlogPost.objects.filter(status='published').count())
+        self.assertLatencyWithinBaseline('get_all_blog_posts', lambda: self.client.get(url))
+
+    def test_get_all_blog_posts_hides_drafts(self):
+        seed_blog_posts(3, self.staff, status='draft')
+        response = self.client.get(reverse('get_all_blog_posts'))
+        self.assertEqual(response.json()['total'], 0)
+
+    def test_get_blog_post(self):
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.get(reverse('get_blog_post', args=[self.post.pk])), self.seed
+        )
+        self.assertLatencyWithinBaseline(
+            'get_blog_post', lambda: self.client.get(reverse('get_blog_post', args=[self.post.pk]))
+        )
+
+    def test_get_blog_post_not_found(self):
+        response = self.client.get(reverse('get_blog_post', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['error']['code'], 'NOT_FOUND')
+
+    def test_create_blog_post(self):
+        headers = self.auth()
+        payload = {'title': 'New post', 'excerpt': 'Excerpt', 'content': 'Body'}
+        self.assertQueryCountConstant(
+            lambda: self.client.post(reverse('create_blog_post'), payload, content_type='application/json', **headers),
+            self.seed
+        )
+
+    def test_create_blog_post_requires_auth(self):
+        response = self.client.post(reverse('create_blog_post'), {'title': 'x', 'content': 'y'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_update_blog_post(self):
+        headers = self.auth()
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.put(
+                reverse('update_blog_post', args=[self.post.pk]),
+                {'title': 'Updated'}, content_type='application/json', **headers
+            ),
+            self.seed
+        )
+
+    def test_delete_blog_post(self):
+        headers = self.auth()
+
+        def seed(size):
+            self.seed(size + 1)
+            self.post = BlogPost.objects.order_by('-id').first()
+
+        seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.delete(reverse('delete_blog_post', args=[self.post.pk]), **headers),
+            seed
+        )
+
+
+class CompiledBlogPostSerializerTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_blog_posts(6, self.staff)
+        BlogPost.objects.filter(pk__in=BlogPost.objects.order_by('id').values('id')[:2]).update(featured_image=None)
+        BlogPost.objects.filter(pk=BlogPost.objects.order_by('id').values('id')[2:3]).update(featured_image='')
+        BlogPost.objects.filter(pk=BlogPost.objects.order_by('id').values('id')[3:4]).update(
+            created_at=datetime(2024, 2, 29, 23, 59, 59, tzinfo=dt_timezone.utc)
+        )
+
+    def assertParity(self, queryset):
+        expected = BlogPostSerializer(queryset, many=True).data
+        actual = compiled_blog_post_serializer.serialize(queryset)
+        for renderer in (ORJSONRenderer(), JSONRenderer()):
+            self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_matches_drf_serializer(self):
+        self.assertParity(BlogPost.objects.order_by('id'))
+
+    def test_matches_drf_serializer_in_other_timezone(self):
+        with timezone.override('America/New_York'):
+            self.assertParity(BlogPost.objects.order_by('id'))
+
+    def test_list_endpoint_body_unchanged(self):
+        posts = BlogPost.objects.filter(status='published').order_by('-created_at')
+        data = BlogPostSerializer(posts, many=True).data
+        expected = ORJSONRenderer().render({'success': True, 'data': data, 'total': len(data)})
+        self.assertEqual(self.client.get(reverse('get_all_blog_posts')).content, expected)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class BlogResponseCacheTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_blog_posts(3, self.staff)
+
+    def test_list_served_from_cache(self):
+        url = reverse('get_all_blog_posts')
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_not_found_is_not_cached(self):
+        url = reverse('get_blog_post', args=[999999])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('X-Cache', response)
+
+    def test_invalidated_when_a_post_changes(self):
+        url = reverse('get_all_blog_posts')
+        self.assertEqual(self.client.get(url).json()['total'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('create_blog_post'), {'title': 'New', 'content': 'Body', 'status': 'published'},
+                content_type='application/json', **self.auth()
+            )
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['total'], 4)
+
+    def test_invalidated_after_commit(self):
+        url = reverse('get_all_blog_posts')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title='New', content='Body', author=self.staff, status='published')
+            # Uncommitted: a miss now would cache rows other connections see
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    def test_stale_value_served_while_another_worker_recomputes(self):
+        get_or_compute('test', ('entry',), lambda: 'old', ttl=0, stale_ttl=60)
+        lock = _Lock(caches['default'], make_key('test', ('entry',)), 10)
+        self.assertTrue(lock.acquire())
+        try:
+            value, state = get_or_compute('test', ('entry',), lambda: self.fail('recomputed'), ttl=0, stale_ttl=60)
+        finally:
+            lock.release()
+        self.assertEqual((value, state), ('old', 'stale'))
+        self.assertEqual(get_or_compute('test', ('entry',), lambda: 'new', ttl=60)[0], 'new')
+
+    def test_miss_waits_for_the_worker_holding_the_lock(self):
+        key = make_key('test', ('entry',))
+        lock = _Lock(caches['default'], key, 10)
+        self.assertTrue(lock.acquire())
+
+        def finish():
+            caches['default'].set(key, ('computed elsewhere', time.time() + 60), 60)
+            lock.release()
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        value, state = get_or_compute('test', ('entry',), lambda: self.fail('recomputed'))
+        timer.join()
+        self.assertEqual((value, state), ('computed elsewhere', 'hit'))
+
+
+class BlogAsyncViewTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_blog_posts(5, self.staff)
+        seed_blog_posts(7, self.staff, status='draft')
+
+    async def test_matches_sync_views(self):
+        post = await BlogPost.objects.filter(status='published').afirst()
+        draft = await BlogPost.objects.filter(status='draft').afirst()
+        response = await self.assertAsyncGetMatches(reverse('get_all_blog_posts'))
+        self.assertEqual(response.json()['total'], 5)
+        await self.assertAsyncGetMatches(reverse('get_blog_post', args=[post.pk]))
+        await self.assertAsyncGetMatches(reverse('get_blog_post', args=[draft.pk]))
+
+    @override_settings(ROOT_URLCONF=ASGI_URLCONF)
+    async def test_other_methods_not_allowed(self):
+        response = await self.async_client.post(reverse('get_all_blog_posts'))
+        self.assertEqual(response.status_code, 405)
+        self.assertIn('GET', response['Allow'])
+
+    @override_settings(ROOT_URLCONF=ASGI_URLCONF, RESPONSE_CACHE_ENABLED=True)
+    async def test_served_from_cache(self):
+        url = reverse('get_all_blog_posts')
+        first = await self.async_client.get(url)
+        second = await self.async_client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+
+
+class BlogBatchTests(EndpointTestCase):
+    covers = ('get_blog_posts_batch',)
+
+    def setUp(self):
+        super().setUp()
+        seed_blog_posts(5, self.staff)
+        self.ids = list(BlogPost.objects.order_by('id').values_list('id', flat=True))
+        self.draft = BlogPost.objects.create(title='Draft', content='Body', author=self.staff, status='draft')
+
+    def batch(self, ids):
+        return self.client.get(reverse('get_blog_posts_batch'), {'ids': ids})
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_batch(self):
+        wanted = [self.ids[3], 999999, self.ids[0], self.draft.pk, self.ids[3], self.ids[2]]
+        with self.assertNumQueries(1):
+            body = self.batch(','.join(map(str, wanted))).json()
+        self.assertEqual([post['id'] for post in body['data']], [self.ids[3], self.ids[0], self.ids[2]])
+        self.assertEqual(body['missing'], [999999, self.draft.pk])
+        self.assertEqual(body['total'], 3)
+        post = BlogPost.objects.select_related('author').get(pk=self.ids[0])
+        expected = ORJSONRenderer().render(BlogPostSerializer(post).data)
+        self.assertEqual(ORJSONRenderer().render(body['data'][1]), expected)
+
+    @override_settings(BATCH_MAX_IDS=3)
+    def test_invalid_ids(self):
+        for ids in ('', '1,x', '0', '-1', '1,2,3,4', '99999999999999999999', str(2 ** 63)):
+            response = self.batch(ids)
+            self.assertEqual(response.status_code, 400, ids)
+            self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+        self.assertEqual(self.batch('1,2,3,1').status_code, 200)
+        self.assertEqual(self.batch(str(2 ** 63 - 1)).json()['missing'], [2 ** 63 - 1])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_objects_cached_individually(self):
+        first = self.batch(f'{self.ids[0]},{self.ids[1]}').json()
+        # Only the id not seen before is queried
+        with self.assertNumQueries(1) as queries:
+            second = self.batch(f'{self.ids[1]},{self.ids[2]}').json()
+        self.assertIn(f'IN ({self.ids[2]})', queries.captured_queries[0]['sql'])
+        self.assertEqual(second['data'][0], first['data'][1])
+        with self.assertNumQueries(0):
+            self.batch(f'{self.ids[2]},{self.ids[0]}')
+
+        BlogPost.objects.filter(pk=self.ids[0]).update(title='Renamed')
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.get(pk=self.ids[0]).save()
+        self.assertEqual(self.batch(str(self.ids[0])).json()['data'][0]['title'], 'Renamed')
+
+
+class BlogBulkTests(EndpointTestCase):
+    covers = ('bulk_create_blog_posts', 'bulk_update_blog_posts', 'bulk_delete_blog_posts')
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.auth()
+
+    def send(self, method, name, payload):
+        return getattr(self.client, method)(reverse(name), payload, content_type='application/json', **self.headers)
+
+    def assertQueriesIndependentOfSize(self, request):
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertLess(request(size).status_code, 300)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create(self):
+        payload = [{'title': f'Bulk {i}', 'content': 'Body'} for i in range(3)]
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.send('post', 'bulk_create_blog_posts', payload)
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([post['title'] for post in body['data']], ['Bulk 0', 'Bulk 1', 'Bulk 2'])
+        self.assertEqual(body['total'], 3)
+        self.assertTrue(all(post['id'] for post in body['data']))
+        self.assertEqual(BlogPost.objects.filter(status='published', author=self.staff).count(), 3)
+        self.assertEqual(invalidate.call_args_list, [mock.call('blog'), mock.call('home')])
+
+        self.assertQueriesIndependentOfSize(lambda size: self.send(
+            'post', 'bulk_create_blog_posts', [{'title': f'Sized {i}', 'content': 'Body'} for i in range(size)]
+        ))
+
+    def test_bulk_create_is_all_or_nothing(self):
+        payload = [
+            {'title': 'Valid', 'content': 'Body'},
+            {'content': 'No title'},
+            {'title': 'Missing image', 'content': 'Body', 'featured_image': 'blog/images/nope.jpg'},
+        ]
+        response = self.send('post', 'bulk_create_blog_posts', payload)
+        self.assertEqual(response.status_code, 400)
+        details = response.json()['error']['details']
+        self.assertEqual(details[0], {})
+        self.assertIn('title', details[1])
+        self.assertIn('featured_image', details[2])
+        self.assertFalse(BlogPost.objects.exists())
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_invalid_payloads(self):
+        for payload in ({'title': 'x'}, [], [{'title': 'x', 'content': 'y'}] * 3):
+            response = self.send('post', 'bulk_create_blog_posts', payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+        for payload in ({}, {'ids': [1, 'x']}, {'ids': [1, 2, 3]}):
+            self.assertEqual(self.send('delete', 'bulk_delete_blog_posts', payload).status_code, 400, payload)
+
+    def test_bulk_requires_auth(self):
+        self.headers = {}
+        self.assertEqual(self.send('post', 'bulk_create_blog_posts', [{'title': 'x'}]).status_code, 401)
+        self.assertEqual(self.send('put', 'bulk_update_blog_posts', [{'id': 1}]).status_code, 401)
+        self.assertEqual(self.send('delete', 'bulk_delete_blog_posts', {'ids': [1]}).status_code, 401)
+
+    def test_bulk_update(self):
+        seed_blog_posts(3, self.staff)
+        posts = list(BlogPost.objects.order_by('id'))
+        BlogPost.objects.update(updated_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+        payload = [{'id': posts[2].pk, 'title': 'Third'}, {'id': posts[0].pk, 'status': 'draft'}]
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.send('put', 'bulk_update_blog_posts', payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post['id'] for post in response.json()['data']], [posts[2].pk, posts[0].pk])
+        self.assertEqual(invalidate.call_args_list, [mock.call('blog'), mock.call('home')])
+
+        posts = list(BlogPost.objects.order_by('id'))
+        self.assertEqual((posts[2].title, posts[0].status), ('Third', 'draft'))
+        self.assertEqual((posts[0].title, posts[2].status), ('Post 0', 'published'))
+        self.assertEqual(posts[1].updated_at.year, 2020)
+        self.assertGreater(posts[0].updated_at.year, 2020)
+
+        seed_blog_posts(20, self.staff)
+        ids = list(BlogPost.objects.order_by('id').values_list('id', flat=True))
+        self.assertQueriesIndependentOfSize(lambda size: self.send(
+            'put', 'bulk_update_blog_posts', [{'id': pk, 'excerpt': 'Updated'} for pk in ids[:size]]
+        ))
+
+    def test_bulk_update_reports_each_item(self):
+        seed_blog_posts(2, self.staff)
+        first, second = BlogPost.objects.order_by('id')
+        payload = [
+            {'id': first.pk, 'title': 'Renamed'},
+            {'id': 999999, 'title': 'Gone'},
+            {'title': 'No id'},
+            {'id': second.pk, 'status': 'archived'},
+            {'id': first.pk, 'title': 'Twice'},
+        ]
+        response = self.send('put', 'bulk_update_blog_posts', payload)
+        self.assertEqual(response.status_code, 400)
+        details = response.json()['error']['details']
+        self.assertEqual(details[0], {})
+        self.assertEqual(details[1], {'id': ['Not found.']})
+        self.assertIn('id', details[2])
+        self.assertIn('status', details[3])
+        self.assertIn('id', details[4])
+        self.assertEqual(BlogPost.objects.get(pk=first.pk).title, first.title)
+
+    def test_bulk_delete(self):
+        seed_blog_posts(4, self.staff)
+        ids = list(BlogPost.objects.order_by('id').values_list('id', flat=True))
+        # Every deleted row sends post_delete; the namespaces still rotate once
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.send('delete', 'bulk_delete_blog_posts', {'ids': [ids[0], 999999, ids[2]]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], [ids[0], ids[2]])
+        self.assertEqual(response.json()['missing'], [999999])
+        self.assertEqual(list(BlogPost.objects.order_by('id').values_list('id', flat=True)), [ids[1], ids[3]])
+        self.assertEqual(invalidate.call_args_list, [mock.call('blog'), mock.call('home')])
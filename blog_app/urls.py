@@ -3,8 +3,12 @@ from . import views
 
 urlpatterns = [
     path('', views.get_all_blog_posts, name='get_all_blog_posts'),
+    path('batch/', views.get_blog_posts_batch, name='get_blog_posts_batch'),
     path('<int:pk>/', views.get_blog_post, name='get_blog_post'),
     path('create/', views.create_blog_post, name='create_blog_post'),
     path('<int:pk>/update/', views.update_blog_post, name='update_blog_post'),
     path('<int:pk>/delete/', views.delete_blog_post, name='delete_blog_post'),
+    path('bulk/create/', views.bulk_create_blog_posts, name='bulk_create_blog_posts'),
+    path('bulk/update/', views.bulk_update_blog_posts, name='bulk_update_blog_posts'),
+    path('bulk/delete/', views.bulk_delete_blog_posts, name='bulk_delete_blog_posts'),
 ]
@@ -3,8 +3,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from clickexpress_api import bulk
+from clickexpress_api.batch import batch_response
+from clickexpress_api.cache import cached_view
 from .models import BlogPost
-from .serializers import BlogPostSerializer
+from .serializers import BlogPostSerializer, BlogPostBulkSerializer, compiled_blog_post_serializer
+from .signals import invalidate_blog_cache
 
 
 class BlogPostListCreateView(generics.ListCreateAPIView):
@@ -30,6 +34,7 @@ class BlogPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
+@cached_view('blog')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_all_blog_posts(request):
@@ -38,14 +43,15 @@ def get_all_blog_posts(request):
     GET /blog-posts
     """
     blog_posts = BlogPost.objects.filter(status='published').order_by('-created_at')
-    serializer = BlogPostSerializer(blog_posts, many=True)
+    data = compiled_blog_post_serializer.serialize(blog_posts)
     return Response({
         'success': True,
-        'data': serializer.data,
-        'total': blog_posts.count()
+        'data': data,
+        'total': len(data)
     })
 
 
+@cached_view('blog')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_blog_post(request, pk):
@@ -54,7 +60,7 @@ def get_blog_post(request, pk):
     GET /blog-posts/:id
     """
     try:
-        blog_post = BlogPost.objects.get(pk=pk, status='published')
+        blog_post = BlogPost.objects.select_related('author').get(pk=pk, status='published')
         serializer = BlogPostSerializer(blog_post)
         return Response({
             'success': True,
@@ -70,6 +76,16 @@ def get_blog_post(request, pk):
         }, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_blog_posts_batch(request):
+    """
+    Get several published blog posts by id, in the requested order (public endpoint)
+    GET /blog-posts/batch?ids=1,2,3
+    """
+    return batch_response(request, 'blog', BlogPost.objects.filter(status='published'), compiled_blog_post_serializer)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_blog_post(request):
@@ -149,4 +165,40 @@ def delete_blog_post(request, pk):
                 'code': 'NOT_FOUND',
                 'message': 'Blog post not found'
             }
-        }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        }, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_create_blog_posts(request):
+    """
+    Create several blog posts in one transaction (admin only)
+    POST /blog-posts/bulk/create
+    """
+    return bulk.bulk_create(
+        request, BlogPostBulkSerializer, BlogPostSerializer, invalidate_blog_cache,
+        author=request.user, status='published'
+    )
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_blog_posts(request):
+    """
+    Update several blog posts in one transaction (admin only)
+    PUT /blog-posts/bulk/update
+    """
+    return bulk.bulk_update(
+        request, BlogPost.objects.select_related('author'), BlogPostBulkSerializer, BlogPostSerializer,
+        invalidate_blog_cache
+    )
+
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_delete_blog_posts(request):
+    """
+    Delete several blog posts in one transaction (admin only)
+    DELETE /blog-posts/bulk/delete
+    """
+    return bulk.bulk_delete(request, BlogPost.objects.all(), invalidate_blog_cache)
@@ -136,6 +136,8 @@ MAILGUN_FROM_EMAIL=noreply@clickexpress.ae
 # File Uploads
 MEDIA_ROOT=$PROJECT_DIR/media
 STATIC_ROOT=$PROJECT_DIR/static
+MEDIA_ACCEL_REDIRECT=/_protected_media/
+NUM_PROXIES=1
 EOF
 
 chown $PROJECT_USER:$PROJECT_USER $PROJECT_DIR/production.env
@@ -168,7 +170,7 @@ User=$PROJECT_USER
 Group=$PROJECT_USER
 WorkingDirectory=$PROJECT_DIR
 Environment=PATH=$PROJECT_DIR/venv/bin
-ExecStart=$PROJECT_DIR/venv/bin/gunicorn --workers 3 --bind 127.0.0.1:8000 clickexpress_api.wsgi:application
+ExecStart=$PROJECT_DIR/venv/bin/gunicorn -c gunicorn.conf.py clickexpress_api.wsgi:application
 ExecReload=/bin/kill -s HUP \$MAINPID
 Restart=always
 
@@ -201,7 +203,10 @@ server {
         alias $PROJECT_DIR/static/;
     }
 
-    location /media/ {
+    # Media goes through Django for the access check; Django answers with
+    # X-Accel-Redirect and nginx sends the file from here
+    location /_protected_media/ {
+        internal;
         alias $PROJECT_DIR/media/;
     }
 }
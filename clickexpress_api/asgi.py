@@ -2,6 +2,11 @@
 ASGI config for clickexpress_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serving through it switches the public endpoints to their async views
+(ASYNC_VIEWS); run it under uvicorn workers:
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+        gunicorn -c gunicorn.conf.py clickexpress_api.asgi:application
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +17,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clickexpress_api.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,75 @@
+"""
+Helpers for the async public endpoints served in ASGI mode.
+
+DRF's @api_view is sync only, so the async views are plain Django coroutines
+that reproduce the bits of DRF the public endpoints rely on: JSON and form
+bodies, CSRF exemption, 405 for other methods and the ORJSON-rendered
+envelope. They are only ever public (AllowAny), which the replica router
+reads from their permission_classes attribute.
+"""
+from functools import wraps
+
+import orjson
+from django.http import HttpResponse, QueryDict
+from rest_framework.permissions import AllowAny
+
+from .renderers import ORJSONRenderer
+
+_renderer = ORJSONRenderer()
+
+
+def render_json(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+class ParseError(Exception):
+    pass
+
+
+def request_data(request):
+    """
+    The parsed body: a dict for JSON, a QueryDict for form and multipart posts
+    """
+    if request.content_type == 'application/json':
+        if not request.body:
+            return {}
+        try:
+            return orjson.loads(request.body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+    if request.method == 'POST':
+        return request.POST
+    return QueryDict()
+
+
+def public_async_view(methods):
+    """
+    Async counterpart of @api_view(methods) + @permission_classes([AllowAny])
+    """
+    allowed = {method.upper() for method in methods} | {'OPTIONS'}
+    if 'GET' in allowed:
+        allowed.add('HEAD')
+    allow_header = ', '.join(sorted(allowed))
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                response = render_json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+                response['Allow'] = allow_header
+                return response
+            if request.method == 'OPTIONS':
+                response = HttpResponse()
+                response['Allow'] = allow_header
+                return response
+            try:
+                return await view_func(request, *args, **kwargs)
+            except ParseError as exc:
+                return render_json({'detail': str(exc)}, status=400)
+
+        # Same as @csrf_exempt, which wraps async views in a sync function in Django 4.2
+        wrapper.csrf_exempt = True
+        wrapper.permission_classes = (AllowAny,)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,170 @@
+"""
+Bulk create, update and delete for the admin endpoints.
+
+Each operation validates the whole list first and writes nothing unless
+every item is valid; errors come back in `details`, one entry per item in
+payload order (empty for valid items). The write is one bulk_create(),
+bulk_update() or filtered delete() inside one transaction.
+
+bulk_create() and bulk_update() send no model signals, so the app's change
+hook (its cache invalidation receiver) is called once for the batch instead;
+the post_delete signals of a bulk delete are collapsed the same way by
+deferred_invalidation().
+"""
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from .cache import deferred_invalidation
+
+
+class MediaPathField(serializers.CharField):
+    """
+    A file already in media storage (e.g. from the upload endpoint), given by
+    its storage name or its /media/ URL; image fields can't take uploads in a
+    JSON list
+    """
+
+    def to_internal_value(self, data):
+        name = super().to_internal_value(data)
+        if name.startswith(settings.MEDIA_URL):
+            name = name[len(settings.MEDIA_URL):]
+        try:
+            exists = default_storage.exists(name)
+        except SuspiciousFileOperation:
+            exists = False
+        if not exists:
+            raise serializers.ValidationError('File not found in media storage.')
+        return name
+
+
+def is_id(value):
+    """
+    Whether a decoded JSON value is an object id (JSON true/false decode to
+    bools, which are ints too)
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _error(code, message, details=None, status_code=status.HTTP_400_BAD_REQUEST):
+    error = {'code': code, 'message': message}
+    if details is not None:
+        error['details'] = details
+    return Response({'success': False, 'error': error}, status=status_code)
+
+
+def _items(data, key=None):
+    """
+    The payload list (or data[key]), or None when it isn't a list of
+    1..BULK_MAX_ITEMS items
+    """
+    if key is not None:
+        data = data.get(key) if isinstance(data, dict) else None
+    max_items = getattr(settings, 'BULK_MAX_ITEMS', 500)
+    if not isinstance(data, list) or not 1 <= len(data) <= max_items:
+        return None
+    return data
+
+
+def _invalid_payload(what):
+    max_items = getattr(settings, 'BULK_MAX_ITEMS', 500)
+    return _error('VALIDATION_ERROR', f'Expected {what} with 1 to {max_items} items')
+
+
+def bulk_create(request, serializer_class, output_serializer_class, on_change, **save_kwargs):
+    """
+    POST a list of objects; save_kwargs are set on every one (like
+    serializer.save(**save_kwargs))
+    """
+    items = _items(request.data)
+    if items is None:
+        return _invalid_payload('a list of objects')
+    serializer = serializer_class(data=items, many=True)
+    if not serializer.is_valid():
+        return _error('VALIDATION_ERROR', 'Invalid input data', serializer.errors)
+
+    model = serializer_class.Meta.model
+    instances = [model(**{**data, **save_kwargs}) for data in serializer.validated_data]
+    with deferred_invalidation():
+        with transaction.atomic():
+            model.objects.bulk_create(instances)
+        on_change(sender=model, instance=None)
+    data = output_serializer_class(instances, many=True).data
+    return Response({'success': True, 'data': data, 'total': len(data)}, status=status.HTTP_201_CREATED)
+
+
+def bulk_update(request, queryset, serializer_class, output_serializer_class, on_change):
+    """
+    PUT a list of partial objects, each with its `id`
+    """
+    items = _items(request.data)
+    if items is None:
+        return _invalid_payload('a list of objects')
+    ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+    instances = queryset.in_bulk([id_ for id_ in ids if is_id(id_)])
+
+    details = []
+    updates = []
+    seen = set()
+    for item, id_ in zip(items, ids):
+        if not is_id(id_) or id_ in seen:
+            details.append({'id': ['A unique object id is required.']})
+            continue
+        seen.add(id_)
+        if id_ not in instances:
+            details.append({'id': ['Not found.']})
+            continue
+        serializer = serializer_class(instances[id_], data=item, partial=True)
+        if serializer.is_valid():
+            details.append({})
+            updates.append((instances[id_], serializer.validated_data))
+        else:
+            details.append(serializer.errors)
+    if any(details):
+        return _error('VALIDATION_ERROR', 'Invalid input data', details)
+
+    fields = set()
+    for instance, validated_data in updates:
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+            fields.add(name)
+    # bulk_update() skips pre_save(), which is what sets auto_now fields
+    now = timezone.now()
+    for field in queryset.model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            for instance, _ in updates:
+                setattr(instance, field.attname, now)
+            fields.add(field.name)
+
+    changed = [instance for instance, _ in updates]
+    with deferred_invalidation():
+        with transaction.atomic():
+            if fields:
+                queryset.model.objects.bulk_update(changed, sorted(fields))
+        on_change(sender=queryset.model, instance=None)
+    data = output_serializer_class(changed, many=True).data
+    return Response({'success': True, 'data': data, 'total': len(data)})
+
+
+def bulk_delete(request, queryset, on_change):
+    """
+    DELETE {"ids": [...]}; ids that don't exist are reported, not an error
+    """
+    ids = _items(request.data, 'ids')
+    if ids is None or not all(is_id(id_) for id_ in ids):
+        return _invalid_payload('"ids", a list of integers,')
+
+    with deferred_invalidation():
+        with transaction.atomic():
+            existing = set(queryset.filter(pk__in=ids).select_for_update().values_list('pk', flat=True))
+            queryset.filter(pk__in=existing).delete()
+        on_change(sender=queryset.model, instance=None)
+    return Response({
+        'success': True,
+        'deleted': [id_ for id_ in dict.fromkeys(ids) if id_ in existing],
+        'missing': [id_ for id_ in dict.fromkeys(ids) if id_ not in existing],
+    })
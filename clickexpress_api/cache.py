@@ -0,0 +1,442 @@
+"""
+Shared response cache with stampede protection.
+
+Keys are namespaced ('blog', 'gallery', ...) and carry the namespace's
+current version stamp, so invalidating a namespace is a single write that
+orphans every entry in it. Each entry stores its value together with the time
+it stops being fresh; the cache keeps it for a further stale period.
+
+On a fresh hit the value is returned as is. Once it is stale, the first
+worker to take the entry's lock recomputes it while every other worker keeps
+serving the stale copy (stale-while-revalidate). On a miss only the lock
+holder computes; the others wait briefly for its result instead of all
+hitting the database at once (single flight).
+
+cache.add() is atomic on Redis and local memory but not on the file-based
+backend, so there the lock is an O_EXCL lock file in the cache directory.
+"""
+import asyncio
+import contextvars
+import hashlib
+import itertools
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from monitoring.metrics import record_cache
+
+from .compression import compress_variants, negotiate, set_encoding
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_INTERVAL = 0.05
+
+# Response headers that must never be replayed to another client
+UNCACHED_HEADERS = {'set-cookie', 'x-cache'}
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _namespace_key(namespace):
+    return f'ns:{namespace}'
+
+
+def namespace_version(namespace, cache=None):
+    """
+    The namespace's current version stamp, created on first use
+    """
+    cache = cache or _cache()
+    version = cache.get(_namespace_key(namespace))
+    if version is None:
+        cache.add(_namespace_key(namespace), uuid.uuid4().hex, None)
+        version = cache.get(_namespace_key(namespace))
+    return version
+
+
+_deferred_namespaces = contextvars.ContextVar('deferred_invalidations', default=None)
+
+
+def invalidate(namespace):
+    """
+    Orphan every entry in the namespace by rotating its version stamp
+    """
+    deferred = _deferred_namespaces.get()
+    if deferred is not None:
+        deferred.add(namespace)
+        return
+    _cache().set(_namespace_key(namespace), uuid.uuid4().hex, None)
+
+
+def invalidate_on_commit(namespace, using=None):
+    """
+    invalidate() once the current transaction commits (right away outside
+    one). Rotating earlier lets a concurrent miss recompute the old rows and
+    store them under the new version, to be served for a full TTL.
+    """
+    deferred = _deferred_namespaces.get()
+    if deferred is not None:
+        deferred.add(namespace)
+        return
+    transaction.on_commit(lambda: invalidate(namespace), using=using)
+
+
+@contextmanager
+def deferred_invalidation():
+    """
+    Collect the invalidate() and invalidate_on_commit() calls made in the
+    block and rotate each namespace once, after the commit, when it exits, so
+    a bulk write whose rows each fire a signal costs one cache write per
+    namespace.
+    """
+    if _deferred_namespaces.get() is not None:
+        # Nested: the outermost block does the work
+        yield
+        return
+    namespaces = set()
+    token = _deferred_namespaces.set(namespaces)
+    try:
+        yield
+    finally:
+        _deferred_namespaces.reset(token)
+        for namespace in sorted(namespaces):
+            invalidate_on_commit(namespace)
+
+
+def make_key(namespace, parts, cache=None):
+    return _versioned_key(namespace, namespace_version(namespace, cache), parts)
+
+
+def _versioned_key(namespace, version, parts):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'{namespace}:{version}:{digest}'
+
+
+class _Lock:
+    """
+    Per-entry recompute lock: cache.add() where it is atomic, an O_EXCL lock
+    file next to the file-based cache entries otherwise
+    """
+
+    def __init__(self, cache, key, timeout):
+        self.cache = cache
+        self.key = f'lock:{key}'
+        self.timeout = timeout
+        self.path = None
+        if isinstance(cache, FileBasedCache):
+            self.path = os.path.join(cache._dir, hashlib.md5(self.key.encode()).hexdigest() + '.lock')
+
+    def acquire(self):
+        if self.path is None:
+            return self.cache.add(self.key, 1, self.timeout)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) < self.timeout:
+                        return False
+                    # Holder died without releasing; break the lock and retry once
+                    os.unlink(self.path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def release(self):
+        if self.path is None:
+            self.cache.delete(self.key)
+            return
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Uncacheable:
+    """
+    Wrap a compute() result that must be returned but not stored
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def get_or_compute(namespace, parts, compute, ttl=None, stale_ttl=None, lock_timeout=None):
+    """
+    Return (value, state) for the entry identified by `parts` in `namespace`,
+    calling compute() at most once across workers when it is missing or stale.
+    state is 'hit', 'stale' or 'miss'. A result wrapped in Uncacheable is
+    handed back without being stored.
+    """
+    cache = _cache()
+    ttl = getattr(settings, 'RESPONSE_CACHE_TTL', 60) if ttl is None else ttl
+    stale_ttl = getattr(settings, 'RESPONSE_CACHE_STALE_TTL', 300) if stale_ttl is None else stale_ttl
+    lock_timeout = getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 10) if lock_timeout is None else lock_timeout
+
+    key = make_key(namespace, parts, cache)
+    lock = _Lock(cache, key, lock_timeout)
+    entry = cache.get(key)
+
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            record_cache(namespace, True)
+            return value, 'hit'
+        if not lock.acquire():
+            record_cache(namespace, True, stale=True)
+            return value, 'stale'
+    elif not lock.acquire():
+        # Someone else is computing it: wait for their result rather than pile on
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                record_cache(namespace, True)
+                return entry[0], 'hit'
+        logger.warning("Timed out waiting for cache entry %s; computing it here", key)
+        lock = None
+
+    record_cache(namespace, False)
+    try:
+        value = compute()
+        if isinstance(value, Uncacheable):
+            return value.value, 'miss'
+        cache.set(key, (value, time.time() + ttl), ttl + stale_ttl)
+        return value, 'miss'
+    finally:
+        if lock is not None:
+            lock.release()
+
+
+def get_many_or_compute(namespace, parts_by_id, compute_missing, ttl=None, stale_ttl=None):
+    """
+    {id: value} for many entries in `namespace`, read with one get_many().
+
+    compute_missing(ids) is called once for the ids whose entry is missing or
+    stale and returns {id: value}; those values are stored with one
+    set_many(), and ids it leaves out are neither returned nor cached. There
+    is no per-entry lock: a single call recomputes the whole remainder.
+    """
+    cache = _cache()
+    ttl = getattr(settings, 'RESPONSE_CACHE_TTL', 60) if ttl is None else ttl
+    stale_ttl = getattr(settings, 'RESPONSE_CACHE_STALE_TTL', 300) if stale_ttl is None else stale_ttl
+
+    version = namespace_version(namespace, cache)
+    keys = {id_: _versioned_key(namespace, version, parts) for id_, parts in parts_by_id.items()}
+    entries = cache.get_many(keys.values())
+    now = time.time()
+
+    found = {}
+    missing = []
+    for id_, key in keys.items():
+        entry = entries.get(key)
+        if entry is not None and now < entry[1]:
+            found[id_] = entry[0]
+        else:
+            missing.append(id_)
+        record_cache(namespace, id_ in found)
+
+    if missing:
+        computed = compute_missing(missing)
+        cache.set_many(
+            {keys[id_]: (value, now + ttl) for id_, value in computed.items()}, ttl + stale_ttl
+        )
+        found.update(computed)
+    return found
+
+
+async def aget_or_compute(namespace, parts, compute, ttl=None, stale_ttl=None, lock_timeout=None):
+    """
+    get_or_compute() for an async compute() coroutine function.
+
+    The blocking cache calls run in worker threads that never touch the
+    database; compute() is awaited on the event loop, so the ORM calls it
+    makes go through Django's usual async path.
+    """
+    def blocking(func):
+        return sync_to_async(func, thread_sensitive=False)
+
+    cache = _cache()
+    ttl = getattr(settings, 'RESPONSE_CACHE_TTL', 60) if ttl is None else ttl
+    stale_ttl = getattr(settings, 'RESPONSE_CACHE_STALE_TTL', 300) if stale_ttl is None else stale_ttl
+    lock_timeout = getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 10) if lock_timeout is None else lock_timeout
+
+    key = await blocking(make_key)(namespace, parts, cache)
+    lock = _Lock(cache, key, lock_timeout)
+    entry = await blocking(cache.get)(key)
+
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            record_cache(namespace, True)
+            return value, 'hit'
+        if not await blocking(lock.acquire)():
+            record_cache(namespace, True, stale=True)
+            return value, 'stale'
+    elif not await blocking(lock.acquire)():
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = await blocking(cache.get)(key)
+            if entry is not None:
+                record_cache(namespace, True)
+                return entry[0], 'hit'
+        logger.warning("Timed out waiting for cache entry %s; computing it here", key)
+        lock = None
+
+    record_cache(namespace, False)
+    try:
+        value = await compute()
+        if isinstance(value, Uncacheable):
+            return value.value, 'miss'
+        await blocking(cache.set)(key, (value, time.time() + ttl), ttl + stale_ttl)
+        return value, 'miss'
+    finally:
+        if lock is not None:
+            await blocking(lock.release)()
+
+
+def _buffer_stream(response):
+    """
+    Read a streaming body into memory, up to RESPONSE_CACHE_MAX_STREAM_BYTES.
+    True when all of it fit; otherwise False, and the response goes on
+    streaming (the chunks read so far first) without being cached, so a large
+    list keeps its flat memory use.
+    """
+    limit = getattr(settings, 'RESPONSE_CACHE_MAX_STREAM_BYTES', 1024 * 1024)
+    chunks = iter(response.streaming_content)
+    buffered = []
+    size = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            response.streaming_content = itertools.chain(buffered, chunks)
+            return False
+    response.streaming_content = buffered
+    return True
+
+
+def _freeze(response):
+    """
+    (status, headers, body, compressed bodies) of a rendered or streaming
+    response
+    """
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        if hasattr(response, 'render'):
+            response.render()
+        content = response.content
+    headers = [(name, value) for name, value in response.items() if name.lower() not in UNCACHED_HEADERS]
+    variants = {}
+    if getattr(settings, 'COMPRESSION_ENABLED', True) and response.status_code == 200:
+        variants = compress_variants(content, response.get('Content-Type', ''))
+    return response.status_code, headers, content, variants
+
+
+def _thaw(frozen, state, request):
+    # Entries written before compressed variants were stored have none
+    status, headers, content, variants = frozen if len(frozen) == 4 else (*frozen, {})
+    # The cached views are public; like CompressionMiddleware, never compress
+    # for a request carrying credentials
+    if variants and 'HTTP_AUTHORIZATION' not in request.META:
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    else:
+        encoding = None
+    response = HttpResponse(variants.get(encoding, content), status=status)
+    for name, value in headers:
+        response[name] = value
+    if variants:
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if encoding in variants:
+            set_encoding(response, encoding)
+    response['X-Cache'] = state.upper()
+    return response
+
+
+def _bypass(request):
+    return (
+        not getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+        or request.method not in ('GET', 'HEAD')
+        or 'text/html' in request.META.get('HTTP_ACCEPT', '')
+    )
+
+
+def _request_parts(request):
+    return (request.path, sorted(request.GET.lists()))
+
+
+def cached_view(namespace, ttl=None, stale_ttl=None):
+    """
+    Cache a public function view's successful GET responses in `namespace`.
+
+    Apply it above @api_view. The key is the path (including URL arguments)
+    plus the query string; requests for the browsable API bypass the cache.
+    Streaming responses are buffered into a single body when stored, along
+    with its Brotli/gzip encodings, and hits are served in the encoding the
+    client accepts; one larger than RESPONSE_CACHE_MAX_STREAM_BYTES streams
+    uncached instead.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if _bypass(request):
+                return view_func(request, *args, **kwargs)
+
+            def compute():
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or (response.streaming and not _buffer_stream(response)):
+                    return Uncacheable(response)
+                return _freeze(response)
+
+            value, state = get_or_compute(namespace, _request_parts(request), compute, ttl, stale_ttl)
+            if not isinstance(value, tuple):
+                return value
+            return _thaw(value, state, request)
+
+        return wrapper
+
+    return decorator
+
+
+def cached_async_view(namespace, ttl=None, stale_ttl=None):
+    """
+    cached_view for async views, sharing their entries with the sync views
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if _bypass(request):
+                return await view_func(request, *args, **kwargs)
+
+            async def compute():
+                response = await view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return Uncacheable(response)
+                return _freeze(response)
+
+            value, state = await aget_or_compute(namespace, _request_parts(request), compute, ttl, stale_ttl)
+            if not isinstance(value, tuple):
+                return value
+            return _thaw(value, state, request)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,200 @@
+"""
+Compiled read-only serialization for hot list endpoints.
+
+A CompiledReadSerializer takes an existing DRF ModelSerializer, turns its
+readable fields into a spec of (output key, ORM lookup, converter), and
+generates a specialised function that maps one `.values_list()` row to the
+dict the DRF serializer would have produced. The function is compiled once
+per process; serializing a row is then a single call with no Field objects,
+no get_attribute() traversal and no model instances.
+
+Only field types whose DRF representation can be reproduced exactly are
+supported; anything else raises ImproperlyConfigured when the serializer is
+compiled, so the fast path can never silently diverge from the DRF output.
+The output assumes no request in the serializer context (relative media
+URLs), which is how the public list views call their serializers.
+"""
+import datetime
+import re
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import api_settings
+
+
+# Names that filepath_to_uri() leaves untouched and urljoin() would simply
+# append: no leading slash, no dot segments, nothing that needs quoting
+_PLAIN_NAME = re.compile(r'(?!/)(?!\.)(?!.*/\.)[A-Za-z0-9_\-./]+')
+
+
+def _file_url(storage):
+    """
+    storage.url, skipping urljoin() for plain file names under a plain
+    FileSystemStorage base URL (urljoin dominates the per-row cost otherwise)
+    """
+    def url(name):
+        # __class__ resolves through default_storage's lazy wrapper
+        if storage.__class__.url is FileSystemStorage.url and _PLAIN_NAME.fullmatch(name):
+            base_url = storage.base_url
+            if base_url.endswith('/') and '?' not in base_url and '#' not in base_url:
+                return base_url + name
+        return storage.url(name)
+
+    return url
+
+
+def _datetime(value, field_timezone):
+    """
+    DateTimeField.to_representation for ISO 8601 output
+    """
+    if field_timezone is not None:
+        if timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = timezone.make_aware(value, field_timezone)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class CompiledReadSerializer:
+    """
+    Fast `.values_list()`-based stand-in for `serializer_class(qs, many=True).data`
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._lock = threading.Lock()
+        self._compiled = None
+
+    def compile(self):
+        """
+        Build the spec and the row function; safe to call more than once
+        """
+        if self._compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = self._build()
+        return self._compiled
+
+    @property
+    def lookups(self):
+        return self.compile()[0]
+
+    def values(self, queryset):
+        """
+        The queryset reduced to the columns the row function reads
+        """
+        return queryset.values_list(*self.lookups)
+
+    def serialize_rows(self, rows):
+        """
+        Serialize rows from values(queryset)
+        """
+        _, row_to_dict, uses_timezone = self.compile()
+        field_timezone = timezone.get_current_timezone() if uses_timezone else None
+        return [row_to_dict(row, field_timezone) for row in rows]
+
+    def serialize(self, queryset):
+        return self.serialize_rows(self.values(queryset))
+
+    def _build(self):
+        serializer = self.serializer_class()
+        model = serializer.Meta.model
+        lookups = []
+        expressions = []
+        namespace = {'_datetime': _datetime}
+        uses_timezone = False
+
+        for index, field in enumerate(serializer._readable_fields):
+            lookup, convert = self._field_spec(model, field, index, namespace)
+            lookups.append(lookup)
+            value = f'row[{index}]'
+            if convert is None:
+                expression = value
+            elif convert == 'file':
+                # FileField: empty names are falsy and render as None
+                expression = f'(_url_{index}({value}) if {value} else None)'
+            elif convert == 'file_name':
+                expression = f'({value} or None)'
+            elif convert == 'datetime':
+                uses_timezone = uses_timezone or settings.USE_TZ
+                expression = f'(None if {value} is None else _datetime({value}, tz))'
+            else:
+                expression = f'(None if {value} is None else {convert}({value}))'
+            expressions.append(f'{field.field_name!r}: {expression}')
+
+        source = 'def row_to_dict(row, tz):\n    return {' + ', '.join(expressions) + '}\n'
+        code = compile(source, f'<compiled {self.serializer_class.__name__}>', 'exec')
+        exec(code, namespace)
+        return tuple(lookups), namespace['row_to_dict'], uses_timezone
+
+    def _field_spec(self, model, field, index, namespace):
+        """
+        (ORM lookup, converter) for one DRF field; converter is None for
+        values the database driver already returns in their JSON form
+        """
+        name = f'{self.serializer_class.__name__}.{field.field_name}'
+        if field.source == '*' or not field.source_attrs:
+            raise ImproperlyConfigured(f'{name}: whole-object fields cannot be compiled')
+        lookup = '__'.join(field.source_attrs)
+        model_field = self._model_field(model, field.source_attrs)
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise ImproperlyConfigured(f'{name}: pk_field is not supported')
+            return lookup, None
+
+        if isinstance(field, fields.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return lookup, 'file_name'
+            if not isinstance(model_field, models.FileField):
+                raise ImproperlyConfigured(f'{name}: file fields must map to a model FileField')
+            namespace[f'_url_{index}'] = _file_url(model_field.storage)
+            return lookup, 'file'
+
+        if isinstance(field, fields.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format is None:
+                return lookup, None
+            if output_format.lower() != fields.ISO_8601 or hasattr(field, 'timezone'):
+                raise ImproperlyConfigured(f'{name}: only ISO 8601 output in the current timezone is supported')
+            return lookup, 'datetime'
+
+        if isinstance(field, fields.ChoiceField):
+            if any(not isinstance(key, str) for key in field.choice_strings_to_values.values()):
+                raise ImproperlyConfigured(f'{name}: only string choices are supported')
+            return lookup, None
+
+        if type(field) in (fields.CharField, fields.EmailField, fields.URLField, fields.SlugField):
+            if isinstance(model_field, (models.CharField, models.TextField)):
+                return lookup, None
+            return lookup, 'str'
+
+        if type(field) is fields.IntegerField:
+            if isinstance(model_field, (models.IntegerField, models.AutoField)):
+                return lookup, None
+            return lookup, 'int'
+
+        if type(field) is fields.BooleanField and isinstance(model_field, models.BooleanField):
+            return lookup, None
+
+        raise ImproperlyConfigured(f'{name}: {type(field).__name__} is not supported by the compiled serializer')
+
+    @staticmethod
+    def _model_field(model, source_attrs):
+        field = None
+        for attr in source_attrs:
+            field = model._meta.get_field(attr)
+            if field.is_relation and attr != source_attrs[-1]:
+                model = field.related_model
+        return field
+
@@ -0,0 +1,204 @@
+"""
+Response compression with Brotli/gzip negotiation.
+
+CompressionMiddleware compresses JSON and text responses for clients that
+send Accept-Encoding, preferring Brotli when the `brotli` package is
+installed (`pip install brotli`) and falling back to gzip. Bodies under
+COMPRESSION_MIN_SIZE bytes are sent as is; streaming responses are
+compressed chunk by chunk and flushed after each one, so rows still reach the
+client as they are produced.
+
+Only GET/HEAD responses of public views (AllowAny only) to requests without
+an Authorization header are compressed. Anything else may carry a token, a
+CSRF token or user data, and compressing secrets next to attacker-reflected
+input is what BREACH exploits.
+
+The response cache (clickexpress_api.cache) stores compressed variants next
+to each cached body, built once with compress_variants() at a higher level
+than the middleware can afford per request. A hit is then served already
+encoded and the middleware leaves it alone.
+"""
+import gzip
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .db_router import is_public_view
+from .middleware import DualModeMiddleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# On the fly vs stored in the response cache
+GZIP_LEVEL = 6
+GZIP_STORED_LEVEL = 9
+BROTLI_QUALITY = 4
+BROTLI_STORED_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'application/xml', 'text/')
+
+_accept_encoding_re = _lazy_re_compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*')
+
+
+def available_encodings():
+    """
+    Supported encodings, most preferred first
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """
+    The encoding to use for an Accept-Encoding header value, or None
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        match = _accept_encoding_re.fullmatch(part)
+        if not match:
+            continue
+        try:
+            weights[match[1].lower()] = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            continue
+    best, best_weight = None, 0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get('*', 0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return (
+        content_type.startswith(COMPRESSIBLE_TYPES)
+        and not response.has_header('Content-Encoding')
+        # Files keep sendfile() and their byte ranges
+        and not isinstance(response, FileResponse)
+    )
+
+
+def may_compress(request):
+    """
+    Whether the response to `request` can be compressed without exposing
+    secrets to BREACH; CompressionMiddleware.process_view marks public views
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and getattr(request, '_public_view', False)
+    )
+
+
+def compress(content, encoding, stored=False):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_STORED_QUALITY if stored else BROTLI_QUALITY)
+    # mtime=0 keeps the output byte-identical between runs (and workers)
+    return gzip.compress(content, compresslevel=GZIP_STORED_LEVEL if stored else GZIP_LEVEL, mtime=0)
+
+
+def compress_variants(content, content_type):
+    """
+    {encoding: body} for a cached response worth compressing, else {}
+    """
+    content_type = content_type.split(';')[0].strip().lower()
+    if len(content) < min_size() or not content_type.startswith(COMPRESSIBLE_TYPES):
+        return {}
+    variants = {}
+    for encoding in available_encodings():
+        compressed = compress(content, encoding, stored=True)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+async def acompress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        async for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        async for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def min_size():
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def set_encoding(response, encoding):
+    """
+    Headers for a body now encoded with `encoding`
+    """
+    response['Content-Encoding'] = encoding
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        # The encoded body is no longer byte-identical to what the tag describes
+        response['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware(DualModeMiddleware):
+    """
+    Compress responses to public requests for clients that accept Brotli or gzip
+    """
+    inline_process_view = True
+
+    def handle(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            not getattr(settings, 'COMPRESSION_ENABLED', True)
+            or not may_compress(request)
+            or not is_compressible(response)
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < min_size():
+            return response
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            # The length of the encoded stream isn't known up front
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        set_encoding(response, encoding)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._public_view = is_public_view(view_func)
@@ -0,0 +1,81 @@
+"""
+PostgreSQL backend that borrows connections from an in-process pool.
+
+Set ENGINE to 'clickexpress_api.db_pool' and add a 'POOL' dict to the
+database settings (see pool.DEFAULTS). Django still opens and closes its
+per-thread connection as usual (keep CONN_MAX_AGE at 0); opening checks a
+connection out of the pool and closing returns it, so threaded workers share
+a bounded set of server connections instead of one per thread.
+
+Pools are per process: a forked worker never reuses its parent's sockets.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, options):
+    """
+    The pool for this alias and connection target in the current process
+    """
+    # The test runner points the alias at a different database, so the
+    # target is part of the key
+    key = (alias, os.getpid(), tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(alias, options)
+        return pool
+
+
+def all_pools():
+    with _pools_lock:
+        return [pool for (_, pid, _), pool in _pools.items() if pid == os.getpid()]
+
+
+def close_pools(alias):
+    """
+    Close the idle connections of every pool for `alias` in this process
+    """
+    for pool in all_pools():
+        if pool.alias == alias:
+            pool.close()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # Idle pooled connections would otherwise block copying or dropping the
+    # test database
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        close_pools(self.connection.alias)
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, conn_params, self.settings_dict.get('POOL'))
+        connection = pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # A reused connection skipped the parent's get_new_connection(), which
+        # is where isolation_level is normally set
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        self._pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self._pool.checkin(self.connection)
@@ -0,0 +1,193 @@
+"""
+A small thread-safe pool of psycopg2 connections for one database alias.
+
+Connections are handed out LIFO so the hottest ones are reused and the rest
+age out. A connection is checked with `SELECT 1` before reuse only when it has
+sat idle longer than CHECK_AFTER seconds, is replaced once it is older than
+MAX_LIFETIME, and idle connections above MIN_SIZE are closed after MAX_IDLE
+seconds. At most MAX_SIZE connections exist at once; a checkout waits up to
+TIMEOUT seconds for one to be returned before raising OperationalError.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+from monitoring.metrics import DB_POOL_CHECKOUTS, DB_POOL_IDLE, DB_POOL_IN_USE, DB_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MIN_SIZE': 0,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 3600,
+    'CHECK_AFTER': 30,
+    'MAX_IDLE': 300,
+}
+
+
+class PoolTimeout(OperationalError):
+    """
+    No connection was returned to the pool within TIMEOUT seconds
+    """
+
+
+class ConnectionPool:
+    def __init__(self, alias, options=None):
+        options = {**DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.min_size = options['MIN_SIZE']
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.max_lifetime = options['MAX_LIFETIME']
+        self.check_after = options['CHECK_AFTER']
+        self.max_idle = options['MAX_IDLE']
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        # (connection, created, returned), most recently returned last
+        self._idle = deque()
+        # id(connection) -> created, for connections that are checked out
+        self._in_use = {}
+        self.checkouts = 0
+
+        self._wait = DB_POOL_WAIT_SECONDS.labels(alias)
+        self._in_use_gauge = DB_POOL_IN_USE.labels(alias)
+        self._idle_gauge = DB_POOL_IDLE.labels(alias)
+
+    def checkout(self, connect):
+        """
+        Return an open connection, reusing an idle one or calling connect()
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._wait.observe(time.monotonic() - start)
+            DB_POOL_CHECKOUTS.labels(self.alias, 'timeout').inc()
+            raise PoolTimeout(
+                f"No connection available in the '{self.alias}' pool after {self.timeout}s "
+                f"({self.max_size} in use)"
+            )
+        self._wait.observe(time.monotonic() - start)
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, created, returned = self._idle.pop()
+                    self._idle_gauge.dec()
+                if self._usable(connection, created, returned):
+                    self._checked_out(connection, created, 'reused')
+                    return connection
+                self._discard(connection)
+
+            connection = connect()
+            self._checked_out(connection, time.monotonic(), 'new')
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, connection):
+        """
+        Return a connection handed out by checkout(); broken ones are closed
+        """
+        with self._lock:
+            created = self._in_use.pop(id(connection), None)
+        if created is None:
+            # Not ours (or already returned): just close it
+            self._discard(connection)
+            return
+        self._in_use_gauge.dec()
+        try:
+            if self._reset(connection) and time.monotonic() - created < self.max_lifetime:
+                with self._lock:
+                    self._idle.append((connection, created, time.monotonic()))
+                    self._idle_gauge.inc()
+            else:
+                self._discard(connection)
+        finally:
+            self._slots.release()
+        self._trim()
+
+    def close(self):
+        """
+        Close every idle connection; checked-out ones are closed on checkin
+        """
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+            self._idle_gauge.dec(len(idle))
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'alias': self.alias,
+                'max_size': self.max_size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+            }
+
+    def _checked_out(self, connection, created, outcome):
+        with self._lock:
+            self._in_use[id(connection)] = created
+            self.checkouts += 1
+        self._in_use_gauge.inc()
+        DB_POOL_CHECKOUTS.labels(self.alias, outcome).inc()
+
+    def _usable(self, connection, created, returned):
+        now = time.monotonic()
+        if connection.closed or now - created >= self.max_lifetime:
+            return False
+        if now - returned < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            logger.info("Discarding broken pooled connection for '%s'", self.alias)
+            return False
+
+    def _reset(self, connection):
+        """
+        Roll back anything left open; False if the connection can't be reused
+        """
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                return False
+        return True
+
+    def _trim(self):
+        """
+        Close connections idle longer than MAX_IDLE, keeping MIN_SIZE open
+        """
+        expired = []
+        now = time.monotonic()
+        with self._lock:
+            # Oldest returns sit at the left
+            while len(self._idle) > self.min_size and now - self._idle[0][2] >= self.max_idle:
+                expired.append(self._idle.popleft()[0])
+                self._idle_gauge.dec()
+        for connection in expired:
+            self._discard(connection)
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,220 @@
+"""
+Read-replica routing for public endpoints.
+
+ReplicaRoutingMiddleware marks a request as replica-safe when it is a GET or
+HEAD served by a view whose only permission class is AllowAny, and the client
+has not written recently. ReplicaRouter then sends that request's reads to a
+healthy replica; everything else (writes, admin and authenticated traffic,
+management commands) uses the primary.
+
+Once a request writes, its remaining reads go to the primary and the response
+sets a short-lived cookie so the same client keeps reading from the primary
+until the replicas have caught up (REPLICA_STICKY_SECONDS).
+
+Each replica is pinged at most every REPLICA_HEALTH_CHECK_INTERVAL seconds per
+process; while none is healthy, reads fall back to the primary.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import AllowAny
+
+from .middleware import DualModeMiddleware
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'db_primary'
+
+_route = contextvars.ContextVar('db_route', default=None)
+
+
+class RouteState:
+    """
+    Routing decision for the request being served
+    """
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+class ReplicaHealth:
+    """
+    Per-process cache of replica health, refreshed at most once per interval
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # alias -> (healthy, checked at)
+        self._status = {}
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 5)
+        healthy, checked = self._status.get(alias, (False, None))
+        if checked is not None and time.monotonic() - checked < interval:
+            return healthy
+        if not self._lock.acquire(blocking=False):
+            # Another thread is checking; use the last known state meanwhile
+            return healthy
+        try:
+            now_healthy = self.check(alias)
+            if checked is not None and now_healthy != healthy:
+                log = logger.info if now_healthy else logger.warning
+                log("Replica '%s' is %s", alias, 'healthy again' if now_healthy else 'unhealthy; reading from primary')
+            self._status[alias] = (now_healthy, time.monotonic())
+            return now_healthy
+        finally:
+            self._lock.release()
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            connection.close()
+            return False
+
+    def reset(self):
+        self._status.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _route.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        healthy = [alias for alias in replicas() if replica_health.is_healthy(alias)]
+        return random.choice(healthy) if healthy else None
+
+    def db_for_write(self, model, **hints):
+        state = _route.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication
+        if db in replicas():
+            return False
+        return None
+
+
+def is_public_view(view_func):
+    """
+    True for views whose only permission is AllowAny: DRF function views
+    (through their generated class) and the async views, which carry
+    permission_classes themselves
+    """
+    permission_classes = getattr(getattr(view_func, 'cls', view_func), 'permission_classes', None)
+    return bool(permission_classes) and all(permission is AllowAny for permission in permission_classes)
+
+
+def route_stream(chunks, state):
+    """
+    Produce each chunk of a streaming body under the request's routing (its
+    queries run lazily, after the middleware returned). The route is set only
+    while a chunk is produced, so it never leaks into whatever runs in the same
+    context between chunks or after the stream is abandoned.
+    """
+    chunks = iter(chunks)
+    while True:
+        token = _route.set(state)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _route.reset(token)
+        yield chunk
+
+
+async def aroute_stream(chunks, state):
+    chunks = chunks.__aiter__()
+    while True:
+        token = _route.set(state)
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _route.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware(DualModeMiddleware):
+    """
+    Route public reads to replicas and pin recent writers to the primary.
+    Removed from the stack when no replicas are configured.
+    """
+    inline_process_view = True
+
+    def __init__(self, get_response):
+        if not replicas():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        state = RouteState()
+        token = _route.set(state)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            _route.reset(token)
+            raise
+        return self.finish(response, state, token)
+
+    async def ahandle(self, request):
+        state = RouteState()
+        token = _route.set(state)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            _route.reset(token)
+            raise
+        return self.finish(response, state, token)
+
+    @staticmethod
+    def finish(response, state, token):
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10), httponly=True, samesite='Lax'
+            )
+        _route.reset(token)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = aroute_stream(response.streaming_content, state)
+            else:
+                response.streaming_content = route_stream(response.streaming_content, state)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _route.get()
+        if (
+            state is not None
+            and request.method in ('GET', 'HEAD')
+            and STICKY_COOKIE not in request.COOKIES
+            and is_public_view(view_func)
+        ):
+            state.use_replica = True
@@ -0,0 +1,156 @@
+"""
+Serve files from MEDIA_ROOT without copying their bytes through Python.
+
+With MEDIA_ACCEL_REDIRECT set (the prefix of an `internal` nginx location
+aliased to MEDIA_ROOT), the response is an empty body with an
+X-Accel-Redirect header and nginx sends the file itself, ranges included.
+Otherwise the file goes out as a FileResponse, which gunicorn transmits with
+sendfile(); single byte ranges are served from an offset in the same file so
+they take that path too.
+
+Either way the response carries a strong ETag built from the file's mtime
+and size (uploads get unique names and are never rewritten in place) and
+Last-Modified, and conditional requests are answered with 304/412 before the
+file is opened.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.regex_helper import _lazy_re_compile
+
+_range_re = _lazy_re_compile(r'bytes=(\d*)-(\d*)')
+
+
+def media_path(name):
+    """
+    Absolute path of an existing file under MEDIA_ROOT, or Http404
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+    return path
+
+
+def file_etag(stat):
+    # nginx's format, so the tag is the same whichever of the two sends the file
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single satisfiable byte range, None to send
+    the whole file (no header, several ranges or a malformed one), or
+    'unsatisfiable'
+    """
+    match = _range_re.fullmatch(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    # Dates only validate when they are exact
+    return parse_http_date_safe(if_range) == last_modified
+
+
+class FileRange:
+    """
+    Read-only view of bytes [start, start + length) of an open file.
+
+    fileno() exposes the underlying descriptor, already positioned at start,
+    which is all gunicorn needs to sendfile() the range.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def serve_file(request, name, cache_control='private, max-age=0'):
+    """
+    Response for GET/HEAD of the media file `name`
+    """
+    path = media_path(name)
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, name, path, stat.st_size, etag, last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _file_response(request, name, path, size, etag, last_modified):
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if accel_prefix:
+        # nginx answers Range itself and takes Content-Type from here
+        response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(name)
+        return response
+
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        return FileResponse(file)
+    start, end = byte_range
+    response = FileResponse(FileRange(file, start, end - start + 1), status=206)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,138 @@
+"""
+Middleware building blocks that work in both WSGI and ASGI mode.
+
+Django runs a sync-only middleware in a worker thread when the stack is
+served asynchronously, and every such hop goes through the one
+thread-sensitive executor, which serializes requests. Middleware in this
+project therefore subclasses DualModeMiddleware and implements ahandle()
+next to handle().
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class DualModeMiddleware:
+    """
+    Base for middleware with a sync `handle()` and an async `ahandle()`.
+
+    A process_view() that never blocks can set inline_process_view: under
+    ASGI it is then called on the event loop instead of through a worker
+    thread.
+    """
+    sync_capable = True
+    async_capable = True
+    inline_process_view = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            if self.inline_process_view and hasattr(self, 'process_view'):
+                self.process_view = _on_loop(self.process_view)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        return await self.get_response(request)
+
+
+def _on_loop(process_view):
+    async def wrapper(request, view_func, view_args, view_kwargs):
+        return process_view(request, view_func, view_args, view_kwargs)
+
+    return wrapper
+
+
+class RouteScopedMiddleware(DualModeMiddleware):
+    """
+    Run the middleware in settings.ROUTE_SCOPED_MIDDLEWARE only for paths
+    under settings.ROUTE_SCOPED_MIDDLEWARE_PREFIXES.
+
+    Sessions, CSRF, request.user and messages only matter to the admin; the
+    API authenticates with JWT and its views are CSRF exempt. The scoped
+    middleware is chained here the way Django chains settings.MIDDLEWARE,
+    and their process_view hooks run from this middleware's own.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefixes = tuple(getattr(settings, 'ROUTE_SCOPED_MIDDLEWARE_PREFIXES', ('/admin/',)))
+        self.view_hooks = []
+        handler = get_response
+        for middleware_path in reversed(getattr(settings, 'ROUTE_SCOPED_MIDDLEWARE', [])):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_exception') or hasattr(middleware, 'process_template_response'):
+                raise ImproperlyConfigured(f'{middleware_path}: only process_view hooks can be route-scoped')
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            handler = middleware
+        self.scoped_response = handler
+        if iscoroutinefunction(get_response):
+            self.process_view = self.aprocess_view
+
+    def applies(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def handle(self, request):
+        if self.applies(request):
+            return self.scoped_response(request)
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        if self.applies(request):
+            return await self.scoped_response(request)
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.applies(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Other routes skip the hop to a worker thread entirely
+        if not self.applies(request):
+            return None
+        return await sync_to_async(RouteScopedMiddleware.process_view)(self, request, view_func, view_args, view_kwargs)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that stays on the event loop for everything but static files
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
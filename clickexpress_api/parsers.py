@@ -0,0 +1,15 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in replacement for DRF's JSONParser backed by orjson
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -51,21 +51,60 @@ INSTALLED_APPS = [
     'gallery',
     'upload',
     'contact',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.PerformanceMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
+    'clickexpress_api.db_router.ReplicaRoutingMiddleware',
+    'clickexpress_api.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'clickexpress_api.middleware.StaticFilesMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'clickexpress_api.middleware.RouteScopedMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Session, CSRF, user and messages middleware run only for these prefixes
+# (the admin); the JWT-authenticated API skips them
+ROUTE_SCOPED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
-
-ROOT_URLCONF = 'clickexpress_api.urls'
+ROUTE_SCOPED_MIDDLEWARE_PREFIXES = ['/admin/']
+
+# The admin checks look for its middleware in MIDDLEWARE; it is in
+# ROUTE_SCOPED_MIDDLEWARE instead
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# Server-Timing headers, per-request timing logs and per-view histograms
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=False, cast=bool)
+
+# Prometheus metrics served at /metrics to scrapers presenting METRICS_TOKEN.
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR must point at a directory shared by
+# all workers (gunicorn.conf.py sets it up); it has to be in the environment
+# before prometheus_client is imported.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
+# Slow query capture (see `manage.py slow_queries`)
+SLOW_QUERY_CAPTURE = config('SLOW_QUERY_CAPTURE', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=int)
+SLOW_QUERY_FLUSH_INTERVAL = config('SLOW_QUERY_FLUSH_INTERVAL', default=10, cast=int)
+SLOW_QUERY_EXPLAIN_PER_FLUSH = config('SLOW_QUERY_EXPLAIN_PER_FLUSH', default=3, cast=int)
+
+# ASYNC_VIEWS serves the public blog, gallery and contact endpoints from async
+# views (set by asgi.py; see clickexpress_api.urls_asgi)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+ROOT_URLCONF = 'clickexpress_api.urls_asgi' if ASYNC_VIEWS else 'clickexpress_api.urls'
 
 TEMPLATES = [
     {
@@ -106,9 +145,120 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='securepassword'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep each thread's connection open between requests, pinging it
+        # before reuse after an error or when a request starts
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# DB_POOL=True shares a bounded in-process pool between a worker's threads
+# (gunicorn --threads); Django then returns the connection to the pool at the
+# end of every request instead of holding one per thread.
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default'].update({
+        'ENGINE': 'clickexpress_api.db_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=0, cast=int),
+            'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+            'CHECK_AFTER': config('DB_POOL_CHECK_AFTER', default=30, cast=float),
+            'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        },
+    })
+
+# DB_ENGINE=sqlite switches to a local SQLite file (development and tests)
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+
+# Read replicas for public GET endpoints (clickexpress_api.db_router).
+# DB_REPLICAS is a comma-separated list of host[:port][/name] entries, each
+# using the primary's credentials (file paths under DB_ENGINE=sqlite). A second
+# local database, e.g. 'localhost/clickexpress_replica', works as a stand-in.
+# Under tests every replica mirrors the primary.
+DATABASE_REPLICAS = []
+for _index, _replica in enumerate(config('DB_REPLICAS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])):
+    _alias = f'replica_{_index + 1}'
+    DATABASES[_alias] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[_alias]['NAME'] = _replica
+    else:
+        _address, _, _name = _replica.partition('/')
+        _host, _, _port = _address.partition(':')
+        DATABASES[_alias].update({
+            'HOST': _host or DATABASES['default']['HOST'],
+            'PORT': _port or DATABASES['default']['PORT'],
+            'NAME': _name or DATABASES['default']['NAME'],
+        })
+    DATABASE_REPLICAS.append(_alias)
+DATABASE_ROUTERS = ['clickexpress_api.db_router.ReplicaRouter']
+# Seconds a client keeps reading from the primary after a write (replication lag)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+# Seconds between health checks of each replica
+REPLICA_HEALTH_CHECK_INTERVAL = config('REPLICA_HEALTH_CHECK_INTERVAL', default=5, cast=int)
+
+# Cache shared by every worker process: file-based by default, or any Redis
+# protocol server (Redis, Valkey, KeyDB, ...) with CACHE_BACKEND=redis, which
+# needs the `redis` package. Bump CACHE_VERSION to orphan every existing key.
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+if CACHE_BACKEND == 'redis':
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+    }
+elif CACHE_BACKEND == 'locmem':
+    _cache = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+else:
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+    }
+CACHES = {
+    'default': {
+        **_cache,
+        'KEY_PREFIX': 'clickexpress',
+        'VERSION': config('CACHE_VERSION', default=1, cast=int),
+        'TIMEOUT': 300,
+    }
+}
+
+# Public read endpoints (see clickexpress_api.cache.cached_view): fresh for
+# RESPONSE_CACHE_TTL seconds, then served stale for up to RESPONSE_CACHE_STALE_TTL
+# more while a single worker recomputes
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=60, cast=int)
+RESPONSE_CACHE_STALE_TTL = config('RESPONSE_CACHE_STALE_TTL', default=300, cast=int)
+RESPONSE_CACHE_LOCK_TIMEOUT = config('RESPONSE_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+# Streamed list bodies larger than this skip the cache and keep streaming
+RESPONSE_CACHE_MAX_STREAM_BYTES = config('RESPONSE_CACHE_MAX_STREAM_BYTES', default=1024 * 1024, cast=int)
+
+# Most ids one ?ids= batch lookup may ask for (see clickexpress_api.batch)
+BATCH_MAX_IDS = config('BATCH_MAX_IDS', default=100, cast=int)
+
+# Most items one bulk create/update/delete request may carry (see clickexpress_api.bulk)
+BULK_MAX_ITEMS = config('BULK_MAX_ITEMS', default=500, cast=int)
+
+# Brotli (with `pip install brotli`) or gzip for JSON and text responses of at
+# least COMPRESSION_MIN_SIZE bytes; cached responses keep their encoded copies
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+
+# Worker warm-up after a (re)start (see clickexpress_api.warmup); WARMUP_PATHS
+# are the public endpoints rendered to prime the response cache
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+WARMUP_PATHS = config(
+    'WARMUP_PATHS', default='/api/v1/home/,/api/v1/blog-posts/,/api/v1/gallery-images/',
+    cast=lambda value: [path.strip() for path in value.split(',') if path.strip()]
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -149,6 +299,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Prefix of an nginx `internal` location aliased to MEDIA_ROOT; media responses
+# then hand the file to nginx with X-Accel-Redirect (see clickexpress_api.media)
+MEDIA_ACCEL_REDIRECT = config('MEDIA_ACCEL_REDIRECT', default='')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -158,13 +311,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth_app.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'clickexpress_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'clickexpress_api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Reverse proxies in front of the app whose X-Forwarded-For hop is trusted.
+    # 0 (the default) uses REMOTE_ADDR, as a client can forge the header; the
+    # nginx deployments set 1 (production.env, clean_deploy.sh)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 # JWT Configuration
@@ -197,6 +363,22 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Authenticated users are resolved from the cache for this many seconds
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+# Serve read-only admin endpoints from token claims alone (no user lookup)
+AUTH_STATELESS_ADMIN_READS = config('AUTH_STATELESS_ADMIN_READS', default=False, cast=bool)
+
+# Revoked-token Bloom filters resync from the revoked_tokens table this often
+AUTH_REVOCATION_SYNC_INTERVAL = config('AUTH_REVOCATION_SYNC_INTERVAL', default=5, cast=int)
+AUTH_REVOCATION_REBUILD_INTERVAL = config('AUTH_REVOCATION_REBUILD_INTERVAL', default=600, cast=int)
+
+# Failed-login lockout (see auth_app.throttling.LoginThrottle)
+LOGIN_THROTTLE_USERNAME_ATTEMPTS = config('LOGIN_THROTTLE_USERNAME_ATTEMPTS', default=5, cast=int)
+LOGIN_THROTTLE_IP_ATTEMPTS = config('LOGIN_THROTTLE_IP_ATTEMPTS', default=20, cast=int)
+LOGIN_THROTTLE_WINDOW = config('LOGIN_THROTTLE_WINDOW', default=900, cast=int)
+LOGIN_THROTTLE_BASE_LOCKOUT = config('LOGIN_THROTTLE_BASE_LOCKOUT', default=1, cast=int)
+LOGIN_THROTTLE_MAX_LOCKOUT = config('LOGIN_THROTTLE_MAX_LOCKOUT', default=900, cast=int)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "https://www.clickexpress.ae",
@@ -232,6 +414,13 @@ ADMIN_EMAIL = config('ADMIN_EMAIL', default='admin@clickexpress.com')
 MAILGUN_API_KEY = config('MAILGUN_API_KEY', default='')
 MAILGUN_DOMAIN = config('MAILGUN_DOMAIN', default='')
 MAILGUN_FROM_EMAIL = config('MAILGUN_FROM_EMAIL', default='noreply@clickexpress.com')
+MAILGUN_API_BASE = config('MAILGUN_API_BASE', default='https://api.mailgun.net/v3')
+# Seconds; applies to the async client used in ASGI mode
+MAILGUN_TIMEOUT = config('MAILGUN_TIMEOUT', default=10, cast=float)
+
+# Contact message archival (see `manage.py archive_contact_messages`)
+CONTACT_MESSAGES_RETENTION_MONTHS = config('CONTACT_MESSAGES_RETENTION_MONTHS', default=12, cast=int)
+CONTACT_MESSAGES_ARCHIVE_DIR = config('CONTACT_MESSAGES_ARCHIVE_DIR', default=os.path.join(BASE_DIR, 'archive'))
 
 # Email Backend (for production)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'  # For production
@@ -0,0 +1,56 @@
+from django.http import StreamingHttpResponse
+
+from .compiled_serializers import CompiledReadSerializer
+from .renderers import ORJSONRenderer
+
+STREAM_CHUNK_SIZE = 500
+
+
+def stream_list_response(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream a list endpoint's {success, data, total} envelope.
+
+    Rows are read from a server-side cursor and serialized and encoded
+    `chunk_size` at a time, so memory stays flat regardless of table size and
+    the envelope header goes out before the first row is fetched. `total` is
+    counted while streaming, which saves the separate COUNT query. The body is
+    byte-identical to rendering the same envelope through a Response.
+
+    `serializer_class` may also be a CompiledReadSerializer, in which case
+    rows are read with values_list() instead of as model instances.
+    """
+    return StreamingHttpResponse(
+        _stream_envelope(queryset, serializer_class, chunk_size),
+        content_type='application/json'
+    )
+
+
+def _stream_envelope(queryset, serializer_class, chunk_size):
+    renderer = ORJSONRenderer()
+    if isinstance(serializer_class, CompiledReadSerializer):
+        queryset = serializer_class.values(queryset)
+        serialize = serializer_class.serialize_rows
+    else:
+        def serialize(batch):
+            return serializer_class(batch, many=True).data
+    yield b'{"success":true,"data":['
+
+    total = 0
+    batch = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        batch.append(instance)
+        if len(batch) == chunk_size:
+            yield _encode_batch(renderer, serialize, batch, total)
+            total += len(batch)
+            batch = []
+    if batch:
+        yield _encode_batch(renderer, serialize, batch, total)
+        total += len(batch)
+
+    yield b'],"total":%d}' % total
+
+
+def _encode_batch(renderer, serialize, batch, offset):
+    # Strip the enclosing brackets so consecutive batches join into one array
+    encoded = renderer.render(serialize(batch))[1:-1]
+    return b',' + encoded if offset else encoded
@@ -0,0 +1,448 @@
+import gzip
+import unittest
+from unittest import mock
+
+import orjson
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_UNKNOWN
+
+from blog_app import views as blog_views
+from blog_app.models import BlogPost
+from gallery.models import GalleryImage
+from monitoring.testing import EndpointTestCase, consume, seed_blog_posts, seed_contact_messages, seed_gallery_images
+from . import compression, warmup
+from .db_pool.pool import ConnectionPool, PoolTimeout
+from .db_router import STICKY_COOKIE, ReplicaHealth, ReplicaRouter, ReplicaRoutingMiddleware, replica_health
+from .middleware import RouteScopedMiddleware
+
+
+class FakeConnection:
+    """
+    The slice of a psycopg2 connection the pool touches
+    """
+
+    def __init__(self):
+        self.closed = 0
+        self.info = mock.Mock(transaction_status=TRANSACTION_STATUS_IDLE)
+        self.rolled_back = False
+        self.pings = 0
+
+    def cursor(self):
+        self.pings += 1
+        return mock.MagicMock()
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def pool(self, **options):
+        return ConnectionPool('default', {'MAX_SIZE': 2, 'TIMEOUT': 0.05, **options})
+
+    def test_reuses_most_recently_returned_connection(self):
+        pool = self.pool()
+        first, second = pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        pool.checkin(first)
+        pool.checkin(second)
+        self.assertIs(pool.checkout(FakeConnection), second)
+        self.assertEqual(pool.stats(), {'alias': 'default', 'max_size': 2, 'in_use': 1, 'idle': 1, 'checkouts': 3})
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = self.pool()
+        pool.checkout(FakeConnection)
+        held = pool.checkout(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        pool.checkin(held)
+        self.assertIs(pool.checkout(FakeConnection), held)
+
+    def test_failed_connect_releases_its_slot(self):
+        pool = self.pool(MAX_SIZE=1)
+
+        def refuse():
+            raise OSError('refused')
+
+        with self.assertRaises(OSError):
+            pool.checkout(refuse)
+        self.assertIsInstance(pool.checkout(FakeConnection), FakeConnection)
+
+    def test_checkin_rolls_back_or_discards(self):
+        pool = self.pool()
+        in_error, broken = pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        in_error.info.transaction_status = TRANSACTION_STATUS_INERROR
+        broken.info.transaction_status = TRANSACTION_STATUS_UNKNOWN
+        pool.checkin(in_error)
+        pool.checkin(broken)
+        self.assertTrue(in_error.rolled_back)
+        self.assertFalse(in_error.closed)
+        self.assertTrue(broken.closed)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_health_check_only_after_idle_period(self):
+        pool = self.pool(CHECK_AFTER=0)
+        connection = pool.checkout(FakeConnection)
+        pool.checkin(connection)
+        self.assertIs(pool.checkout(FakeConnection), connection)
+        self.assertEqual(connection.pings, 1)
+
+        pool = self.pool(CHECK_AFTER=60)
+        connection = pool.checkout(FakeConnection)
+        pool.checkin(connection)
+        pool.checkout(FakeConnection)
+        self.assertEqual(connection.pings, 0)
+
+    def test_expired_and_closed_connections_are_replaced(self):
+        pool = self.pool(MAX_LIFETIME=0)
+        old = pool.checkout(FakeConnection)
+        pool.checkin(old)
+        self.assertTrue(old.closed)
+
+        pool = self.pool()
+        dead = pool.checkout(FakeConnection)
+        pool.checkin(dead)
+        dead.closed = 2
+        self.assertIsNot(pool.checkout(FakeConnection), dead)
+
+    def test_idle_connections_trimmed_to_min_size(self):
+        pool = self.pool(MIN_SIZE=1, MAX_IDLE=0)
+        first, second = pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        pool.checkin(first)
+        pool.checkin(second)
+        self.assertEqual(pool.stats()['idle'], 1)
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(replica_health, 'is_healthy', return_value=True)
+        self.is_healthy = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+
+    def route(self, request, view, write=False):
+        """
+        (read alias chosen inside the view, response) for one request
+        """
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                self.router.db_for_write(BlogPost)
+            seen['read'] = self.router.db_for_read(BlogPost)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return seen['read'], response
+
+    def test_public_reads_use_replica(self):
+        alias, response = self.route(RequestFactory().get('/api/v1/blog-posts/1/'), blog_views.get_blog_post)
+        self.assertEqual(alias, 'replica_1')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        # Nothing is routed outside a request
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+
+    def test_admin_views_and_writes_use_primary(self):
+        factory = RequestFactory()
+        self.assertIsNone(self.route(factory.get('/api/v1/blog-posts/create/'), blog_views.create_blog_post)[0])
+        self.assertIsNone(self.route(factory.post('/api/v1/blog-posts/1/'), blog_views.get_blog_post)[0])
+
+    def test_write_sticks_client_to_primary(self):
+        factory = RequestFactory()
+        alias, response = self.route(factory.get('/api/v1/blog-posts/1/'), blog_views.get_blog_post, write=True)
+        self.assertIsNone(alias)
+        self.assertEqual(response.cookies[STICKY_COOKIE]['max-age'], 10)
+
+        request = factory.get('/api/v1/blog-posts/1/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        self.assertIsNone(self.route(request, blog_views.get_blog_post)[0])
+
+    def test_streaming_body_reads_use_replica(self):
+        reads = []
+
+        def body():
+            for _ in range(2):
+                reads.append(self.router.db_for_read(BlogPost))
+                yield b'chunk'
+
+        def get_response(request):
+            middleware.process_view(request, blog_views.get_all_blog_posts, (), {})
+            return StreamingHttpResponse(body())
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(RequestFactory().get('/api/v1/blog-posts/'))
+        # The route is only in effect while the body is produced
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+        self.assertEqual(consume(response), b'chunkchunk')
+        self.assertEqual(reads, ['replica_1', 'replica_1'])
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+
+    async def test_async_streaming_body_reads_use_replica(self):
+        reads = []
+
+        async def body():
+            for _ in range(2):
+                reads.append(self.router.db_for_read(BlogPost))
+                yield b'chunk'
+
+        async def get_response(request):
+            await middleware.process_view(request, blog_views.get_all_blog_posts, (), {})
+            return StreamingHttpResponse(body())
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = await middleware(RequestFactory().get('/api/v1/blog-posts/'))
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+        self.assertEqual([chunk async for chunk in response.streaming_content], [b'chunk', b'chunk'])
+        self.assertEqual(reads, ['replica_1', 'replica_1'])
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        self.is_healthy.return_value = False
+        self.assertIsNone(self.route(RequestFactory().get('/api/v1/blog-posts/1/'), blog_views.get_blog_post)[0])
+
+    @override_settings(REPLICA_HEALTH_CHECK_INTERVAL=60)
+    def test_health_checks_are_throttled(self):
+        health = ReplicaHealth()
+        with mock.patch.object(health, 'check', return_value=False) as check:
+            self.assertFalse(health.is_healthy('replica_1'))
+            self.assertFalse(health.is_healthy('replica_1'))
+        self.assertEqual(check.call_count, 1)
+
+
+class RouteScopedMiddlewareTests(EndpointTestCase):
+
+    def test_scoped_middleware_only_for_admin(self):
+        seen = {}
+
+        def get_response(request):
+            seen[request.path] = hasattr(request, 'session') and hasattr(request, 'user')
+            return HttpResponse()
+
+        middleware = RouteScopedMiddleware(get_response)
+        for path in ('/admin/login/', '/api/v1/blog-posts/', '/'):
+            middleware(RequestFactory().get(path))
+        self.assertEqual(seen, {'/admin/login/': True, '/api/v1/blog-posts/': False, '/': False})
+
+    def test_admin_login_keeps_csrf_and_session(self):
+        self.staff.is_superuser = True
+        self.staff.save()
+        client = self.client_class(enforce_csrf_checks=True)
+        credentials = {'username': 'admin', 'password': 'admin-password', 'next': '/admin/'}
+        self.assertEqual(client.post('/admin/login/', credentials).status_code, 403)
+
+        client.get('/admin/login/')
+        response = client.post('/admin/login/', {**credentials, 'csrfmiddlewaretoken': client.cookies['csrftoken'].value})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('sessionid', response.cookies)
+        self.assertEqual(client.get('/admin/').status_code, 200)
+
+    def test_api_sets_no_cookies(self):
+        response = self.client.get(reverse('get_all_blog_posts'))
+        self.assertFalse(response.cookies)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+    async def test_admin_under_asgi(self):
+        response = await self.async_client.get('/admin/login/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('csrftoken', response.cookies)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class WarmupTests(EndpointTestCase):
+
+    def test_primes_public_list_caches(self):
+        seed_blog_posts(3, self.staff)
+        timings = warmup.warm_up()
+        self.assertEqual(set(timings), set(warmup.PHASES))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('get_all_blog_posts'))
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['total'], 3)
+
+    def test_failed_phase_is_skipped(self):
+        with mock.patch.dict(warmup.PHASE_FUNCTIONS, urls=mock.Mock(side_effect=RuntimeError)), \
+                self.assertLogs('clickexpress_api.warmup', 'ERROR'):
+            timings = warmup.warm_up(warmup.MASTER_PHASES)
+        self.assertEqual(set(timings), {'imports', 'serializers'})
+
+    @override_settings(WARMUP_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(warmup.warm_up(), {})
+
+
+class CompressionTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_blog_posts(20, self.staff)
+
+    def test_negotiate(self):
+        preferred = compression.available_encodings()[0]
+        self.assertEqual(compression.negotiate('gzip'), 'gzip')
+        self.assertEqual(compression.negotiate('gzip, br'), preferred)
+        self.assertEqual(compression.negotiate('*'), preferred)
+        self.assertEqual(compression.negotiate('br;q=0.5, gzip;q=0.8'), 'gzip')
+        self.assertIsNone(compression.negotiate('gzip;q=0, br;q=0'))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate(''))
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_gzip_list(self):
+        url = reverse('get_all_blog_posts')
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    @unittest.skipUnless(compression.brotli, 'brotli is not installed')
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_brotli_list(self):
+        url = reverse('get_all_blog_posts')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), self.client.get(url).content)
+
+    def test_small_body_not_compressed(self):
+        response = self.client.get(reverse('get_blog_post', args=[999999]), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streaming(self):
+        chunks = [b'{"data":[', b'"row",' * 500, b'null]}']
+        middleware = compression.CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks), content_type='application/json')
+        )
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        middleware.process_view(request, blog_views.get_all_blog_posts, (), {})
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        parts = list(response.streaming_content)
+        # Every chunk is flushed as soon as it is produced
+        self.assertEqual(len(parts), len(chunks) + 1)
+        self.assertTrue(all(parts[:-1]))
+        self.assertEqual(gzip.decompress(b''.join(parts)), b''.join(chunks))
+
+    async def test_async_streaming(self):
+        async def body():
+            yield b'{"data":['
+            yield b'"row",' * 500
+            yield b'null]}'
+
+        async def get_response(request):
+            return StreamingHttpResponse(body(), content_type='application/json')
+
+        middleware = compression.CompressionMiddleware(get_response)
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        await middleware.process_view(request, blog_views.get_all_blog_posts, (), {})
+        response = await middleware(request)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(gzip.decompress(content), b'{"data":[' + b'"row",' * 500 + b'null]}')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_secrets_not_compressed(self):
+        # BREACH: nothing that may carry a token or user data is compressed
+        login = self.client.post(
+            reverse('login'), {'username': 'admin', 'password': 'admin-password'},
+            content_type='application/json', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(login.status_code, 200)
+        self.assertNotIn('Content-Encoding', login)
+        seed_contact_messages(20)
+        private = self.client.get(reverse('get_contact_messages'), HTTP_ACCEPT_ENCODING='gzip', **self.auth())
+        self.assertEqual(private.status_code, 200)
+        self.assertNotIn('Content-Encoding', private)
+        # A public endpoint too, when the request carries credentials
+        public = self.client.get(reverse('get_all_blog_posts'), HTTP_ACCEPT_ENCODING='gzip', **self.auth())
+        self.assertNotIn('Content-Encoding', public)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_responses_keep_compressed_variants(self):
+        url = reverse('get_all_blog_posts')
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual((first['X-Cache'], first['Content-Encoding']), ('MISS', 'gzip'))
+
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress, \
+                self.assertNumQueries(0):
+            hit = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            plain = self.client.get(url)
+        compress.assert_not_called()
+        self.assertEqual((hit['X-Cache'], hit['Content-Encoding']), ('HIT', 'gzip'))
+        self.assertIn('Accept-Encoding', hit['Vary'])
+        self.assertEqual(gzip.decompress(hit.content), plain.content)
+        self.assertNotIn('Content-Encoding', plain)
+
+
+class HomeEndpointTests(EndpointTestCase):
+    covers = ('get_home',)
+
+    def seed(self, size):
+        seed_blog_posts(size, self.staff)
+        seed_gallery_images(size)
+
+    def test_home(self):
+        self.seed(20)
+        BlogPost.objects.create(title='Draft', content='Body', author=self.staff, status='draft')
+        data = self.client.get(reverse('get_home')).json()['data']
+
+        latest = list(BlogPost.objects.filter(status='published').order_by('-created_at')[:6])
+        self.assertEqual([post['id'] for post in data['blog_posts']], [post.pk for post in latest])
+        self.assertNotIn('content', data['blog_posts'][0])
+        self.assertEqual(data['blog_posts'][0]['author_name'], 'admin')
+
+        self.assertEqual(list(data['gallery']), ['portfolio', 'gallery', 'testimonial', 'team'])
+        listed = orjson.loads(consume(self.client.get(reverse('get_all_gallery_images'))))['data']
+        for category, images in data['gallery'].items():
+            self.assertEqual(images, [image for image in listed if image['category'] == category][:4])
+
+    def test_limits(self):
+        self.seed(20)
+        data = self.client.get(reverse('get_home'), {'posts': 2, 'images': 1}).json()['data']
+        self.assertEqual(len(data['blog_posts']), 2)
+        self.assertEqual([len(images) for images in data['gallery'].values()], [1, 1, 1, 1])
+        for bad in ('0', '21', 'x'):
+            self.assertEqual(self.client.get(reverse('get_home'), {'posts': bad}).status_code, 400)
+
+    def test_empty_categories_are_listed(self):
+        data = self.client.get(reverse('get_home')).json()['data']
+        self.assertEqual(data, {'blog_posts': [], 'gallery': {'portfolio': [], 'gallery': [], 'testimonial': [], 'team': []}})
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_query_count(self):
+        self.assertQueryCountConstant(lambda: self.client.get(reverse('get_home')), self.seed)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('get_home'))
+        self.assertLatencyWithinBaseline('get_home', lambda: self.client.get(reverse('get_home')))
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_as_one_unit(self):
+        self.seed(5)
+        self.assertEqual(self.client.get(reverse('get_home'))['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('get_home'))['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GalleryImage.objects.create(src='gallery/images/new.jpg', alt='New', category='team')
+        response = self.client.get(reverse('get_home'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data']['gallery']['team'][0]['alt'], 'New')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title='Newest', content='Body', author=self.staff, status='published')
+        response = self.client.get(reverse('get_home'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data']['blog_posts'][0]['title'], 'Newest')
@@ -17,20 +17,23 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from django.http import HttpResponse
+from monitoring.views import metrics
+from upload.views import serve_media
+from .views import get_home
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/home/', get_home, name='get_home'),
     path('api/v1/auth/', include('auth_app.urls')),
     path('api/v1/blog-posts/', include('blog_app.urls')),
     path('api/v1/gallery-images/', include('gallery.urls')),
     path('api/v1/upload/', include('upload.urls')),
     path('api/v1/contact/', include('contact.urls')),
+    path('api/v1/monitoring/', include('monitoring.urls')),
+    path('metrics', metrics, name='metrics'),
+    # Access-checked media; nginx sends the bytes (see clickexpress_api.media)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', serve_media, name='serve_media'),
     # Add a simple root view
     path('', lambda request: HttpResponse('ClickExpress API is running!', content_type='text/plain')),
 ]
-
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
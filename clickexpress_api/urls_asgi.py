@@ -0,0 +1,21 @@
+"""
+URL configuration for ASGI mode: the public blog, gallery and contact
+endpoints resolve to their async views, everything else to the regular
+(sync) URLconf. Routes keep their names, so reverse() is unchanged.
+"""
+from django.urls import path
+
+from blog_app import async_views as blog_views
+from contact import async_views as contact_views
+from gallery import async_views as gallery_views
+
+from . import urls
+
+urlpatterns = [
+    path('api/v1/blog-posts/', blog_views.get_all_blog_posts, name='get_all_blog_posts'),
+    path('api/v1/blog-posts/<int:pk>/', blog_views.get_blog_post, name='get_blog_post'),
+    path('api/v1/gallery-images/', gallery_views.get_all_gallery_images, name='get_all_gallery_images'),
+    path('api/v1/gallery-images/<int:pk>/', gallery_views.get_gallery_image, name='get_gallery_image'),
+    path('api/v1/contact/', contact_views.send_contact_message, name='send_contact_message'),
+    path('api/v1/contact/newsletter/', contact_views.subscribe_newsletter, name='subscribe_newsletter'),
+] + urls.urlpatterns
@@ -0,0 +1,72 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from blog_app.models import BlogPost
+from blog_app.serializers import compiled_blog_post_summary_serializer
+from gallery.models import GalleryImage
+from gallery.serializers import compiled_gallery_image_serializer
+
+from .cache import cached_view
+
+HOME_POSTS = 6
+HOME_IMAGES_PER_CATEGORY = 4
+HOME_MAX_ITEMS = 20
+
+
+def _bounded_int(request, name, default):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    value = int(value)
+    if not 1 <= value <= HOME_MAX_ITEMS:
+        raise ValueError
+    return value
+
+
+@cached_view('home')
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_home(request):
+    """
+    Everything the landing page shows in one call (public endpoint): the
+    latest published post summaries and the first images of each gallery
+    category, in two queries
+    GET /home?posts=6&images=4
+    """
+    try:
+        posts = _bounded_int(request, 'posts', HOME_POSTS)
+        images = _bounded_int(request, 'images', HOME_IMAGES_PER_CATEGORY)
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': f'posts and images must be integers between 1 and {HOME_MAX_ITEMS}'
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    blog_posts = BlogPost.objects.filter(status='published').order_by('-created_at')[:posts]
+
+    # Top `images` per category in one query; same order as the gallery list
+    gallery_images = GalleryImage.objects.annotate(
+        category_rank=Window(
+            RowNumber(),
+            partition_by=F('category'),
+            order_by=(F('display_order').asc(), F('created_at').desc(), F('id').asc()),
+        )
+    ).filter(category_rank__lte=images).order_by('category', 'category_rank')
+
+    gallery = {category: [] for category, _ in GalleryImage.CATEGORY_CHOICES}
+    for image in compiled_gallery_image_serializer.serialize(gallery_images):
+        gallery.setdefault(image['category'], []).append(image)
+
+    return Response({
+        'success': True,
+        'data': {
+            'blog_posts': compiled_blog_post_summary_serializer.serialize(blog_posts),
+            'gallery': gallery,
+        }
+    })
@@ -0,0 +1,143 @@
+"""
+Worker warm-up, so the first requests after a deploy or restart don't pay for
+lazy initialisation.
+
+Phases, in order:
+
+  imports      the views, serializers, URL and email modules of every local
+               app (contact.email_service pulls in requests and httpx)
+  urls         populate the URL resolvers and compile every route's regex
+  serializers  build each serializer's fields and the compiled read
+               serializers' row functions
+  connections  open a connection to the primary and each replica
+  caches       render the public home and list endpoints (WARMUP_PATHS)
+               through their cached views, priming the shared response cache
+
+gunicorn.conf.py runs the first three in the master when the app is preloaded
+(the work is then shared copy-on-write by every worker) and all of them in
+each worker after it has loaded the app. A failing phase is logged and
+skipped; warm-up never stops a worker from starting.
+"""
+import importlib
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils.module_loading import module_has_submodule
+from rest_framework import serializers
+
+from .compiled_serializers import CompiledReadSerializer
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('imports', 'urls', 'serializers', 'connections', 'caches')
+
+# Safe before fork: no sockets or database connections
+MASTER_PHASES = ('imports', 'urls', 'serializers')
+
+WARMUP_SUBMODULES = ('urls', 'views', 'async_views', 'serializers', 'email_service', 'admin')
+
+DEFAULT_WARMUP_PATHS = ['/api/v1/home/', '/api/v1/blog-posts/', '/api/v1/gallery-images/']
+
+
+def local_app_configs():
+    base_dir = Path(settings.BASE_DIR).resolve()
+    return [config for config in apps.get_app_configs() if base_dir in Path(config.path).resolve().parents]
+
+
+def import_modules():
+    for config in local_app_configs():
+        for name in WARMUP_SUBMODULES:
+            if module_has_submodule(config.module, name):
+                importlib.import_module(f'{config.name}.{name}')
+    importlib.import_module(settings.ROOT_URLCONF)
+
+
+def _compile_patterns(resolver):
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            _compile_patterns(pattern)
+
+
+def build_urls():
+    for urlconf in {settings.ROOT_URLCONF, 'clickexpress_api.urls'}:
+        resolver = get_resolver(urlconf)
+        # Populates the reverse lookups for every namespace
+        resolver.reverse_dict
+        _compile_patterns(resolver)
+
+
+def build_serializers():
+    for config in local_app_configs():
+        if not module_has_submodule(config.module, 'serializers'):
+            continue
+        module = importlib.import_module(f'{config.name}.serializers')
+        for value in vars(module).values():
+            if isinstance(value, CompiledReadSerializer):
+                value.compile()
+            elif (
+                isinstance(value, type)
+                and issubclass(value, serializers.ModelSerializer)
+                and value.__module__ == module.__name__
+            ):
+                value().fields
+
+
+def open_connections():
+    for alias in connections:
+        connection = connections[alias]
+        connection.ensure_connection()
+        if connection.settings_dict['ENGINE'] == 'clickexpress_api.db_pool':
+            # Back into the pool, where any of the worker's threads picks it up
+            connection.close()
+
+
+def prime_caches():
+    for path in getattr(settings, 'WARMUP_PATHS', DEFAULT_WARMUP_PATHS):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.path = request.path_info = path
+        request.META = {'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'REQUEST_METHOD': 'GET'}
+        # The sync views share their cache entries with the async ones
+        match = resolve(path, urlconf='clickexpress_api.urls')
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200:
+            logger.warning("Warm-up request for %s returned %s", path, response.status_code)
+
+
+PHASE_FUNCTIONS = {
+    'imports': import_modules,
+    'urls': build_urls,
+    'serializers': build_serializers,
+    'connections': open_connections,
+    'caches': prime_caches,
+}
+
+
+def warm_up(phases=PHASES):
+    """
+    Run the given phases and return {phase: seconds} for those that succeeded
+    """
+    if not getattr(settings, 'WARMUP_ENABLED', True):
+        return {}
+    timings = {}
+    for phase in phases:
+        start = time.perf_counter()
+        try:
+            PHASE_FUNCTIONS[phase]()
+        except Exception:
+            logger.exception("Warm-up phase '%s' failed", phase)
+            continue
+        timings[phase] = time.perf_counter() - start
+    logger.info(
+        "Warm-up done in %.0f ms (%s)",
+        sum(timings.values()) * 1000,
+        ', '.join(f'{phase} {seconds * 1000:.0f} ms' for phase, seconds in timings.items()),
+    )
+    return timings
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+
+from clickexpress_api.async_views import public_async_view, render_json, request_data
+from .models import ContactMessage
+from .serializers import (
+    ContactMessageSerializer,
+    ContactMessageCreateSerializer,
+    NewsletterSubscriberSerializer,
+    NewsletterSubscribeSerializer
+)
+from .email_service import AsyncMailgunService, DjangoEmailService
+
+logger = logging.getLogger(__name__)
+
+
+def validation_error(serializer):
+    return render_json({
+        'success': False,
+        'error': {
+            'code': 'VALIDATION_ERROR',
+            'message': 'Invalid input data',
+            'details': serializer.errors
+        }
+    }, status=400)
+
+
+def send_with_django_email(contact_message):
+    django_email = DjangoEmailService()
+    django_email.send_contact_notification(contact_message)
+    django_email.send_contact_confirmation(contact_message)
+
+
+@public_async_view(['POST'])
+async def send_contact_message(request):
+    """
+    Send contact message endpoint (ASGI mode)
+    POST /contact/
+
+    The admin notification and the confirmation go out concurrently; the
+    blocking Django email fallback runs in a worker thread.
+    """
+    serializer = ContactMessageCreateSerializer(data=request_data(request))
+    if not serializer.is_valid():
+        return validation_error(serializer)
+    contact_message = await ContactMessage.objects.acreate(**serializer.validated_data)
+
+    email_sent = False
+    try:
+        mailgun = AsyncMailgunService()
+        if mailgun.api_key and mailgun.domain:
+            await asyncio.gather(
+                mailgun.send_contact_notification(contact_message),
+                mailgun.send_contact_confirmation(contact_message),
+            )
+            email_sent = True
+    except Exception as e:
+        logger.error(f"Mailgun error: {e}")
+
+    if not email_sent:
+        try:
+            await sync_to_async(send_with_django_email, thread_sensitive=False)(contact_message)
+        except Exception as e:
+            logger.error(f"Django email error: {e}")
+
+    return render_json({
+        'success': True,
+        'message': 'Your message has been sent successfully!',
+        'data': ContactMessageSerializer(contact_message).data
+    }, status=201)
+
+
+@public_async_view(['POST'])
+async def subscribe_newsletter(request):
+    """
+    Subscribe to newsletter endpoint (ASGI mode)
+    POST /newsletter/
+    """
+    serializer = NewsletterSubscribeSerializer(data=request_data(request))
+    # Validation checks the unique email against the database
+    if not await sync_to_async(serializer.is_valid)():
+        return validation_error(serializer)
+    subscriber = await sync_to_async(serializer.save)()
+
+    try:
+        mailgun = AsyncMailgunService()
+        if mailgun.api_key and mailgun.domain:
+            await mailgun.send_newsletter_confirmation(subscriber.email)
+    except Exception as e:
+        logger.error(f"Newsletter confirmation email error: {e}")
+
+    return render_json({
+        'success': True,
+        'message': 'Successfully subscribed to newsletter!',
+        'data': NewsletterSubscriberSerializer(subscriber).data
+    }, status=201)
@@ -1,8 +1,14 @@
+import asyncio
+import weakref
+
+import httpx
 import requests
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.core.mail import send_mail
 import logging
+from monitoring.metrics import time_email
+from monitoring.timing import measure
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +22,13 @@ class MailgunService:
         self.api_key = getattr(settings, 'MAILGUN_API_KEY', None)
         self.domain = getattr(settings, 'MAILGUN_DOMAIN', None)
         self.from_email = getattr(settings, 'MAILGUN_FROM_EMAIL', 'noreply@clickexpress.com')
+        self.api_base = getattr(settings, 'MAILGUN_API_BASE', 'https://api.mailgun.net/v3')
     
-    def send_email(self, to_email, subject, html_content, text_content=None):
+    def build_message(self, to_email, subject, html_content, text_content=None):
         """
-        Send email via Mailgun API
+        (url, form data) of a Mailgun messages API call
         """
-        if not self.api_key or not self.domain:
-            logger.error("Mailgun API key or domain not configured")
-            return False
-        
-        url = f"https://api.mailgun.net/v3/{self.domain}/messages"
+        url = f"{self.api_base}/{self.domain}/messages"
         
         data = {
             "from": self.from_email,
@@ -36,24 +39,39 @@ class MailgunService:
         
         if text_content:
             data["text"] = text_content
+        return url, data
+    
+    def send_email(self, to_email, subject, html_content, text_content=None):
+        """
+        Send email via Mailgun API
+        """
+        if not self.api_key or not self.domain:
+            logger.error("Mailgun API key or domain not configured")
+            return False
         
-        try:
-            response = requests.post(
-                url,
-                auth=("api", self.api_key),
-                data=data
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Email sent successfully to {to_email}")
-                return True
-            else:
-                logger.error(f"Failed to send email: {response.status_code} - {response.text}")
-                return False
+        url, data = self.build_message(to_email, subject, html_content, text_content)
+        
+        with time_email('mailgun') as outcome:
+            try:
+                with measure('http'):
+                    response = requests.post(
+                        url,
+                        auth=("api", self.api_key),
+                        data=data
+                    )
                 
-        except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
-            return False
+                if response.status_code == 200:
+                    outcome['value'] = 'sent'
+                    logger.info(f"Email sent successfully to {to_email}")
+                    return True
+                else:
+                    outcome['value'] = 'failed'
+                    logger.error(f"Failed to send email: {response.status_code} - {response.text}")
+                    return False
+                    
+            except Exception as e:
+                logger.error(f"Error sending email: {str(e)}")
+                return False
     
     def send_contact_notification(self, contact_message):
         """
@@ -112,6 +130,52 @@ class MailgunService:
         return self.send_email(email, subject, html_content)
 
 
+# One client (and connection pool) per event loop; ASGI workers run a single loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(timeout=getattr(settings, 'MAILGUN_TIMEOUT', 10))
+    return client
+
+
+class AsyncMailgunService(MailgunService):
+    """
+    Mailgun email service for the async views. send_email() is a coroutine,
+    so every send_* method returns an awaitable.
+    """
+    
+    async def send_email(self, to_email, subject, html_content, text_content=None):
+        """
+        Send email via Mailgun API without blocking the event loop
+        """
+        if not self.api_key or not self.domain:
+            logger.error("Mailgun API key or domain not configured")
+            return False
+        
+        url, data = self.build_message(to_email, subject, html_content, text_content)
+        
+        with time_email('mailgun') as outcome:
+            try:
+                with measure('http'):
+                    response = await _async_client().post(url, auth=("api", self.api_key), data=data)
+                
+                if response.status_code == 200:
+                    outcome['value'] = 'sent'
+                    logger.info(f"Email sent successfully to {to_email}")
+                    return True
+                outcome['value'] = 'failed'
+                logger.error(f"Failed to send email: {response.status_code} - {response.text}")
+                return False
+            
+            except Exception as e:
+                logger.error(f"Error sending email: {str(e)}")
+                return False
+
+
 # Fallback email service using Django's built-in email
 class DjangoEmailService:
     """
@@ -139,18 +203,20 @@ class DjangoEmailService:
         Received at: {contact_message.created_at}
         """
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [admin_email],
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
-            return False
+        with time_email('django') as outcome:
+            try:
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [admin_email],
+                    fail_silently=False,
+                )
+                outcome['value'] = 'sent'
+                return True
+            except Exception as e:
+                logger.error(f"Error sending email: {str(e)}")
+                return False
     
     def send_contact_confirmation(self, contact_message):
         """
@@ -169,15 +235,17 @@ class DjangoEmailService:
         ClickExpress Team
         """
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [contact_message.email],
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
-            return False
+        with time_email('django') as outcome:
+            try:
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [contact_message.email],
+                    fail_silently=False,
+                )
+                outcome['value'] = 'sent'
+                return True
+            except Exception as e:
+                logger.error(f"Error sending email: {str(e)}")
+                return False
@@ -0,0 +1,104 @@
+import gzip
+import os
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from contact.partitions import (
+    PARENT_TABLE,
+    add_months,
+    ensure_partitions,
+    expired_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    """
+    Premake upcoming contact_messages partitions and archive old ones.
+
+    Every closed monthly partition older than the retention window is dumped to
+    a gzipped CSV file, then detached and dropped, so only recent months stay
+    in the live table. Intended to run daily from cron.
+    """
+    help = 'Archive contact message partitions older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months', type=int,
+            default=getattr(settings, 'CONTACT_MESSAGES_RETENTION_MONTHS', 12),
+            help='Number of closed months to keep in the live table'
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=getattr(settings, 'CONTACT_MESSAGES_ARCHIVE_DIR', 'archive'),
+            help='Directory the compressed partition dumps are written to'
+        )
+        parser.add_argument(
+            '--premake-months', type=int, default=3,
+            help='Number of future monthly partitions to create ahead of time'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report which partitions would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Contact message partitioning requires PostgreSQL.')
+        if options['retention_months'] < 1:
+            raise CommandError('--retention-months must be at least 1.')
+
+        now = datetime.now(timezone.utc)
+        current_month = month_start(now)
+
+        with connection.cursor() as cursor:
+            if not is_partitioned(cursor):
+                raise CommandError(f'{PARENT_TABLE} is not partitioned; run migrations first.')
+            if not options['dry_run']:
+                ensure_partitions(cursor, current_month, add_months(current_month, options['premake_months']))
+            expired = expired_partitions(list_partitions(cursor), now, options['retention_months'])
+
+        if not expired:
+            self.stdout.write('No partitions older than the retention window.')
+            return
+
+        if options['dry_run']:
+            for name in expired:
+                self.stdout.write(f'Would archive {name}')
+            return
+
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for name in expired:
+            path, rows = self.archive_partition(name, options['output_dir'])
+            self.stdout.write(self.style.SUCCESS(f'Archived {name}: {rows} rows -> {path}'))
+
+    def archive_partition(self, name, output_dir):
+        """
+        Dump one partition and drop it in a single transaction. The partition is
+        locked against writes while it is copied; the parent is only locked for
+        the final detach, so inserts into the hot partition are not blocked.
+        """
+        path = os.path.join(output_dir, f'{name}.csv.gz')
+        tmp_path = f'{path}.tmp'
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {name} IN SHARE MODE')
+            cursor.execute(f'SELECT count(*) FROM {name}')
+            rows = cursor.fetchone()[0]
+
+            with open(tmp_path, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                    cursor.copy_expert(f'COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, path)
+
+            cursor.execute(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}')
+            cursor.execute(f'DROP TABLE {name}')
+
+        return path, rows
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from contact.partitions import is_partitioned, partition_table, unpartition_table
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            partition_table(cursor)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            unpartition_table(cursor)
+
+
+class Migration(migrations.Migration):
+    """
+    Range-partition contact_messages by month on created_at (PostgreSQL only).
+    The Django model keeps `id` as its primary key; the table-level key becomes
+    (id, created_at) because PostgreSQL requires the partition key in it.
+    """
+
+    dependencies = [
+        ('contact', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,198 @@
+"""
+Monthly range partitioning helpers for the contact_messages table (PostgreSQL only)
+"""
+import logging
+import re
+from datetime import datetime, timezone
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'contact_messages'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_NAME_RE = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$')
+
+
+def month_start(value):
+    """
+    Return the first instant (UTC) of the month containing value
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, count):
+    """
+    Shift a month start by count months (count may be negative)
+    """
+    index = month.year * 12 + (month.month - 1) + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month):
+    return f'{PARENT_TABLE}_p{month.year:04d}{month.month:02d}'
+
+
+def partition_month(name):
+    """
+    Parse the month start back out of a partition name, or None for foreign tables
+    """
+    match = PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE relname = %s AND relnamespace = current_schema()::regnamespace",
+        [PARENT_TABLE]
+    )
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions(cursor):
+    """
+    Return (name, month) for every monthly partition attached to the parent, oldest first
+    """
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [PARENT_TABLE]
+    )
+    partitions = []
+    for (name,) in cursor.fetchall():
+        month = partition_month(name)
+        if month is not None:
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def partition_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def create_partition(cursor, month):
+    """
+    Create the partition covering [month, next month) if it does not exist yet.
+
+    PostgreSQL refuses the new partition while the default partition holds
+    rows in its range (they arrive there when a run of the archive command is
+    missed), so those rows are moved across: the default partition is
+    detached, the partition created, the rows moved and the default
+    re-attached, all in one transaction. Returns the number of rows moved.
+    """
+    name = partition_name(month)
+    if partition_exists(cursor, name):
+        return 0
+    bounds = [month, add_months(month, 1)]
+    create_sql = f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES FROM (%s) TO (%s)"
+
+    with transaction.atomic(using=cursor.db.alias):
+        if partition_exists(cursor, DEFAULT_PARTITION):
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s)",
+                bounds
+            )
+            stranded = cursor.fetchone()[0]
+        else:
+            stranded = False
+        if not stranded:
+            cursor.execute(create_sql, bounds)
+            return 0
+
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+        cursor.execute(create_sql, bounds)
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {PARENT_TABLE} SELECT * FROM moved",
+            bounds
+        )
+        moved = cursor.rowcount
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    logger.warning("Moved %d rows from %s into the new partition %s", moved, DEFAULT_PARTITION, name)
+    return moved
+
+
+def ensure_partitions(cursor, first_month, last_month):
+    """
+    Create every monthly partition between first_month and last_month inclusive
+    """
+    created = []
+    month = month_start(first_month)
+    last_month = month_start(last_month)
+    while month <= last_month:
+        create_partition(cursor, month)
+        created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def expired_partitions(partitions, now, retention_months):
+    """
+    Names of the partitions in [(name, month)] whose month closed more than
+    retention_months full months before the current one
+    """
+    cutoff = add_months(month_start(now), -retention_months)
+    return [name for name, month in partitions if add_months(month, 1) <= cutoff]
+
+
+def partition_table(cursor, premake_months=3):
+    """
+    Convert the plain contact_messages table into a partitioned table, keeping
+    all rows and the id sequence position. Rows outside the premade range land
+    in the default partition.
+    """
+    legacy_table = f'{PARENT_TABLE}_legacy'
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} RENAME TO {legacy_table}")
+    cursor.execute(
+        f"CREATE TABLE {PARENT_TABLE} "
+        f"(LIKE {legacy_table} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    cursor.execute(f"SELECT min(created_at) FROM {legacy_table}")
+    oldest = cursor.fetchone()[0]
+    now = datetime.now(timezone.utc)
+    ensure_partitions(cursor, oldest or now, add_months(month_start(now), premake_months))
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT")
+
+    cursor.execute(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {legacy_table}")
+    cursor.execute(f"DROP TABLE {legacy_table}")
+
+    # Indexes are built after the copy; unique constraints on a partitioned
+    # table must include the partition key
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, created_at)")
+    cursor.execute(f"CREATE INDEX {PARENT_TABLE}_created_at_idx ON {PARENT_TABLE} (created_at DESC)")
+    cursor.execute(f"CREATE INDEX {PARENT_TABLE}_status_idx ON {PARENT_TABLE} (status)")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {PARENT_TABLE}",
+        [PARENT_TABLE]
+    )
+
+
+def unpartition_table(cursor):
+    """
+    Reverse of partition_table: fold every partition back into one plain table
+    """
+    partitioned_table = f'{PARENT_TABLE}_partitioned'
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} RENAME TO {partitioned_table}")
+    cursor.execute(
+        f"CREATE TABLE {PARENT_TABLE} "
+        f"(LIKE {partitioned_table} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE)"
+    )
+    cursor.execute(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {partitioned_table}")
+    cursor.execute(f"DROP TABLE {partitioned_table} CASCADE")
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id)")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {PARENT_TABLE}",
+        [PARENT_TABLE]
+    )
@@ -1,3 +1,311 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from monitoring.testing import (
+    ASGI_URLCONF, EndpointTestCase, consume, seed_contact_messages, seed_newsletter_subscribers,
+)
+from .models import ContactMessage, NewsletterSubscriber
+from .partitions import (
+    DEFAULT_PARTITION, PARENT_TABLE, add_months, ensure_partitions, expired_partitions, is_partitioned,
+    list_partitions, month_start, partition_month, partition_name, partition_table, unpartition_table,
+)
+
+
+# Keep the views on the Django email fallback (locmem during tests)
+@override_settings(MAILGUN_API_KEY='', MAILGUN_DOMAIN='')
+class ContactEndpointTests(EndpointTestCase):
+    covers = (
+        'send_contact_message', 'subscribe_newsletter', 'get_contact_messages',
+        'get_contact_message', 'update_contact_message_status',
+        'delete_contact_message', 'get_newsletter_subscribers',
+    )
+
+    def seed(self, size):
+        seed_contact_messages(size)
+        self.message = ContactMessage.objects.order_by('id').first()
+
+    def test_send_contact_message(self):
+        payload = {
+            'name': 'Visitor', 'email': 'visitor@example.com',
+            'subject': 'Hello', 'message': 'I would like a quote.',
+        }
+        self.assertQueryCountConstant(
+            lambda: self.client.post(reverse('send_contact_message'), payload, content_type='application/json'),
+            self.seed
+        )
+        self.assertTrue(mail.outbox)
+
+    def test_send_contact_message_invalid(self):
+        response = self.client.post(
+            reverse('send_contact_message'), {'name': 'Visitor'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
+    def test_subscribe_newsletter(self):
+        emails = iter(f'new{i}@example.com' for i in range(100))
+        self.assertQueryCountConstant(
+            lambda: self.client.post(
+                reverse('subscribe_newsletter'), {'email': next(emails)}, content_type='application/json'
+            ),
+            seed_newsletter_subscribers
+        )
+
+    def test_get_contact_messages(self):
+        url = reverse('get_contact_messages')
+        headers = self.auth()
+        self.assertQueryCountConstant(lambda: self.client.get(url, **headers), self.seed)
+        body = consume(self.client.get(url, **headers))
+        self.assertIn(b'"total":%d}' % ContactMessage.objects.count(), body)
+        self.assertLatencyWithinBaseline('get_contact_messages', lambda: self.client.get(url, **headers))
+
+    def test_get_contact_messages_requires_auth(self):
+        response = self.client.get(reverse('get_contact_messages'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_get_contact_message(self):
+        headers = self.auth()
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.get(reverse('get_contact_message', args=[self.message.pk]), **headers), self.seed
+        )
+
+    def test_update_contact_message_status(self):
+        headers = self.auth()
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.put(
+                reverse('update_contact_message_status', args=[self.message.pk]),
+                {'status': 'read'}, content_type='application/json', **headers
+            ),
+            self.seed
+        )
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.status, 'read')
+
+    def test_update_contact_message_status_invalid(self):
+        self.seed(1)
+        response = self.client.put(
+            reverse('update_contact_message_status', args=[self.message.pk]),
+            {'status': 'archived'}, content_type='application/json', **self.auth()
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_contact_message(self):
+        headers = self.auth()
+
+        def seed(size):
+            self.seed(size + 1)
+            self.message = ContactMessage.objects.order_by('-id').first()
+
+        seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.delete(reverse('delete_contact_message', args=[self.message.pk]), **headers),
+            seed
+        )
+
+    def test_get_newsletter_subscribers(self):
+        url = reverse('get_newsletter_subscribers')
+        headers = self.auth()
+        self.assertQueryCountConstant(lambda: self.client.get(url, **headers), seed_newsletter_subscribers)
+        body = consume(self.client.get(url, **headers))
+        self.assertIn(b'"total":%d}' % NewsletterSubscriber.objects.count(), body)
+
+
+@override_settings(ROOT_URLCONF=ASGI_URLCONF, MAILGUN_API_KEY='', MAILGUN_DOMAIN='')
+class ContactAsyncViewTests(EndpointTestCase):
+    payload = {
+        'name': 'Visitor', 'email': 'visitor@example.com',
+        'subject': 'Hello', 'message': 'I would like a quote.',
+    }
+
+    async def test_send_contact_message_falls_back_to_django_email(self):
+        response = await self.async_client.post(
+            reverse('send_contact_message'), self.payload, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['data']['status'], 'new')
+        self.assertTrue(await ContactMessage.objects.filter(pk=body['data']['id']).aexists())
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(MAILGUN_API_KEY='key', MAILGUN_DOMAIN='mg.example.com', MAILGUN_API_BASE='https://mailgun.test/v3')
+    async def test_send_contact_message_through_async_mailgun(self):
+        sent = []
+
+        def handler(request):
+            sent.append(str(request.url))
+            return httpx.Response(200, json={'id': 'queued'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with mock.patch('contact.email_service._async_client', return_value=client):
+            response = await self.async_client.post(reverse('send_contact_message'), self.payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sent, ['https://mailgun.test/v3/mg.example.com/messages'] * 2)
+        self.assertFalse(mail.outbox)
+
+    async def test_send_contact_message_invalid(self):
+        response = await self.async_client.post(
+            reverse('send_contact_message'), {'name': 'Visitor'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
+        response = await self.async_client.post(
+            reverse('send_contact_message'), '{not json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_subscribe_newsletter(self):
+        response = await self.async_client.post(
+            reverse('subscribe_newsletter'), {'email': 'New@Example.com'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['email'], 'new@example.com')
+        self.assertTrue(await NewsletterSubscriber.objects.filter(email='new@example.com', is_active=True).aexists())
+
+
+class PartitionHelperTests(SimpleTestCase):
+
+    def test_month_start(self):
+        self.assertEqual(month_start(datetime(2024, 3, 17, 12, 30)), datetime(2024, 3, 1, tzinfo=timezone.utc))
+        # Aware values are converted to UTC first
+        east = timezone(timedelta(hours=2))
+        self.assertEqual(
+            month_start(datetime(2024, 3, 1, 0, 30, tzinfo=east)), datetime(2024, 2, 1, tzinfo=timezone.utc)
+        )
+
+    def test_add_months(self):
+        january = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(add_months(january, 1), datetime(2024, 2, 1, tzinfo=timezone.utc))
+        self.assertEqual(add_months(january, 11), datetime(2024, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(add_months(january, 12), datetime(2025, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(add_months(january, -1), datetime(2023, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(add_months(january, -25), datetime(2021, 12, 1, tzinfo=timezone.utc))
+
+    def test_partition_name(self):
+        month = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        self.assertEqual(partition_name(month), 'contact_messages_p202403')
+        self.assertEqual(partition_month(partition_name(month)), month)
+        self.assertIsNone(partition_month('contact_messages_default'))
+        self.assertIsNone(partition_month('other_table_p202403'))
+
+    def test_expired_partitions(self):
+        partitions = [
+            (partition_name(month), month)
+            for month in (datetime(2024, m, 1, tzinfo=timezone.utc) for m in (1, 2, 3, 4))
+        ]
+        now = datetime(2025, 3, 15, tzinfo=timezone.utc)
+        # Twelve closed months kept: March 2024 .. February 2025
+        self.assertEqual(
+            expired_partitions(partitions, now, 12), ['contact_messages_p202401', 'contact_messages_p202402']
+        )
+        self.assertEqual(expired_partitions(partitions, now, 14), [])
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'PostgreSQL supports partitioning')
+    def test_command_requires_postgresql(self):
+        with self.assertRaisesMessage(CommandError, 'requires PostgreSQL'):
+            call_command('archive_contact_messages', stdout=io.StringIO())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Partitioning requires PostgreSQL')
+class PartitioningTests(TestCase):
+
+    def setUp(self):
+        self.now = datetime.now(timezone.utc)
+        self.current_month = month_start(self.now)
+
+    def message_in(self, month):
+        message = ContactMessage.objects.create(
+            name='Sender', email='sender@example.com', subject='Hi', message='Body'
+        )
+        ContactMessage.objects.filter(pk=message.pk).update(created_at=month + timedelta(days=1))
+        return message
+
+    def count(self, cursor, table):
+        cursor.execute(f'SELECT count(*) FROM {table}')
+        return cursor.fetchone()[0]
+
+    def test_partition_table(self):
+        old_month = add_months(self.current_month, -5)
+        with connection.cursor() as cursor:
+            ensure_partitions(cursor, old_month, old_month)
+            messages = [self.message_in(old_month), self.message_in(self.current_month)]
+            unpartition_table(cursor)
+            self.assertFalse(is_partitioned(cursor))
+            self.assertEqual(self.count(cursor, PARENT_TABLE), 2)
+
+            partition_table(cursor)
+            self.assertTrue(is_partitioned(cursor))
+            months = [month for _, month in list_partitions(cursor)]
+            self.assertEqual(months[0], old_month)
+            self.assertEqual(months[-1], add_months(self.current_month, 3))
+            self.assertEqual(self.count(cursor, partition_name(old_month)), 1)
+            self.assertEqual(self.count(cursor, DEFAULT_PARTITION), 0)
+        self.assertEqual(set(ContactMessage.objects.values_list('pk', flat=True)), {m.pk for m in messages})
+        # The id sequence continues after the copied rows
+        self.assertGreater(self.message_in(self.current_month).pk, max(m.pk for m in messages))
+
+    def test_rows_in_default_partition_are_moved(self):
+        month = add_months(self.current_month, 6)
+        self.message_in(month)
+        with connection.cursor() as cursor:
+            self.assertEqual(self.count(cursor, DEFAULT_PARTITION), 1)
+            ensure_partitions(cursor, month, month)
+            self.assertEqual(self.count(cursor, partition_name(month)), 1)
+            self.assertEqual(self.count(cursor, DEFAULT_PARTITION), 0)
+            self.assertIn(partition_name(month), [name for name, _ in list_partitions(cursor)])
+
+    def test_archive_command(self):
+        old_month = add_months(self.current_month, -14)
+        missed_month = add_months(self.current_month, 2)
+        with connection.cursor() as cursor:
+            ensure_partitions(cursor, old_month, old_month)
+            # A missed run: the month's rows arrived before its partition
+            cursor.execute(f'DROP TABLE IF EXISTS {partition_name(missed_month)}')
+        old = self.message_in(old_month)
+        missed = self.message_in(missed_month)
+
+        output_dir = tempfile.mkdtemp(prefix='contact-archive-')
+        self.addCleanup(shutil.rmtree, output_dir, ignore_errors=True)
+        call_command('archive_contact_messages', output_dir=output_dir, retention_months=12, stdout=io.StringIO())
+
+        with gzip.open(os.path.join(output_dir, f'{partition_name(old_month)}.csv.gz'), 'rt') as archive:
+            rows = list(csv.DictReader(archive))
+        self.assertEqual([int(row['id']) for row in rows], [old.pk])
+        self.assertFalse(ContactMessage.objects.filter(pk=old.pk).exists())
+        with connection.cursor() as cursor:
+            partitions = [name for name, _ in list_partitions(cursor)]
+            self.assertNotIn(partition_name(old_month), partitions)
+            self.assertIn(partition_name(missed_month), partitions)
+            self.assertEqual(self.count(cursor, partition_name(missed_month)), 1)
+        self.assertTrue(ContactMessage.objects.filter(pk=missed.pk).exists())
+
+    def test_archive_dry_run_has_no_side_effects(self):
+        old_month = add_months(self.current_month, -14)
+        with connection.cursor() as cursor:
+            ensure_partitions(cursor, old_month, old_month)
+        output_dir = os.path.join(tempfile.gettempdir(), f'contact-dry-run-{os.getpid()}')
+        out = io.StringIO()
+        call_command(
+            'archive_contact_messages', output_dir=output_dir, retention_months=12, dry_run=True, stdout=out
+        )
+        self.assertIn(f'Would archive {partition_name(old_month)}', out.getvalue())
+        self.assertFalse(os.path.exists(output_dir))
+        with connection.cursor() as cursor:
+            self.assertIn(partition_name(old_month), [name for name, _ in list_partitions(cursor)])
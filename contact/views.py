@@ -1,5 +1,5 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from django.conf import settings
 from .models import ContactMessage, NewsletterSubscriber
@@ -9,6 +9,8 @@ from .serializers import (
     NewsletterSubscriberSerializer,
     NewsletterSubscribeSerializer
 )
+from auth_app.authentication import ClaimsJWTAuthentication
+from clickexpress_api.streaming import stream_list_response
 from .email_service import MailgunService, DjangoEmailService
 
 
@@ -100,6 +102,7 @@ def subscribe_newsletter(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def get_contact_messages(request):
     """
@@ -107,15 +110,11 @@ def get_contact_messages(request):
     GET /contact/messages/
     """
     messages = ContactMessage.objects.all().order_by('-created_at')
-    serializer = ContactMessageSerializer(messages, many=True)
-    return Response({
-        'success': True,
-        'data': serializer.data,
-        'total': messages.count()
-    })
+    return stream_list_response(messages, ContactMessageSerializer)
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def get_contact_message(request, pk):
     """
@@ -179,6 +178,7 @@ def update_contact_message_status(request, pk):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def get_newsletter_subscribers(request):
     """
@@ -186,12 +186,7 @@ def get_newsletter_subscribers(request):
     GET /newsletter/subscribers/
     """
     subscribers = NewsletterSubscriber.objects.all().order_by('-subscribed_at')
-    serializer = NewsletterSubscriberSerializer(subscribers, many=True)
-    return Response({
-        'success': True,
-        'data': serializer.data,
-        'total': subscribers.count()
-    })
+    return stream_list_response(subscribers, NewsletterSubscriberSerializer)
 
 
 @api_view(['DELETE'])
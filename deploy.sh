@@ -93,7 +93,10 @@ server {
         alias /home/clickexpress/click_backend/static/;
     }
 
-    location /media/ {
+    # Media goes through Django for the access check; Django answers with
+    # X-Accel-Redirect and nginx sends the file from here
+    location /_protected_media/ {
+        internal;
         alias /home/clickexpress/click_backend/media/;
     }
 }
@@ -117,7 +120,7 @@ User=clickexpress
 Group=clickexpress
 WorkingDirectory=/home/clickexpress/click_backend
 Environment="PATH=/home/clickexpress/click_backend/venv/bin"
-ExecStart=/home/clickexpress/click_backend/venv/bin/gunicorn --workers 3 --bind 127.0.0.1:8000 clickexpress_api.wsgi:application
+ExecStart=/home/clickexpress/click_backend/venv/bin/gunicorn -c gunicorn.conf.py clickexpress_api.wsgi:application
 ExecReload=/bin/kill -s HUP $MAINPID
 Restart=always
 RestartSec=3
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class GalleryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gallery'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .serializers import compiled_gallery_image_serializer
+        compiled_gallery_image_serializer.compile()
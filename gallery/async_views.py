@@ -0,0 +1,49 @@
+from clickexpress_api.async_views import public_async_view, render_json
+from clickexpress_api.cache import cached_async_view
+from .models import GalleryImage
+from .serializers import GalleryImageSerializer, compiled_gallery_image_serializer
+
+
+@cached_async_view('gallery')
+@public_async_view(['GET'])
+async def get_all_gallery_images(request):
+    """
+    Get all gallery images, optionally of one category (public endpoint, ASGI mode)
+    GET /gallery-images?category=team
+
+    Built in memory rather than streamed: the response cache stores the
+    whole body anyway.
+    """
+    gallery_images = GalleryImage.objects.all().order_by('display_order', '-created_at')
+    if request.GET.get('category'):
+        gallery_images = gallery_images.filter(category=request.GET['category'])
+    rows = [row async for row in compiled_gallery_image_serializer.values(gallery_images)]
+    data = compiled_gallery_image_serializer.serialize_rows(rows)
+    return render_json({
+        'success': True,
+        'data': data,
+        'total': len(data)
+    })
+
+
+@cached_async_view('gallery')
+@public_async_view(['GET'])
+async def get_gallery_image(request, pk):
+    """
+    Get single gallery image (public endpoint, ASGI mode)
+    GET /gallery-images/:id
+    """
+    try:
+        gallery_image = await GalleryImage.objects.aget(pk=pk)
+    except GalleryImage.DoesNotExist:
+        return render_json({
+            'success': False,
+            'error': {
+                'code': 'NOT_FOUND',
+                'message': 'Gallery image not found'
+            }
+        }, status=404)
+    return render_json({
+        'success': True,
+        'data': GalleryImageSerializer(gallery_image).data
+    })
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(fields=['category', 'display_order'], name='gallery_category_order_idx'),
+        ),
+    ]
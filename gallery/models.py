@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connections, models, router
+from django.utils import timezone
 
 
 class GalleryImage(models.Model):
@@ -25,6 +26,40 @@ class GalleryImage(models.Model):
         verbose_name = 'Gallery Image'
         verbose_name_plural = 'Gallery Images'
         ordering = ['display_order', '-created_at']
+        indexes = [
+            # Per-category reads in display order (the home page, ?category=)
+            models.Index(fields=['category', 'display_order'], name='gallery_category_order_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.alt} ({self.category})"
\ No newline at end of file
+        return f"{self.alt} ({self.category})"
+
+    @classmethod
+    def set_display_orders(cls, positions):
+        """
+        Apply {id: display_order} in one UPDATE joined to a VALUES list,
+        touching only the rows whose position changes; returns their count.
+        Sends no signals.
+        """
+        if not positions:
+            return 0
+        connection = connections[router.db_for_write(cls)]
+        quote = connection.ops.quote_name
+        table, pk = quote(cls._meta.db_table), quote(cls._meta.pk.column)
+        display_order = quote(cls._meta.get_field('display_order').column)
+        updated_at = quote(cls._meta.get_field('updated_at').column)
+        values = ', '.join(['(%s, %s)'] * len(positions))
+        # The CTE form of UPDATE ... FROM (VALUES ...) runs on PostgreSQL and SQLite alike
+        sql = (
+            f'WITH new_order (id, new_position) AS (VALUES {values}) '
+            f'UPDATE {table} SET {display_order} = new_order.new_position, {updated_at} = %s '
+            f'FROM new_order WHERE {table}.{pk} = new_order.id '
+            f'AND {table}.{display_order} <> new_order.new_position '
+            # rowcount isn't reported for a statement starting with WITH on SQLite
+            f'RETURNING {table}.{pk}'
+        )
+        params = [value for item in positions.items() for value in item]
+        params.append(connection.ops.adapt_datetimefield_value(timezone.now()))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return len(cursor.fetchall())
\ No newline at end of file
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from clickexpress_api.bulk import MediaPathField
+from clickexpress_api.compiled_serializers import CompiledReadSerializer
 from .models import GalleryImage
 
 
@@ -13,3 +15,18 @@ class GalleryImageSerializer(serializers.ModelSerializer):
             'display_order', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class GalleryImageBulkSerializer(serializers.ModelSerializer):
+    """
+    Gallery image input for the bulk endpoints, with images already uploaded
+    """
+    src = MediaPathField()
+
+    class Meta:
+        model = GalleryImage
+        fields = ['src', 'alt', 'caption', 'category', 'display_order']
+
+
+# Read path for the public list endpoint; see clickexpress_api.compiled_serializers
+compiled_gallery_image_serializer = CompiledReadSerializer(GalleryImageSerializer)
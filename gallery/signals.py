@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clickexpress_api.cache import invalidate_on_commit
+from .models import GalleryImage
+
+
+@receiver(post_save, sender=GalleryImage)
+@receiver(post_delete, sender=GalleryImage)
+def invalidate_gallery_cache(sender, instance, **kwargs):
+    """
+    Any change to an image drops every cached gallery and home page response, once
+    the change is committed
+    """
+    invalidate_on_commit('gallery', kwargs.get('using'))
+    invalidate_on_commit('home', kwargs.get('using'))
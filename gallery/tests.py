@@ -1,3 +1,380 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from clickexpress_api import cache as cache_module
+from clickexpress_api.renderers import ORJSONRenderer
+from monitoring.testing import EndpointTestCase, consume, image_upload, seed_gallery_images
+from .models import GalleryImage
+from .serializers import GalleryImageSerializer, compiled_gallery_image_serializer
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='gallery-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class GalleryEndpointTests(EndpointTestCase):
+    covers = (
+        'get_all_gallery_images', 'get_gallery_image', 'create_gallery_image',
+        'update_gallery_image', 'delete_gallery_image',
+    )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def seed(self, size):
+        seed_gallery_images(size)
+        self.image = GalleryImage.objects.order_by('id').first()
+
+    def test_get_all_gallery_images(self):
+        url = reverse('get_all_gallery_images')
+        self.assertQueryCountConstant(lambda: self.client.get(url), self.seed)
+        body = consume(self.client.get(url))
+        self.assertIn(b'"total":%d}' % GalleryImage.objects.count(), body)
+        self.assertLatencyWithinBaseline('get_all_gallery_images', lambda: self.client.get(url))
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_MAX_STREAM_BYTES=1024)
+    def test_large_list_streams_past_the_cache(self):
+        url = reverse('get_all_gallery_images')
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            self.seed(20)
+            expected = consume(self.client.get(url))
+        self.assertGreater(len(expected), 1024)
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertIsInstance(response, StreamingHttpResponse)
+            self.assertNotIn('X-Cache', response)
+            self.assertEqual(consume(response), expected)
+
+        # A list that fits is cached as before
+        GalleryImage.objects.exclude(pk=self.image.pk).delete()
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_get_gallery_image(self):
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.get(reverse('get_gallery_image', args=[self.image.pk])), self.seed
+        )
+        self.assertLatencyWithinBaseline(
+            'get_gallery_image', lambda: self.client.get(reverse('get_gallery_image', args=[self.image.pk]))
+        )
+
+    def test_get_gallery_image_not_found(self):
+        response = self.client.get(reverse('get_gallery_image', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_gallery_image(self):
+        headers = self.auth()
+        self.assertQueryCountConstant(
+            lambda: self.client.post(
+                reverse('create_gallery_image'),
+                {'src': image_upload(), 'alt': 'New image', 'category': 'team'}, **headers
+            ),
+            self.seed
+        )
+
+    def test_create_gallery_image_requires_auth(self):
+        response = self.client.post(reverse('create_gallery_image'), {'alt': 'x'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_update_gallery_image(self):
+        headers = self.auth()
+        self.seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.put(
+                reverse('update_gallery_image', args=[self.image.pk]),
+                {'alt': 'Updated', 'display_order': 3}, content_type='application/json', **headers
+            ),
+            self.seed
+        )
+
+    def test_delete_gallery_image(self):
+        headers = self.auth()
+
+        def seed(size):
+            self.seed(size + 1)
+            self.image = GalleryImage.objects.order_by('-id').first()
+
+        seed(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.delete(reverse('delete_gallery_image', args=[self.image.pk]), **headers),
+            seed
+        )
+
+
+class CompiledGalleryImageSerializerTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_gallery_images(6)
+        # Names the storage has to quote or normalise
+        GalleryImage.objects.create(src='gallery/images/with space & ü.jpg', alt='Quoted', display_order=99)
+        GalleryImage.objects.create(src='gallery/./images/../dotted.jpg', alt='Dotted', display_order=100)
+
+    def assertParity(self, queryset):
+        expected = GalleryImageSerializer(queryset, many=True).data
+        actual = compiled_gallery_image_serializer.serialize(queryset)
+        for renderer in (ORJSONRenderer(), JSONRenderer()):
+            self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_matches_drf_serializer(self):
+        self.assertParity(GalleryImage.objects.order_by('id'))
+
+    @override_settings(MEDIA_URL='https://cdn.example.com/media/')
+    def test_matches_drf_serializer_media_url(self):
+        self.assertParity(GalleryImage.objects.order_by('id'))
+
+    def test_matches_drf_serializer_in_other_timezone(self):
+        with timezone.override('Asia/Kolkata'):
+            self.assertParity(GalleryImage.objects.order_by('id'))
+
+    def test_list_endpoint_body_unchanged(self):
+        images = GalleryImage.objects.order_by('display_order', '-created_at')
+        data = GalleryImageSerializer(images, many=True).data
+        expected = ORJSONRenderer().render({'success': True, 'data': data, 'total': len(data)})
+        self.assertEqual(consume(self.client.get(reverse('get_all_gallery_images'))), expected)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class GalleryAsyncViewTests(EndpointTestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_gallery_images(5)
+
+    async def test_matches_sync_views(self):
+        image = await GalleryImage.objects.afirst()
+        response = await self.assertAsyncGetMatches(reverse('get_all_gallery_images'))
+        self.assertEqual(response.json()['total'], 5)
+        await self.assertAsyncGetMatches(reverse('get_gallery_image', args=[image.pk]))
+        await self.assertAsyncGetMatches(reverse('get_gallery_image', args=[999999]))
+        await self.assertAsyncGetMatches(reverse('get_all_gallery_images') + '?category=team')
+
+
+class GalleryBatchTests(EndpointTestCase):
+    covers = ('get_gallery_images_batch',)
+
+    def setUp(self):
+        super().setUp()
+        seed_gallery_images(5)
+        self.ids = list(GalleryImage.objects.order_by('id').values_list('id', flat=True))
+
+    def batch(self, ids):
+        return self.client.get(reverse('get_gallery_images_batch'), {'ids': ids})
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_batch(self):
+        wanted = [self.ids[4], 999999, self.ids[1]]
+        with self.assertNumQueries(1):
+            body = self.batch(','.join(map(str, wanted))).json()
+        self.assertEqual([image['id'] for image in body['data']], [self.ids[4], self.ids[1]])
+        self.assertEqual(body['missing'], [999999])
+        expected = GalleryImageSerializer(GalleryImage.objects.get(pk=self.ids[1])).data
+        self.assertEqual(ORJSONRenderer().render(body['data'][1]), ORJSONRenderer().render(expected))
+
+        with self.assertNumQueries(1):
+            # The missing id is not cached
+            self.assertEqual(self.batch(','.join(map(str, wanted))).json()['missing'], [999999])
+
+    def test_query_count(self):
+        def batch():
+            return self.batch(','.join(map(str, GalleryImage.objects.values_list('id', flat=True)[:50])))
+
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            self.assertQueryCountConstant(batch, seed_gallery_images)
+            self.assertLatencyWithinBaseline('get_gallery_images_batch', batch)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class GalleryBulkTests(EndpointTestCase):
+    covers = ('bulk_create_gallery_images', 'bulk_update_gallery_images', 'bulk_delete_gallery_images')
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.auth()
+        self.names = [default_storage.save(f'gallery/images/bulk_{i}.png', image_upload()) for i in range(2)]
+
+    def tearDown(self):
+        for name in self.names:
+            default_storage.delete(name)
+        super().tearDown()
+
+    def send(self, method, name, payload):
+        return getattr(self.client, method)(reverse(name), payload, content_type='application/json', **self.headers)
+
+    def test_bulk_create(self):
+        payload = [
+            {'src': self.names[0], 'alt': 'First', 'category': 'team'},
+            # The URL the upload endpoint returned works too
+            {'src': settings.MEDIA_URL + self.names[1], 'alt': 'Second', 'display_order': 4},
+        ]
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.send('post', 'bulk_create_gallery_images', payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(invalidate.call_args_list, [mock.call('gallery'), mock.call('home')])
+        images = list(GalleryImage.objects.order_by('id'))
+        self.assertEqual([image.src.name for image in images], self.names)
+        self.assertEqual((images[0].category, images[1].display_order), ('team', 4))
+        self.assertEqual(response.json()['data'][0], GalleryImageSerializer(images[0]).data)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        payload = [
+            {'src': self.names[0], 'alt': 'Valid'},
+            {'src': 'gallery/images/missing.png', 'alt': 'Missing file'},
+            {'src': '../outside.png', 'alt': 'Outside media'},
+            {'src': self.names[1], 'alt': 'Bad category', 'category': 'nope'},
+        ]
+        response = self.send('post', 'bulk_create_gallery_images', payload)
+        self.assertEqual(response.status_code, 400)
+        details = response.json()['error']['details']
+        self.assertEqual(details[0], {})
+        self.assertIn('src', details[1])
+        self.assertIn('src', details[2])
+        self.assertIn('category', details[3])
+        self.assertFalse(GalleryImage.objects.exists())
+
+    def test_bulk_update(self):
+        seed_gallery_images(3)
+        images = list(GalleryImage.objects.order_by('id'))
+        payload = [
+            {'id': images[1].pk, 'display_order': 0},
+            {'id': images[0].pk, 'display_order': 1, 'src': self.names[0]},
+        ]
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(5):
+                # Auth user, in_bulk, savepoint, bulk UPDATE, release
+                response = self.send('put', 'bulk_update_gallery_images', payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(invalidate.call_args_list, [mock.call('gallery'), mock.call('home')])
+        images = list(GalleryImage.objects.order_by('display_order', 'id'))
+        self.assertEqual([image.alt for image in images], ['Image 1', 'Image 0', 'Image 2'])
+        self.assertEqual(images[1].src.name, self.names[0])
+
+    def test_bulk_update_rolls_back_on_error(self):
+        seed_gallery_images(2)
+        first, second = GalleryImage.objects.order_by('id')
+        payload = [{'id': first.pk, 'alt': 'Changed'}, {'id': second.pk, 'display_order': 'first'}]
+        response = self.send('put', 'bulk_update_gallery_images', payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['details'][0], {})
+        self.assertIn('display_order', response.json()['error']['details'][1])
+        self.assertEqual(GalleryImage.objects.get(pk=first.pk).alt, first.alt)
+
+    def test_bulk_delete(self):
+        seed_gallery_images(3)
+        ids = list(GalleryImage.objects.order_by('id').values_list('id', flat=True))
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.send('delete', 'bulk_delete_gallery_images', {'ids': ids[:2] + [ids[0]]})
+        self.assertEqual(response.json()['deleted'], ids[:2])
+        self.assertEqual(response.json()['missing'], [])
+        self.assertEqual(list(GalleryImage.objects.values_list('id', flat=True)), ids[2:])
+        self.assertEqual(invalidate.call_args_list, [mock.call('gallery'), mock.call('home')])
+
+    def test_boolean_ids_are_rejected(self):
+        seed_gallery_images(2)
+        first = GalleryImage.objects.order_by('id').first()
+        # JSON true would otherwise stand for id 1
+        response = self.send('put', 'bulk_update_gallery_images', [{'id': True, 'alt': 'Changed'}])
+        self.assertEqual(response.json()['error']['details'], [{'id': ['A unique object id is required.']}])
+        response = self.send('delete', 'bulk_delete_gallery_images', {'ids': [True, first.pk]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(GalleryImage.objects.count(), 2)
+
+
+class GalleryReorderTests(EndpointTestCase):
+    covers = ('reorder_gallery_images',)
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.auth()
+        seed_gallery_images(8)
+        self.team = self.category_order('team')
+        self.gallery = self.category_order('gallery')
+
+    def reorder(self, order):
+        return self.client.put(
+            reverse('reorder_gallery_images'), {'order': order}, content_type='application/json', **self.headers
+        )
+
+    def category_order(self, category):
+        images = GalleryImage.objects.filter(category=category).order_by('display_order', 'id')
+        return list(images.values_list('id', flat=True))
+
+    def test_reorder(self):
+        order = {'team': self.team[::-1], 'gallery': self.gallery[1:]}
+        with mock.patch('clickexpress_api.cache.invalidate', wraps=cache_module.invalidate) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            # Auth user, savepoint, locked read, one UPDATE, release
+            with self.assertNumQueries(5):
+                response = self.reorder(order)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(invalidate.call_args_list, [mock.call('gallery'), mock.call('home')])
+        # Images left out of a list follow the listed ones
+        expected_gallery = self.gallery[1:] + self.gallery[:1]
+        self.assertEqual(response.json()['data'], {'team': self.team[::-1], 'gallery': expected_gallery})
+        self.assertEqual(self.category_order('team'), self.team[::-1])
+        self.assertEqual(self.category_order('gallery'), expected_gallery)
+        self.assertEqual(
+            sorted(GalleryImage.objects.filter(category='team').values_list('display_order', flat=True)),
+            list(range(len(self.team)))
+        )
+
+    def test_only_changed_rows_are_written(self):
+        self.reorder({'team': self.team})
+        before = dict(GalleryImage.objects.values_list('id', 'updated_at'))
+        swapped = [self.team[1], self.team[0]]
+        response = self.reorder({'team': swapped})
+        self.assertEqual(response.json()['updated'], 2)
+        after = dict(GalleryImage.objects.values_list('id', 'updated_at'))
+        self.assertEqual({pk for pk in before if before[pk] != after[pk]}, set(swapped))
+
+        with mock.patch('clickexpress_api.cache.invalidate') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.reorder({'team': swapped}).json()['updated'], 0)
+        invalidate.assert_not_called()
+
+    def test_invalid_order(self):
+        response = self.reorder({
+            'team': [self.gallery[0]],
+            'nope': [],
+            'gallery': [self.gallery[0], self.gallery[0]],
+            'portfolio': 'x',
+            # JSON booleans aren't ids 1 and 0
+            'testimonial': [True, False],
+        })
+        self.assertEqual(response.status_code, 400)
+        details = response.json()['error']['details']
+        self.assertEqual(set(details), {'team', 'nope', 'gallery', 'portfolio', 'testimonial'})
+        self.assertEqual(details['testimonial'], ['Expected a list of image ids.'])
+        self.assertEqual(self.category_order('gallery'), self.gallery)
+        for body in ({}, {'order': []}, {'order': {}}):
+            response = self.client.put(
+                reverse('reorder_gallery_images'), body, content_type='application/json', **self.headers
+            )
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_reorder_requires_auth(self):
+        response = self.client.put(
+            reverse('reorder_gallery_images'), {'order': {'team': self.team}}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_category_filter(self):
+        body = consume(self.client.get(reverse('get_all_gallery_images'), {'category': 'team'}))
+        self.assertIn(b'"total":%d}' % len(self.team), body)
+        index = GalleryImage._meta.indexes[0]
+        self.assertEqual(index.fields, ['category', 'display_order'])
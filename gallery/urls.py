@@ -3,8 +3,13 @@ from . import views
 
 urlpatterns = [
     path('', views.get_all_gallery_images, name='get_all_gallery_images'),
+    path('batch/', views.get_gallery_images_batch, name='get_gallery_images_batch'),
     path('<int:pk>/', views.get_gallery_image, name='get_gallery_image'),
     path('create/', views.create_gallery_image, name='create_gallery_image'),
     path('<int:pk>/update/', views.update_gallery_image, name='update_gallery_image'),
     path('<int:pk>/delete/', views.delete_gallery_image, name='delete_gallery_image'),
+    path('reorder/', views.reorder_gallery_images, name='reorder_gallery_images'),
+    path('bulk/create/', views.bulk_create_gallery_images, name='bulk_create_gallery_images'),
+    path('bulk/update/', views.bulk_update_gallery_images, name='bulk_update_gallery_images'),
+    path('bulk/delete/', views.bulk_delete_gallery_images, name='bulk_delete_gallery_images'),
 ]
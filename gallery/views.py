@@ -3,8 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.db import router, transaction
+from clickexpress_api import bulk
+from clickexpress_api.batch import batch_response
+from clickexpress_api.cache import cached_view
+from clickexpress_api.streaming import stream_list_response
 from .models import GalleryImage
-from .serializers import GalleryImageSerializer
+from .serializers import GalleryImageSerializer, GalleryImageBulkSerializer, compiled_gallery_image_serializer
+from .signals import invalidate_gallery_cache
 
 
 class GalleryImageListCreateView(generics.ListCreateAPIView):
@@ -30,22 +36,21 @@ class GalleryImageDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
+@cached_view('gallery')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_all_gallery_images(request):
     """
-    Get all gallery images (public endpoint)
-    GET /gallery-images
+    Get all gallery images, optionally of one category (public endpoint)
+    GET /gallery-images?category=team
     """
     gallery_images = GalleryImage.objects.all().order_by('display_order', '-created_at')
-    serializer = GalleryImageSerializer(gallery_images, many=True)
-    return Response({
-        'success': True,
-        'data': serializer.data,
-        'total': gallery_images.count()
-    })
+    if request.query_params.get('category'):
+        gallery_images = gallery_images.filter(category=request.query_params['category'])
+    return stream_list_response(gallery_images, compiled_gallery_image_serializer)
 
 
+@cached_view('gallery')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_gallery_image(request, pk):
@@ -70,6 +75,16 @@ def get_gallery_image(request, pk):
         }, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_gallery_images_batch(request):
+    """
+    Get several gallery images by id, in the requested order (public endpoint)
+    GET /gallery-images/batch?ids=1,2,3
+    """
+    return batch_response(request, 'gallery', GalleryImage.objects.all(), compiled_gallery_image_serializer)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_gallery_image(request):
@@ -149,4 +164,103 @@ def delete_gallery_image(request, pk):
                 'code': 'NOT_FOUND',
                 'message': 'Gallery image not found'
             }
-        }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        }, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_create_gallery_images(request):
+    """
+    Create several gallery images in one transaction (admin only)
+    POST /gallery-images/bulk/create
+    """
+    return bulk.bulk_create(
+        request, GalleryImageBulkSerializer, GalleryImageSerializer, invalidate_gallery_cache
+    )
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_gallery_images(request):
+    """
+    Update several gallery images in one transaction (admin only)
+    PUT /gallery-images/bulk/update
+    """
+    return bulk.bulk_update(
+        request, GalleryImage.objects.all(), GalleryImageBulkSerializer, GalleryImageSerializer,
+        invalidate_gallery_cache
+    )
+
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_delete_gallery_images(request):
+    """
+    Delete several gallery images in one transaction (admin only)
+    DELETE /gallery-images/bulk/delete
+    """
+    return bulk.bulk_delete(request, GalleryImage.objects.all(), invalidate_gallery_cache)
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def reorder_gallery_images(request):
+    """
+    Set the display order of one or more categories at once (admin only)
+    PUT /gallery-images/reorder
+    Body: {"order": {"<category>": [ids in display order], ...}}
+
+    Images of a category left out of its list keep their relative order
+    after the listed ones. All positions change in one statement.
+    """
+    order = request.data.get('order') if isinstance(request.data, dict) else None
+    categories = dict(GalleryImage.CATEGORY_CHOICES)
+    if not isinstance(order, dict) or not order:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Expected "order", an object of category: [ids]'
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic(using=router.db_for_write(GalleryImage)):
+        # Locked so two reorders of a category can't interleave
+        current = {}
+        images = GalleryImage.objects.filter(category__in=[category for category in order if category in categories])
+        images = images.select_for_update().order_by('display_order', '-created_at')
+        for pk, category in images.values_list('id', 'category'):
+            current.setdefault(category, []).append(pk)
+
+        details = {}
+        for category, ids in order.items():
+            if category not in categories:
+                details[category] = ['Not a valid category.']
+            elif not isinstance(ids, list) or not all(bulk.is_id(pk) for pk in ids):
+                details[category] = ['Expected a list of image ids.']
+            elif len(set(ids)) != len(ids):
+                details[category] = ['Image ids must be unique.']
+            elif set(ids) - set(current.get(category, ())):
+                missing = sorted(set(ids) - set(current.get(category, ())))
+                details[category] = [f'Not images of this category: {missing}']
+        if details:
+            return Response({
+                'success': False,
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'Invalid input data',
+                    'details': details
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {}
+        positions = {}
+        for category, ids in order.items():
+            listed = set(ids)
+            data[category] = ids + [pk for pk in current.get(category, ()) if pk not in listed]
+            positions.update((pk, position) for position, pk in enumerate(data[category]))
+        updated = GalleryImage.set_display_orders(positions)
+
+    if updated:
+        invalidate_gallery_cache(sender=GalleryImage, instance=None)
+    return Response({'success': True, 'data': data, 'updated': updated})
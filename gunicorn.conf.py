@@ -0,0 +1,56 @@
+"""
+Gunicorn configuration for the ClickExpress API
+
+    gunicorn -c gunicorn.conf.py clickexpress_api.wsgi:application
+
+ASGI mode (async public endpoints, see clickexpress_api/asgi.py):
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn -c gunicorn.conf.py clickexpress_api.asgi:application
+"""
+import os
+import shutil
+
+# Not imported as `config`: gunicorn would read that name as its own setting
+from decouple import config as env
+
+bind = env('GUNICORN_BIND', default='127.0.0.1:8000')
+workers = env('GUNICORN_WORKERS', default=3, cast=int)
+# With threads > 1 set DB_POOL=True so a worker's threads share
+# DB_POOL_MAX_SIZE database connections instead of holding one each
+threads = env('GUNICORN_THREADS', default=1, cast=int)
+worker_class = env('GUNICORN_WORKER_CLASS', default='sync')
+# Load the app in the master so workers fork with it (and its warm-up) in memory
+preload_app = env('GUNICORN_PRELOAD', default=False, cast=bool)
+
+# Prometheus multiprocess mode: every worker writes its samples here and
+# /metrics aggregates the directory. Must be exported before any worker
+# imports prometheus_client.
+prometheus_multiproc_dir = env('PROMETHEUS_MULTIPROC_DIR', default='/tmp/clickexpress-prometheus')
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = prometheus_multiproc_dir
+
+
+def on_starting(server):
+    # Samples from a previous master run would be summed into the new one
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from django.db import connections
+        from clickexpress_api.warmup import MASTER_PHASES, warm_up
+        warm_up(MASTER_PHASES)
+        # Workers must not inherit the master's sockets
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    # Runs once the worker has loaded the app, before it accepts requests
+    from clickexpress_api.warmup import warm_up
+    warm_up()
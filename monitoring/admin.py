@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['normalized_sql', 'count', 'total_ms', 'max_ms', 'last_view', 'last_seen']
+    list_filter = ['last_view']
+    search_fields = ['normalized_sql', 'last_view']
+    readonly_fields = ['fingerprint', 'first_seen', 'last_seen', 'explained_at']
+    ordering = ['-total_ms']
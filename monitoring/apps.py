@@ -0,0 +1,22 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        if getattr(settings, 'METRICS_ENABLED', False):
+            from .metrics import install_query_counter
+            connection_created.connect(install_query_counter, dispatch_uid='monitoring.query_counter')
+
+        if getattr(settings, 'PERF_INSTRUMENTATION', False):
+            from .timing import install_db_timing
+            connection_created.connect(install_db_timing, dispatch_uid='monitoring.db_timing')
+
+        if getattr(settings, 'SLOW_QUERY_CAPTURE', False):
+            from .slow_queries import install_slow_query_recorder
+            connection_created.connect(install_slow_query_recorder, dispatch_uid='monitoring.slow_queries')
@@ -0,0 +1,333 @@
+"""
+Load generator driven by the Postman collection.
+
+Requests are taken from ClickExpress_API.postman_collection.json by name and
+grouped into weighted scenarios (public reads, contact submits, admin CRUD).
+A number of asyncio virtual users each pick a scenario by weight and run its
+steps back to back against a local server; every request's latency and
+outcome is recorded per collection entry. `manage.py loadtest` runs one or
+more concurrency levels and prints throughput, latency percentiles and error
+rates for each.
+"""
+import asyncio
+import io
+import itertools
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import httpx
+
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1', '0.0.0.0'}
+
+
+@dataclass
+class CollectionRequest:
+    name: str
+    method: str
+    path: str
+    json_body: dict = None
+    form: dict = None
+    files: tuple = ()
+    auth: bool = False
+
+
+def load_collection(path):
+    """
+    Flatten a Postman collection into {request name: CollectionRequest}.
+    Paths are normalized to the trailing-slash form used by the urlconf.
+    """
+    with open(path) as handle:
+        collection = json.load(handle)
+
+    requests = {}
+
+    def walk(items):
+        for item in items:
+            if 'item' in item:
+                walk(item['item'])
+                continue
+            request = item['request']
+            url = request['url']
+            segments = [segment for segment in url.get('path', []) if segment] if isinstance(url, dict) else \
+                [segment for segment in urlsplit(url.replace('{{base_url}}', 'http://host')).path.split('/') if segment]
+            body = request.get('body') or {}
+            entry = CollectionRequest(
+                name=item['name'],
+                method=request['method'],
+                path='/' + '/'.join(segments) + '/',
+                auth=any(header['key'] == 'Authorization' for header in request.get('header', [])),
+            )
+            if body.get('mode') == 'raw' and body.get('raw', '').strip():
+                try:
+                    entry.json_body = json.loads(body['raw'])
+                except ValueError:
+                    pass
+            elif body.get('mode') == 'formdata':
+                entry.form = {field['key']: field['value'] for field in body['formdata'] if field.get('type') == 'text'}
+                entry.files = tuple(field['key'] for field in body['formdata'] if field.get('type') == 'file')
+            requests[entry.name] = entry
+
+    walk(collection['item'])
+    return requests
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+    statuses: dict = field(default_factory=dict)
+
+
+class Recorder:
+    """
+    Latency and outcome per collection request name
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self.recording = False
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.finished = time.perf_counter()
+
+    def record(self, name, seconds, status):
+        if not self.recording:
+            return
+        stats = self.endpoints.setdefault(name, EndpointStats())
+        stats.latencies.append(seconds * 1000)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            stats.errors += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started if self.started else 0.0
+        rows = {}
+        every = []
+        errors = 0
+        for name, stats in sorted(self.endpoints.items()):
+            latencies = sorted(stats.latencies)
+            every.extend(latencies)
+            errors += stats.errors
+            rows[name] = self._row(latencies, stats.errors, elapsed, stats.statuses)
+        every.sort()
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'total': self._row(every, errors, elapsed, {}),
+            'endpoints': rows,
+        }
+
+    @staticmethod
+    def _row(latencies, errors, elapsed, statuses):
+        count = len(latencies)
+        return {
+            'requests': count,
+            'rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p90_ms': round(percentile(latencies, 0.90), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+            'statuses': {str(key): value for key, value in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        }
+
+
+class VirtualUser:
+    """
+    One simulated client; scenario methods run collection requests in order
+    """
+    # Scenario name -> (method, default weight)
+    SCENARIOS = {
+        'browse': ('browse', 70),
+        'contact': ('contact', 10),
+        'admin': ('admin', 20),
+    }
+
+    # Collection entries each scenario uses, checked when the run starts
+    REQUESTS = {
+        'browse': (
+            'Get All Blog Posts (Public)', 'Get Single Blog Post (Public)',
+            'Get All Gallery Images (Public)', 'Get Single Gallery Image (Public)',
+        ),
+        'contact': ('Send Contact Message', 'Subscribe to Newsletter'),
+        'admin': (
+            'Verify Token', 'Create Blog Post (Admin)', 'Update Blog Post (Admin)', 'Delete Blog Post (Admin)',
+            'Create Gallery Image (Admin)', 'Update Gallery Image (Admin)', 'Delete Gallery Image (Admin)',
+            'Get Contact Messages (Admin)', 'Get Single Contact Message (Admin)',
+            'Update Contact Message Status (Admin)',
+        ),
+    }
+
+    def __init__(self, client, collection, recorder, shared, token, rng):
+        self.client = client
+        self.collection = collection
+        self.recorder = recorder
+        self.shared = shared
+        self.token = token
+        self.rng = rng
+
+    async def send(self, name, object_id=None, json_body=None, form=None):
+        """
+        Issue collection request `name`, substituting `object_id` for the
+        example id. Returns the decoded JSON body, or None on failure.
+        """
+        entry = self.collection[name]
+        path = entry.path
+        if object_id is not None:
+            path = path.replace('/1/', f'/{object_id}/', 1)
+        kwargs = {}
+        if entry.auth:
+            kwargs['headers'] = {'Authorization': f'Bearer {self.token}'}
+        if entry.form is not None:
+            kwargs['data'] = {**entry.form, **(form or {})}
+            kwargs['files'] = {key: ('loadtest.png', self.shared['image'], 'image/png') for key in entry.files}
+        elif entry.json_body is not None or json_body is not None:
+            kwargs['json'] = {**(entry.json_body or {}), **(json_body or {})}
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(entry.method, path, **kwargs)
+            body = response.content
+        except httpx.HTTPError as exc:
+            self.recorder.record(name, time.perf_counter() - start, type(exc).__name__)
+            return None
+        self.recorder.record(name, time.perf_counter() - start, response.status_code)
+        if response.status_code >= 400:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def remember_ids(self, key, payload):
+        if payload and isinstance(payload.get('data'), list):
+            ids = [item['id'] for item in payload['data'] if 'id' in item]
+            if ids:
+                self.shared[key] = ids
+
+    def pick_id(self, key):
+        ids = self.shared.get(key)
+        return self.rng.choice(ids) if ids else None
+
+    async def browse(self):
+        self.remember_ids('blog_ids', await self.send('Get All Blog Posts (Public)'))
+        post_id = self.pick_id('blog_ids')
+        if post_id is not None:
+            await self.send('Get Single Blog Post (Public)', post_id)
+        self.remember_ids('gallery_ids', await self.send('Get All Gallery Images (Public)'))
+        image_id = self.pick_id('gallery_ids')
+        if image_id is not None:
+            await self.send('Get Single Gallery Image (Public)', image_id)
+
+    async def contact(self):
+        marker = uuid.uuid4().hex[:12]
+        await self.send('Send Contact Message', json_body={'email': f'loadtest+{marker}@example.com'})
+        await self.send('Subscribe to Newsletter', json_body={'email': f'loadtest+{marker}@example.com'})
+
+    async def admin(self):
+        await self.send('Verify Token')
+
+        # The collection's example image paths are not uploads; the API only accepts null here
+        created = await self.send('Create Blog Post (Admin)', json_body={
+            'title': f'Load test {uuid.uuid4().hex[:8]}', 'featured_image': None,
+        })
+        if created:
+            post_id = created['data']['id']
+            await self.send('Update Blog Post (Admin)', post_id, json_body={'featured_image': None})
+            await self.send('Delete Blog Post (Admin)', post_id)
+
+        created = await self.send('Create Gallery Image (Admin)')
+        if created:
+            image_id = created['data']['id']
+            await self.send('Update Gallery Image (Admin)', image_id)
+            await self.send('Delete Gallery Image (Admin)', image_id)
+
+        self.remember_ids('message_ids', await self.send('Get Contact Messages (Admin)'))
+        message_id = self.pick_id('message_ids')
+        if message_id is not None:
+            await self.send('Get Single Contact Message (Admin)', message_id)
+            await self.send('Update Contact Message Status (Admin)', message_id)
+
+    async def run(self, scenarios, weights, deadline, budget):
+        while time.perf_counter() < deadline and next(budget, None) is not None:
+            scenario = self.rng.choices(scenarios, weights)[0]
+            await getattr(self, self.SCENARIOS[scenario][0])()
+
+
+def png_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 16), (40, 90, 160)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def check_base_url(base_url, allow_remote=False):
+    host = urlsplit(base_url).hostname
+    if host not in LOCAL_HOSTS and not allow_remote:
+        raise ValueError(f'{base_url} is not a local server; pass --allow-remote to load test it anyway')
+
+
+async def login(base_url, collection, username, password, timeout):
+    entry = collection['Admin Login']
+    credentials = entry.json_body or {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        response = await client.post(entry.path, json={
+            'username': username or credentials.get('username'),
+            'password': password or credentials.get('password'),
+        })
+    if response.status_code != 200:
+        raise ValueError(f'Login failed with HTTP {response.status_code}: {response.text[:200]}')
+    return response.json()['token']
+
+
+async def run_level(base_url, collection, mix, concurrency, duration, warmup, max_iterations, token, timeout, seed):
+    """
+    Run `concurrency` virtual users for warmup + duration seconds and return
+    the summary of the measured part
+    """
+    recorder = Recorder()
+    shared = {'image': png_bytes()}
+    scenarios = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in scenarios]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    budget = iter(range(max_iterations)) if max_iterations else itertools.count()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        users = [
+            VirtualUser(client, collection, recorder, shared, token, random.Random(seed + index))
+            for index in range(concurrency)
+        ]
+        if warmup > 0:
+            start_recording = asyncio.get_running_loop().call_later(warmup, recorder.start)
+        else:
+            start_recording = None
+            recorder.start()
+        deadline = time.perf_counter() + warmup + duration
+        await asyncio.gather(*(user.run(scenarios, weights, deadline, budget) for user in users))
+        if start_recording is not None:
+            start_recording.cancel()
+        recorder.stop()
+
+    summary = recorder.summary()
+    summary['concurrency'] = concurrency
+    summary['mix'] = mix
+    return summary
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.loadtest import VirtualUser, check_base_url, load_collection, login, run_level
+
+
+class Command(BaseCommand):
+    """
+    Drive the Postman collection's requests as weighted scenarios against a
+    local server, one run per concurrency level
+    """
+    help = 'Load test a running server with scenarios built from the Postman collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load test')
+        parser.add_argument(
+            '--collection', default=os.path.join(settings.BASE_DIR, 'ClickExpress_API.postman_collection.json'),
+            help='Postman collection the requests are taken from'
+        )
+        parser.add_argument(
+            '--concurrency', default='1,4,16',
+            help='Comma-separated virtual user counts; each level is a separate run'
+        )
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds per level')
+        parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before each level')
+        parser.add_argument(
+            '--iterations', type=int, default=0,
+            help='Stop a level after this many scenario runs (0 = run for --duration)'
+        )
+        parser.add_argument(
+            '--mix', default=','.join(f'{name}={weight}' for name, (_, weight) in VirtualUser.SCENARIOS.items()),
+            help='Scenario weights, e.g. browse=70,contact=10,admin=20'
+        )
+        parser.add_argument('--username', default='', help="Admin username (default: the collection's login body)")
+        parser.add_argument('--password', default='', help="Admin password (default: the collection's login body)")
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for scenario selection')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+        parser.add_argument(
+            '--allow-remote', action='store_true',
+            help='Allow a non-local --base-url (the collection points at production)'
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        try:
+            check_base_url(base_url, options['allow_remote'])
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+            mix = self.parse_mix(options['mix'])
+            collection = load_collection(options['collection'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        missing = sorted({
+            name for scenario, weight in mix.items() if weight > 0 for name in VirtualUser.REQUESTS[scenario]
+        } - set(collection))
+        if missing:
+            raise CommandError(f"Collection is missing requests: {', '.join(missing)}")
+
+        token = None
+        if mix.get('admin'):
+            try:
+                token = asyncio.run(login(
+                    base_url, collection, options['username'], options['password'], options['timeout']
+                ))
+            except Exception as exc:
+                raise CommandError(f'Could not log in: {exc}')
+
+        if mix.get('contact'):
+            self.stdout.write(self.style.WARNING(
+                'The contact scenario stores messages and sends email; point the server at a test mail backend.'
+            ))
+
+        results = []
+        for concurrency in levels:
+            self.stdout.write(f'\nConcurrency {concurrency}: {options["warmup"]:g}s warm-up, '
+                              f'{options["duration"]:g}s measured')
+            summary = asyncio.run(run_level(
+                base_url, collection, mix, concurrency, options['duration'], options['warmup'],
+                options['iterations'], token, options['timeout'], options['seed'],
+            ))
+            self.print_level(summary)
+            results.append(summary)
+
+        if len(results) > 1:
+            self.print_comparison(results)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump({'base_url': base_url, 'levels': results}, handle, indent=2)
+            self.stdout.write(f"\nResults written to {options['json_path']}")
+
+    def parse_mix(self, value):
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in VirtualUser.SCENARIOS:
+                raise ValueError(f"Unknown scenario '{name}'; choose from {', '.join(VirtualUser.SCENARIOS)}")
+            mix[name] = float(weight or 0)
+        if not any(weight > 0 for weight in mix.values()):
+            raise ValueError('At least one scenario needs a positive weight')
+        return mix
+
+    def print_level(self, summary):
+        self.stdout.write(
+            f"{'endpoint':<40} {'reqs':>7} {'req/s':>8} {'err %':>6} "
+            f"{'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        )
+        for name, row in list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]:
+            line = (
+                f"{name[:40]:<40} {row['requests']:7d} {row['rps']:8.1f} {row['error_rate'] * 100:6.1f} "
+                f"{row['p50_ms']:8.1f} {row['p90_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} "
+                f"{row['max_ms']:8.1f}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['error_rate'] else line)
+            failures = {status: count for status, count in row['statuses'].items() if not status.startswith(('2', '3'))}
+            if failures:
+                self.stdout.write(f"    failures: {', '.join(f'{s} x{c}' for s, c in failures.items())}")
+
+    def print_comparison(self, results):
+        """
+        Throughput and tail latency per level: throughput flattening while p95
+        climbs marks the point where workers are saturated
+        """
+        self.stdout.write(f"\n{'users':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err %':>7}")
+        for summary in results:
+            total = summary['total']
+            self.stdout.write(
+                f"{summary['concurrency']:6d} {total['rps']:9.1f} {total['p50_ms']:9.1f} "
+                f"{total['p95_ms']:9.1f} {total['p99_ms']:9.1f} {total['error_rate'] * 100:7.1f}"
+            )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.models import SlowQuery
+from monitoring.slow_queries import recorder
+
+
+class Command(BaseCommand):
+    """
+    Print the slowest query fingerprints captured by the slow query recorder
+    """
+    help = 'List the top slow query fingerprints'
+
+    ORDERINGS = {
+        'total': '-total_ms',
+        'max': '-max_ms',
+        'count': '-count',
+        'recent': '-last_seen',
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Number of fingerprints to show')
+        parser.add_argument(
+            '--order', choices=sorted(self.ORDERINGS), default='total',
+            help='Rank by total time, worst single execution, count or recency'
+        )
+        parser.add_argument('--plans', action='store_true', help='Include sampled EXPLAIN plans')
+        parser.add_argument('--stacks', action='store_true', help='Include the last captured stack summary')
+        parser.add_argument('--flush', action='store_true', help="Flush this process's buffer first")
+        parser.add_argument('--reset', action='store_true', help='Delete all captured fingerprints')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(f'Deleted {deleted} fingerprints.')
+            return
+
+        if options['flush']:
+            recorder.flush()
+
+        queries = SlowQuery.objects.order_by(self.ORDERINGS[options['order']])[:options['limit']]
+        if not queries:
+            self.stdout.write('No slow queries captured.')
+            return
+
+        self.stdout.write(f"{'total ms':>12} {'count':>8} {'mean ms':>10} {'max ms':>10}  view")
+        for query in queries:
+            self.stdout.write(
+                f'{query.total_ms:12.1f} {query.count:8d} {query.mean_ms:10.1f} {query.max_ms:10.1f}  '
+                f'{query.last_view or "-"}'
+            )
+            self.stdout.write(f'    {query.normalized_sql[:500]}')
+            if options['stacks'] and query.last_stack:
+                for line in query.last_stack.splitlines():
+                    self.stdout.write(f'      at {line}')
+            if options['plans'] and query.explain_plan:
+                self.stdout.write(f'    plan (sampled {query.explained_at:%Y-%m-%d %H:%M}):')
+                for line in query.explain_plan.splitlines():
+                    self.stdout.write(f'      {line}')
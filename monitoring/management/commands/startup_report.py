@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clickexpress_api.warmup import MASTER_PHASES, PHASES, local_app_configs
+
+# Runs in a fresh interpreter so every import is cold
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from clickexpress_api.warmup import warm_up
+timings = warm_up(sys.argv[1].split(','))
+print(json.dumps({'setup': setup, 'phases': timings}))
+"""
+
+
+def parse_importtime(output):
+    """
+    [(module, self us, cumulative us, parent module)] from `python -X
+    importtime` output, which lists each module after the ones it imported,
+    indented one level deeper
+    """
+    modules = []
+    stack = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        node = [name.strip(), int(self_us), int(cumulative_us), None]
+        while stack and stack[-1][0] > depth:
+            stack.pop()[1][3] = node[0]
+        stack.append((depth, node))
+        modules.append(node)
+    return [tuple(node) for node in modules]
+
+
+def package_of(module):
+    return module.split('.')[0] if module else None
+
+
+class Command(BaseCommand):
+    """
+    Profile a cold start: import time per package and the warm-up phases
+    """
+    help = 'Report import time per app and warm-up phase timings for a cold worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=15, help='Number of packages and modules to show')
+        parser.add_argument(
+            '--with-database', action='store_true',
+            help='Also run the connection and cache warm-up phases (needs the database and cache)'
+        )
+
+    def handle(self, *args, **options):
+        phases = PHASES if options['with_database'] else MASTER_PHASES
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT, ','.join(phases)],
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'clickexpress_api.settings')},
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+        modules = parse_importtime(result.stderr)
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+        local_apps = {config.name.split('.')[0] for config in local_app_configs()} | {'clickexpress_api'}
+        packages = defaultdict(lambda: [0, 0, 0])
+        for module, self_us, cumulative_us, parent in modules:
+            package = packages[package_of(module)]
+            package[0] += self_us
+            package[1] += 1
+            if package_of(parent) != package_of(module):
+                # Imported from outside the package: counts everything it pulled in
+                package[2] += cumulative_us
+        total_us = sum(self_us for _, self_us, _, _ in modules)
+
+        self.stdout.write(f'{len(modules)} modules imported in {total_us / 1000:.0f} ms')
+
+        self.stdout.write(f"\n{'self ms':>9} {'total ms':>9} {'modules':>8}  app")
+        for package in sorted(local_apps & set(packages), key=lambda name: packages[name][2], reverse=True):
+            self_us, count, cumulative_us = packages[package]
+            self.stdout.write(f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f} {count:8d}  {package}')
+
+        self.stdout.write(f"\n{'self ms':>9} {'total ms':>9} {'modules':>8}  heaviest packages")
+        ranked = sorted(packages.items(), key=lambda item: item[1][0], reverse=True)
+        for package, (self_us, count, cumulative_us) in ranked[:options['limit']]:
+            self.stdout.write(f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f} {count:8d}  {package}')
+
+        self.stdout.write(f"\n{'total ms':>9}  slowest modules (including their imports)")
+        for module, _, cumulative_us, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:options['limit']]:
+            self.stdout.write(f'{cumulative_us / 1000:9.1f}  {module}')
+
+        self.stdout.write(f"\n{'ms':>9}  startup")
+        self.stdout.write(f"{timings['setup'] * 1000:9.1f}  django.setup()")
+        for phase in phases:
+            seconds = timings['phases'].get(phase)
+            self.stdout.write(f"{seconds * 1000:9.1f}  warm-up: {phase}" if seconds is not None
+                              else f"{'failed':>9}  warm-up: {phase}")
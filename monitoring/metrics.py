@@ -0,0 +1,153 @@
+"""
+Prometheus metrics shared by all apps.
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(see gunicorn.conf.py) and the /metrics view aggregates the whole directory,
+so a scrape reports totals across workers rather than whichever worker
+happened to answer it.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'clickexpress_http_request_duration_seconds',
+    'HTTP request latency by URL name, method and status',
+    ['url_name', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Counter(
+    'clickexpress_db_queries_total',
+    'SQL statements executed',
+    ['alias'],
+)
+DB_QUERY_SECONDS = Counter(
+    'clickexpress_db_query_seconds_total',
+    'Time spent executing SQL statements',
+    ['alias'],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'clickexpress_db_connections_opened_total',
+    'Database connections opened',
+    ['alias'],
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    'clickexpress_db_pool_wait_seconds',
+    'Time spent waiting for a pooled database connection',
+    ['alias'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+DB_POOL_CHECKOUTS = Counter(
+    'clickexpress_db_pool_checkouts_total',
+    'Pooled connection checkouts by outcome (reused, new or timeout)',
+    ['alias', 'outcome'],
+)
+DB_POOL_IN_USE = Gauge(
+    'clickexpress_db_pool_connections_in_use',
+    'Pooled connections currently checked out',
+    ['alias'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_IDLE = Gauge(
+    'clickexpress_db_pool_connections_idle',
+    'Pooled connections open and waiting to be reused',
+    ['alias'],
+    multiprocess_mode='livesum',
+)
+CACHE_REQUESTS = Counter(
+    'clickexpress_cache_requests_total',
+    'Cache lookups by cache name and result (hit, stale or miss)',
+    ['cache', 'result'],
+)
+EMAIL_SEND_SECONDS = Histogram(
+    'clickexpress_email_send_duration_seconds',
+    'Outbound email latency by backend and outcome',
+    ['backend', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+UPLOAD_BYTES = Counter(
+    'clickexpress_upload_bytes_total',
+    'Bytes stored by the upload endpoint',
+    ['category'],
+)
+UPLOAD_SECONDS = Histogram(
+    'clickexpress_upload_duration_seconds',
+    'Time spent storing uploaded files',
+    ['category', 'outcome'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+LOGIN_HASHES_SAVED = Counter(
+    'clickexpress_login_hashes_saved_total',
+    'Login attempts refused by the lockout before any password hashing',
+)
+
+
+def record_cache(cache, hit, stale=False):
+    CACHE_REQUESTS.labels(cache, ('stale' if stale else 'hit') if hit else 'miss').inc()
+
+
+@contextmanager
+def time_email(backend):
+    """
+    Time an email send; the block sets outcome['value'] to its result
+    """
+    outcome = {'value': 'error'}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        EMAIL_SEND_SECONDS.labels(backend, outcome['value']).observe(time.perf_counter() - start)
+
+
+def query_counter(alias):
+    """
+    Build a DB execute wrapper that feeds the query counters for `alias`
+    """
+    queries = DB_QUERIES.labels(alias)
+    seconds = DB_QUERY_SECONDS.labels(alias)
+
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.inc()
+            seconds.inc(time.perf_counter() - start)
+
+    wrapper.is_query_counter = True
+    return wrapper
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """
+    connection_created receiver: count every statement on the new connection
+    """
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+    if not any(getattr(wrapper, 'is_query_counter', False) for wrapper in connection.execute_wrappers):
+        # Insert at the bottom of the stack: connection.execute_wrapper() pops
+        # the last entry when its block exits
+        connection.execute_wrappers.insert(0, query_counter(connection.alias))
+
+
+def render_latest():
+    """
+    Return (body, content type) for a scrape, aggregated across worker processes
+    when running in multiprocess mode
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
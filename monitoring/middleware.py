@@ -0,0 +1,153 @@
+import logging
+import time
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from clickexpress_api.middleware import DualModeMiddleware
+
+from .metrics import REQUEST_LATENCY
+from .slow_queries import reset_current_view, set_current_view
+from .timing import RequestTimings, bind, install_db_timing, install_serializer_timing, unbind, view_stats
+
+logger = logging.getLogger('monitoring.performance')
+
+# Any other (client-chosen) method is labelled 'other', so it can't add series
+LABELLED_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+class PerformanceMiddleware(DualModeMiddleware):
+    """
+    Per-request breakdown of SQL, serializer, render and outbound HTTP time.
+
+    Emits a Server-Timing header and one JSON log line per request and feeds
+    the per-view histograms served to staff. Enabled by PERF_INSTRUMENTATION;
+    when off the middleware removes itself from the stack at startup.
+    Work done while a StreamingHttpResponse is iterated happens after this
+    middleware returns and is not included.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        install_serializer_timing()
+        # Connections opened from now on (MonitoringConfig.ready() does the
+        # same at startup) and those this thread already has
+        connection_created.connect(install_db_timing, dispatch_uid='monitoring.db_timing')
+        for connection in connections.all(initialized_only=True):
+            install_db_timing(None, connection)
+
+    def handle(self, request):
+        timings = RequestTimings()
+        token = bind(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            unbind(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def ahandle(self, request):
+        timings = RequestTimings()
+        token = bind(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            unbind(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    @staticmethod
+    def finish(request, response, timings, total):
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        response['Server-Timing'] = timings.server_timing(total)
+        view_stats.record(view_name, total, timings)
+        logger.info(orjson.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(timings.durations['db'] * 1000, 2),
+            'db_queries': timings.counts['db'],
+            'serialize_ms': round(timings.durations['serialize'] * 1000, 2),
+            'render_ms': round(timings.durations['render'] * 1000, 2),
+            'http_ms': round(timings.durations['http'] * 1000, 2),
+            'http_calls': timings.counts['http'],
+        }).decode())
+        return response
+
+
+class MetricsMiddleware(DualModeMiddleware):
+    """
+    Feed the Prometheus request latency histogram, labelled by URL name,
+    method and status. Enabled by METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, start)
+        return response
+
+    async def ahandle(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, start)
+        return response
+
+    @staticmethod
+    def observe(request, response, start):
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        method = request.method if request.method in LABELLED_METHODS else 'other'
+        REQUEST_LATENCY.labels(url_name or 'unresolved', method, response.status_code).observe(
+            time.perf_counter() - start
+        )
+
+
+class SlowQueryMiddleware(DualModeMiddleware):
+    """
+    Tag slow queries with the view being served. Enabled by SLOW_QUERY_CAPTURE.
+    """
+    inline_process_view = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SLOW_QUERY_CAPTURE', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            self.reset(request)
+
+    async def ahandle(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self.reset(request)
+
+    @staticmethod
+    def reset(request):
+        token = getattr(request, '_slow_query_view_token', None)
+        if token is not None:
+            try:
+                reset_current_view(token)
+            except ValueError:
+                # Under ASGI process_view runs in a worker thread, whose copy
+                # of the context issued the token
+                set_current_view(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._slow_query_view_token = set_current_view(request.resolver_match.view_name)
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, unique=True)),
+                ('normalized_sql', models.TextField()),
+                ('sample_sql', models.TextField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('last_view', models.CharField(blank=True, max_length=200)),
+                ('last_stack', models.TextField(blank=True)),
+                ('explain_plan', models.TextField(blank=True)),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'db_table': 'slow_queries',
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """
+    Aggregated statistics for one normalized slow SQL statement
+    """
+    fingerprint = models.CharField(max_length=32, unique=True)
+    normalized_sql = models.TextField()
+    sample_sql = models.TextField()
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    last_view = models.CharField(max_length=200, blank=True)
+    last_stack = models.TextField(blank=True)
+    explain_plan = models.TextField(blank=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'slow_queries'
+        verbose_name = 'Slow Query'
+        verbose_name_plural = 'Slow Queries'
+        ordering = ['-total_ms']
+
+    def __str__(self):
+        return self.normalized_sql[:80]
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0
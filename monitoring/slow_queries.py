@@ -0,0 +1,264 @@
+"""
+Slow query capture.
+
+A DB execute wrapper installed on every connection records statements slower
+than SLOW_QUERY_THRESHOLD_MS, together with the view being served and a short
+stack summary of project frames, into an in-process ring buffer keyed by a
+normalized query fingerprint. A background thread periodically folds the
+buffer into the SlowQuery table (shared by all workers) and, on PostgreSQL,
+samples EXPLAIN (ANALYZE, BUFFERS) for the slowest fingerprints that have no
+recent plan. `manage.py slow_queries` prints the top offenders.
+"""
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current_view = contextvars.ContextVar('slow_query_view', default=None)
+_local = threading.local()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PROJECT_ROOT = str(settings.BASE_DIR)
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so that queries differing only in literal values or
+    IN-list length share one fingerprint. Returns (fingerprint hash, normalized sql).
+    """
+    normalized = sql.replace('%s', '?')
+    normalized = _STRING_RE.sub('?', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST_RE.sub('(...)', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
+    return hashlib.md5(normalized.encode()).hexdigest(), normalized
+
+
+def stack_summary(limit=6):
+    """
+    The innermost project frames (no site-packages, no monitoring internals)
+    """
+    frames = []
+    for frame in traceback.extract_stack()[:-3]:
+        filename = frame.filename
+        if not filename.startswith(_PROJECT_ROOT) or 'site-packages' in filename:
+            continue
+        if os.sep + 'monitoring' + os.sep in filename:
+            continue
+        frames.append(f'{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}')
+    return '\n'.join(frames[-limit:])
+
+
+def set_current_view(view_name):
+    return _current_view.set(view_name)
+
+
+def reset_current_view(token):
+    _current_view.reset(token)
+
+
+class SlowQueryRecorder:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = deque(maxlen=getattr(settings, 'SLOW_QUERY_BUFFER_SIZE', 1000))
+        self._thread = None
+        self._pid = None
+
+    @property
+    def threshold(self):
+        return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+
+    def execute_wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            if getattr(_local, 'suppressed', False):
+                return execute(sql, params, many, context)
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = time.perf_counter() - start
+                if duration >= self.threshold:
+                    self.record(alias, sql, params, many, duration)
+
+        wrapper.is_slow_query_recorder = True
+        return wrapper
+
+    def record(self, alias, sql, params, many, duration):
+        fp, normalized = fingerprint(sql)
+        self._buffer.append({
+            'fingerprint': fp,
+            'normalized': normalized,
+            'sql': sql,
+            'params': None if many else params,
+            'alias': alias,
+            'duration_ms': duration * 1000,
+            'view': _current_view.get() or '',
+            'stack': stack_summary(),
+        })
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        # The flusher thread does not survive a fork, so track it per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='slow-query-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        _local.suppressed = True
+        interval = getattr(settings, 'SLOW_QUERY_FLUSH_INTERVAL', 10)
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush slow query samples")
+            finally:
+                connections.close_all()
+
+    def drain(self):
+        samples = []
+        while self._buffer:
+            try:
+                samples.append(self._buffer.popleft())
+            except IndexError:
+                break
+        return samples
+
+    def flush(self):
+        """
+        Fold buffered samples into the SlowQuery table, then sample plans
+        """
+        from .models import SlowQuery
+
+        samples = self.drain()
+        if not samples:
+            return
+
+        aggregates = {}
+        for sample in samples:
+            aggregate = aggregates.setdefault(sample['fingerprint'], {'count': 0, 'total_ms': 0.0, 'slowest': sample})
+            aggregate['count'] += 1
+            aggregate['total_ms'] += sample['duration_ms']
+            if sample['duration_ms'] >= aggregate['slowest']['duration_ms']:
+                aggregate['slowest'] = sample
+
+        now = timezone.now()
+        for fp, aggregate in aggregates.items():
+            slowest = aggregate['slowest']
+            changes = {
+                'count': F('count') + aggregate['count'],
+                'total_ms': F('total_ms') + aggregate['total_ms'],
+                'max_ms': Greatest(F('max_ms'), slowest['duration_ms']),
+                'last_view': slowest['view'],
+                'last_stack': slowest['stack'],
+                'last_seen': now,
+            }
+            if not SlowQuery.objects.filter(fingerprint=fp).update(**changes):
+                try:
+                    SlowQuery.objects.create(
+                        fingerprint=fp,
+                        normalized_sql=slowest['normalized'],
+                        sample_sql=slowest['sql'],
+                        count=aggregate['count'],
+                        total_ms=aggregate['total_ms'],
+                        max_ms=slowest['duration_ms'],
+                        last_view=slowest['view'],
+                        last_stack=slowest['stack'],
+                        last_seen=now,
+                    )
+                except IntegrityError:
+                    SlowQuery.objects.filter(fingerprint=fp).update(**changes)
+
+        self._prune()
+        self._sample_plans(aggregates)
+
+    def _prune(self):
+        from .models import SlowQuery
+
+        keep = getattr(settings, 'SLOW_QUERY_MAX_FINGERPRINTS', 500)
+        stale = SlowQuery.objects.order_by('-last_seen').values_list('id', flat=True)[keep:]
+        stale_ids = list(stale)
+        if stale_ids:
+            SlowQuery.objects.filter(id__in=stale_ids).delete()
+
+    def _sample_plans(self, aggregates):
+        """
+        EXPLAIN (ANALYZE, BUFFERS) the slowest SELECT fingerprints of this batch
+        whose plan is missing or older than SLOW_QUERY_EXPLAIN_INTERVAL. ANALYZE
+        executes the statement, so it runs inside a rolled-back transaction with
+        a statement timeout.
+        """
+        from .models import SlowQuery
+
+        per_flush = getattr(settings, 'SLOW_QUERY_EXPLAIN_PER_FLUSH', 3)
+        refresh_before = timezone.now() - timedelta(seconds=getattr(settings, 'SLOW_QUERY_EXPLAIN_INTERVAL', 3600))
+        candidates = sorted(aggregates.values(), key=lambda item: item['slowest']['duration_ms'], reverse=True)
+
+        explained = 0
+        for aggregate in candidates:
+            if explained >= per_flush:
+                break
+            sample = aggregate['slowest']
+            connection = connections[sample['alias']]
+            if connection.vendor != 'postgresql' or sample['params'] is None:
+                continue
+            if not sample['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            if SlowQuery.objects.filter(fingerprint=sample['fingerprint'], explained_at__gte=refresh_before).exists():
+                continue
+
+            plan = self._explain(connection, sample)
+            if plan is not None:
+                SlowQuery.objects.filter(fingerprint=sample['fingerprint']).update(
+                    explain_plan=plan, explained_at=timezone.now()
+                )
+                explained += 1
+
+    def _explain(self, connection, sample):
+        timeout_ms = int(getattr(settings, 'SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000))
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SET LOCAL statement_timeout = {timeout_ms}')
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sample['sql']}", sample['params'])
+                    plan = '\n'.join(row[0] for row in cursor.fetchall())
+                transaction.set_rollback(True, using=connection.alias)
+            return plan
+        except Exception:
+            logger.warning("EXPLAIN failed for slow query %s", sample['fingerprint'], exc_info=True)
+            return None
+
+
+recorder = SlowQueryRecorder()
+
+
+def install_slow_query_recorder(sender, connection, **kwargs):
+    """
+    connection_created receiver: watch every statement on the new connection
+    """
+    if not any(getattr(wrapper, 'is_slow_query_recorder', False) for wrapper in connection.execute_wrappers):
+        # Bottom of the stack, see monitoring.metrics.install_query_counter
+        connection.execute_wrappers.insert(0, recorder.execute_wrapper(connection.alias))
@@ -0,0 +1,239 @@
+"""
+Shared harness for the endpoint regression tests in each app's tests.py.
+
+Every endpoint test seeds synthetic rows at several sizes and asserts that the
+number of SQL queries does not grow with the row count. With
+PERF_LATENCY_CHECKS=1 it also times repeated calls and compares p50/p95
+against a JSON baseline recorded on the same machine; wall-clock checks are
+opt-in so the default run is deterministic.
+
+Environment knobs:
+    PERF_SEED_SIZES        comma-separated row counts (default 1,10,50)
+    PERF_LATENCY_CHECKS    1 to compare latency with the baseline
+    PERF_LATENCY_RUNS      timed calls per endpoint (default 20)
+    PERF_BASELINE          baseline file (default <project>/perf_baseline.json)
+    PERF_UPDATE_BASELINE   1 to record this run as the baseline (the only
+                           time the file is written)
+    PERF_TOLERANCE         allowed relative regression (default 0.5 = +50%)
+    PERF_SLACK_MS          allowed absolute regression (default 5 ms)
+
+Run against SQLite with DB_ENGINE=sqlite, or against the configured
+PostgreSQL server otherwise:
+    DB_ENGINE=sqlite python manage.py test
+    DB_ENGINE=sqlite PERF_UPDATE_BASELINE=1 python manage.py test  # record
+    DB_ENGINE=sqlite PERF_LATENCY_CHECKS=1 python manage.py test   # compare
+"""
+import gc
+import io
+import json
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+ASGI_URLCONF = 'clickexpress_api.urls_asgi'
+
+SEED_SIZES = tuple(int(size) for size in os.environ.get('PERF_SEED_SIZES', '1,10,50').split(','))
+LATENCY_RUNS = int(os.environ.get('PERF_LATENCY_RUNS', 20))
+BASELINE_PATH = os.environ.get('PERF_BASELINE', os.path.join(settings.BASE_DIR, 'perf_baseline.json'))
+UPDATE_BASELINE = os.environ.get('PERF_UPDATE_BASELINE') == '1'
+LATENCY_CHECKS = os.environ.get('PERF_LATENCY_CHECKS') == '1'
+TOLERANCE = float(os.environ.get('PERF_TOLERANCE', 0.5))
+SLACK_MS = float(os.environ.get('PERF_SLACK_MS', 5))
+
+
+def consume(response):
+    """
+    Read the full body, including streaming responses, and return it
+    """
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def image_upload(name='image.png', size=(8, 8)):
+    """
+    A small valid PNG wrapped as an uploaded file
+    """
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def seed_rows(model, count, factory):
+    """
+    Top the table up to `count` rows; factory(index) builds one unsaved instance
+    """
+    existing = model.objects.count()
+    if existing < count:
+        model.objects.bulk_create([factory(index) for index in range(existing, count)])
+
+
+def seed_blog_posts(count, author, status='published'):
+    from blog_app.models import BlogPost
+
+    seed_rows(BlogPost, count, lambda i: BlogPost(
+        title=f'Post {i}',
+        excerpt='Synthetic excerpt',
+        content='Synthetic content. ' * 20,
+        featured_image=f'blog/images/seed_{i}.jpg',
+        author=author,
+        status=status,
+    ))
+
+
+def seed_gallery_images(count):
+    from gallery.models import GalleryImage
+
+    categories = [choice for choice, _ in GalleryImage.CATEGORY_CHOICES]
+    seed_rows(GalleryImage, count, lambda i: GalleryImage(
+        src=f'gallery/images/seed_{i}.jpg',
+        alt=f'Image {i}',
+        caption='Synthetic caption',
+        category=categories[i % len(categories)],
+        display_order=i,
+    ))
+
+
+def seed_contact_messages(count):
+    from contact.models import ContactMessage
+
+    seed_rows(ContactMessage, count, lambda i: ContactMessage(
+        name=f'Sender {i}',
+        email=f'sender{i}@example.com',
+        subject=f'Subject {i}',
+        message='Synthetic message body',
+    ))
+
+
+def seed_newsletter_subscribers(count):
+    from contact.models import NewsletterSubscriber
+
+    seed_rows(NewsletterSubscriber, count, lambda i: NewsletterSubscriber(email=f'subscriber{i}@example.com'))
+
+
+def _load_baseline():
+    try:
+        with open(BASELINE_PATH) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_baseline(name, measurement):
+    baseline = _load_baseline()
+    baseline[name] = measurement
+    with open(BASELINE_PATH, 'w') as handle:
+        json.dump(baseline, handle, indent=2, sort_keys=True)
+
+
+# The revocation list would otherwise resync mid-measurement and add a query;
+# response caching would hide the queries being counted
+@override_settings(AUTH_REVOCATION_SYNC_INTERVAL=3600, RESPONSE_CACHE_ENABLED=False)
+class EndpointTestCase(TestCase):
+    """
+    Base class for endpoint regression tests. Subclasses list the URL names
+    they exercise in `covers` so the suite can check every route is tested.
+    """
+    covers = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('admin', 'admin@example.com', 'admin-password', is_staff=True)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def auth(self, user=None):
+        token = AccessToken.for_user(user or self.staff)
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def assertQueryCountConstant(self, request, seed, sizes=SEED_SIZES):
+        """
+        Call request() after seeding each size in turn; the number of queries
+        must be the same for every size. Returns the query count.
+        """
+        consume(request())  # Warm per-process caches (user cache, revocation list)
+        counts = {}
+        for size in sizes:
+            seed(size)
+            with CaptureQueriesContext(connections['default']) as queries:
+                response = request()
+                consume(response)
+            self.assertLess(response.status_code, 400, f'{response.status_code} at {size} rows')
+            counts[size] = len(queries)
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f'Query count depends on row count: {counts}'
+        )
+        return counts[sizes[-1]]
+
+    def assertLatencyWithinBaseline(self, name, request, runs=LATENCY_RUNS):
+        """
+        Time `runs` calls of request() and compare p50/p95 with the baseline
+        (PERF_LATENCY_CHECKS=1), or record them (PERF_UPDATE_BASELINE=1).
+        Does nothing otherwise; skips the test when there is no baseline to
+        compare with.
+        """
+        if not (LATENCY_CHECKS or UPDATE_BASELINE):
+            return None
+        consume(request())
+        timings = []
+        # Like timeit: a full collection landing in one run would dominate p95
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                consume(request())
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        timings.sort()
+        measurement = {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            'runs': runs,
+            'vendor': connections['default'].vendor,
+        }
+
+        if UPDATE_BASELINE:
+            _save_baseline(name, measurement)
+            return measurement
+        baseline = _load_baseline().get(name)
+        if baseline is None or baseline.get('vendor') != measurement['vendor']:
+            self.skipTest(
+                f"No {measurement['vendor']} latency baseline for {name}; record one with PERF_UPDATE_BASELINE=1"
+            )
+
+        for key in ('p50_ms', 'p95_ms'):
+            allowed = baseline[key] * (1 + TOLERANCE) + SLACK_MS
+            self.assertLessEqual(
+                measurement[key], allowed,
+                f'{name} {key} regressed: {measurement[key]:.2f} ms vs baseline {baseline[key]:.2f} ms'
+            )
+        return measurement
+
+    async def assertAsyncGetMatches(self, url):
+        """
+        GET `url` from the sync view and from its async twin (ASGI URLconf);
+        status and body must be identical. Returns the async response.
+        """
+        expected = await sync_to_async(self.client.get)(url)
+        with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+            response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, await sync_to_async(consume)(expected))
+        return response
@@ -0,0 +1,143 @@
+import os
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from .loadtest import VirtualUser, load_collection
+from .metrics import REQUEST_LATENCY
+from .middleware import MetricsMiddleware
+from .management.commands.startup_report import parse_importtime
+from .testing import ASGI_URLCONF, EndpointTestCase, seed_blog_posts
+from .timing import install_db_timing, view_stats
+
+
+def named_routes(patterns=None):
+    """
+    URL names in the project urlconf, skipping namespaced (admin) routes
+    """
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace is None:
+                names |= named_routes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class MonitoringEndpointTests(EndpointTestCase):
+    covers = ('get_performance_stats', 'metrics')
+
+    def test_root(self):
+        self.assertQueryCountConstant(lambda: self.client.get('/'), lambda size: None)
+        self.assertLatencyWithinBaseline('root', lambda: self.client.get('/'))
+
+    def test_admin_login_page(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN='scrape-token')
+    def test_metrics(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'clickexpress_db_queries_total', response.content)
+
+    @override_settings(PERF_INSTRUMENTATION=True)
+    def test_get_performance_stats(self):
+        headers = self.auth()
+        view_stats.reset()
+        self.assertQueryCountConstant(
+            lambda: self.client.get(reverse('get_performance_stats'), **headers), lambda size: None
+        )
+        self.assertEqual(self.client.delete(reverse('get_performance_stats'), **headers).status_code, 200)
+
+    @override_settings(PERF_INSTRUMENTATION=True, RESPONSE_CACHE_ENABLED=False)
+    def test_server_timing_counts_queries(self):
+        seed_blog_posts(2, self.staff)
+        response = self.client.get(reverse('get_all_blog_posts'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[0-9.]+;desc="[1-9][0-9]* queries"')
+
+    @override_settings(PERF_INSTRUMENTATION=True, RESPONSE_CACHE_ENABLED=False, ROOT_URLCONF=ASGI_URLCONF)
+    async def test_server_timing_counts_queries_asgi(self):
+        # The async ORM queries from another thread than the middleware's.
+        # Its test database connection predates the connection_created
+        # receiver, so install the wrapper as the receiver would have
+        await sync_to_async(lambda: [install_db_timing(None, connection) for connection in connections.all()])()
+        await sync_to_async(seed_blog_posts)(2, self.staff)
+        response = await self.async_client.get(reverse('get_all_blog_posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[0-9.]+;desc="[1-9][0-9]* queries"')
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_metrics_collapse_unknown_methods(self):
+        middleware = MetricsMiddleware(lambda request: HttpResponse(status=405))
+        middleware(RequestFactory().generic('BREW', '/'))
+        methods = {
+            sample.labels['method'] for metric in REQUEST_LATENCY.collect() for sample in metric.samples
+            if sample.labels.get('url_name') == 'unresolved'
+        }
+        self.assertIn('other', methods)
+        self.assertNotIn('BREW', methods)
+
+    def test_get_performance_stats_requires_staff(self):
+        self.staff.is_staff = False
+        self.staff.save()
+        response = self.client.get(reverse('get_performance_stats'), **self.auth())
+        self.assertEqual(response.status_code, 403)
+
+
+class RouteCoverageTests(EndpointTestCase):
+
+    def test_every_route_has_endpoint_tests(self):
+        covered = set()
+        # The project package isn't an app but has endpoints (and tests) too
+        packages = [config.name for config in apps.get_app_configs()] + ['clickexpress_api']
+        for package in packages:
+            try:
+                module = import_module(f'{package}.tests')
+            except ImportError:
+                continue
+            for value in vars(module).values():
+                if isinstance(value, type) and issubclass(value, EndpointTestCase):
+                    covered.update(value.covers)
+        missing = named_routes() - covered
+        self.assertFalse(missing, f'Routes without endpoint tests: {sorted(missing)}')
+
+
+class LoadTestCollectionTests(SimpleTestCase):
+
+    def test_scenarios_use_collection_requests(self):
+        collection = load_collection(os.path.join(settings.BASE_DIR, 'ClickExpress_API.postman_collection.json'))
+        for scenario, names in VirtualUser.REQUESTS.items():
+            self.assertFalse(set(names) - set(collection), f'{scenario} uses requests missing from the collection')
+        self.assertEqual(collection['Admin Login'].path, '/api/v1/auth/login/')
+        self.assertEqual(collection['Create Gallery Image (Admin)'].files, ('src',))
+
+
+class StartupReportTests(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |     requests.compat\n'
+            'import time:       200 |        300 |   requests\n'
+            'import time:        50 |        350 | contact.email_service\n'
+            'import time:        10 |         10 | contact\n'
+        )
+        self.assertEqual(parse_importtime(output), [
+            ('requests.compat', 100, 100, 'requests'),
+            ('requests', 200, 300, 'contact.email_service'),
+            ('contact.email_service', 50, 350, None),
+            ('contact', 10, 10, None),
+        ])
@@ -0,0 +1,188 @@
+"""
+Per-request timing collection.
+
+The performance middleware binds a RequestTimings to the current context;
+instrumented code (DB execute wrapper, serializers, renderer, outbound HTTP)
+adds its durations through measure(). Outside an instrumented request every
+hook is a single ContextVar lookup.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+# Upper bounds (milliseconds) of the per-view latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+COMPONENTS = ('db', 'serialize', 'render', 'http')
+
+
+class RequestTimings:
+    """
+    Accumulated durations (seconds) and counts for one request
+    """
+    __slots__ = ('durations', 'counts')
+
+    def __init__(self):
+        self.durations = dict.fromkeys(COMPONENTS, 0.0)
+        self.counts = dict.fromkeys(COMPONENTS, 0)
+
+    def add(self, component, seconds):
+        self.durations[component] += seconds
+        self.counts[component] += 1
+
+    def server_timing(self, total):
+        parts = [
+            f'db;dur={self.durations["db"] * 1000:.1f};desc="{self.counts["db"]} queries"',
+            f'serialize;dur={self.durations["serialize"] * 1000:.1f}',
+            f'render;dur={self.durations["render"] * 1000:.1f}',
+            f'http;dur={self.durations["http"] * 1000:.1f};desc="{self.counts["http"]} calls"',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        return ', '.join(parts)
+
+
+def bind(timings):
+    return _current.set(timings)
+
+
+def unbind(token):
+    _current.reset(token)
+
+
+def current_timings():
+    return _current.get()
+
+
+def db_timing_wrapper(execute, sql, params, many, context):
+    """
+    Execute wrapper adding each statement to the current request's timings.
+    Installed on every connection rather than per request: the async ORM runs
+    queries in an executor thread whose connections the middleware never
+    sees, but sync_to_async carries the ContextVar there.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - start)
+
+
+db_timing_wrapper.is_request_timer = True
+
+
+def install_db_timing(sender, connection, **kwargs):
+    """
+    connection_created receiver: time every statement on the new connection
+    """
+    if not any(getattr(wrapper, 'is_request_timer', False) for wrapper in connection.execute_wrappers):
+        # Bottom of the stack, see monitoring.metrics.install_query_counter
+        connection.execute_wrappers.insert(0, db_timing_wrapper)
+
+
+@contextmanager
+def measure(component):
+    """
+    Add the duration of the block to the current request's `component` total
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(component, time.perf_counter() - start)
+
+
+class ViewStats:
+    """
+    In-process latency histograms and component totals per view name
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, total, timings):
+        total_ms = total * 1000
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'buckets': [0] * len(HISTOGRAM_BUCKETS_MS),
+                    'components_ms': dict.fromkeys(COMPONENTS, 0.0),
+                    'queries': 0,
+                }
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if total_ms <= bound:
+                    stats['buckets'][index] += 1
+                    break
+            for component in COMPONENTS:
+                stats['components_ms'][component] += timings.durations[component] * 1000
+            stats['queries'] += timings.counts['db']
+
+    def snapshot(self):
+        with self._lock:
+            views = {}
+            for view_name, stats in self._views.items():
+                count = stats['count']
+                views[view_name or '<unresolved>'] = {
+                    'count': count,
+                    'mean_ms': round(stats['total_ms'] / count, 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'mean_queries': round(stats['queries'] / count, 2),
+                    'mean_components_ms': {
+                        component: round(value / count, 2)
+                        for component, value in stats['components_ms'].items()
+                    },
+                    'histogram': [
+                        {'le': 'inf' if bound == float('inf') else bound, 'count': bucket}
+                        for bound, bucket in zip(HISTOGRAM_BUCKETS_MS, stats['buckets'])
+                    ],
+                }
+            return views
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+view_stats = ViewStats()
+
+
+def install_serializer_timing():
+    """
+    Time DRF serializer `.data` access. Only installed when instrumentation is
+    enabled, so disabled deployments run the stock property.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    data_property = BaseSerializer.data
+    if getattr(data_property.fget, 'timed', False):
+        return
+
+    def timed_data(self):
+        timings = _current.get()
+        if timings is None:
+            return data_property.fget(self)
+        start = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            timings.add('serialize', time.perf_counter() - start)
+
+    timed_data.timed = True
+    BaseSerializer.data = property(timed_data)
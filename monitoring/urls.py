@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('performance/', views.get_performance_stats, name='get_performance_stats'),
+]
@@ -0,0 +1,61 @@
+import hmac
+
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from .metrics import render_latest
+from .timing import view_stats
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def get_performance_stats(request):
+    """
+    Per-view latency histograms for this worker process (staff only)
+    GET /monitoring/performance/
+    DELETE /monitoring/performance/ resets the counters
+    """
+    if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'NOT_ENABLED',
+                'message': 'Performance instrumentation is disabled'
+            }
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'DELETE':
+        view_stats.reset()
+        return Response({
+            'success': True,
+            'message': 'Performance statistics reset'
+        })
+
+    return Response({
+        'success': True,
+        'data': view_stats.snapshot()
+    })
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint, aggregated across worker processes
+    GET /metrics
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; disabled (404) while no
+    token is configured.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not getattr(settings, 'METRICS_ENABLED', False) or not token:
+        raise Http404
+
+    supplied = request.META.get('HTTP_AUTHORIZATION', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        response = HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+        return response
+
+    body, content_type = render_latest()
+    return HttpResponse(body, content_type=content_type)
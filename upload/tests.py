@@ -1,3 +1,165 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+
+from blog_app.models import BlogPost
+from clickexpress_api.media import FileRange
+from gallery.models import GalleryImage
+from monitoring.testing import EndpointTestCase, image_upload, seed_gallery_images
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='upload-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UploadEndpointTests(EndpointTestCase):
+    covers = ('upload_image',)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, **extra):
+        return self.client.post(
+            reverse('upload_image'), {'image': image_upload(), 'category': 'gallery', **extra}, **self.auth()
+        )
+
+    def test_upload_image(self):
+        self.assertQueryCountConstant(self.upload, seed_gallery_images)
+        data = self.upload().json()['data']
+        self.assertTrue(data['url'].startswith('/media/gallery/images/'))
+        self.assertLatencyWithinBaseline('upload_image', self.upload)
+
+    def test_upload_image_rejects_other_types(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        response = self.client.post(
+            reverse('upload_image'),
+            {'image': SimpleUploadedFile('notes.txt', b'text', content_type='text/plain')},
+            **self.auth()
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_image_requires_auth(self):
+        response = self.client.post(reverse('upload_image'), {'image': image_upload()})
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_ACCEL_REDIRECT='')
+class MediaDeliveryTests(EndpointTestCase):
+    covers = ('serve_media',)
+    body = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        for name in ('blog/images/published.png', 'blog/images/draft.png', 'gallery/images/shot.png',
+                     'uploads/images/loose.png'):
+            os.makedirs(os.path.join(MEDIA_ROOT, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(MEDIA_ROOT, name), 'wb') as file:
+                file.write(self.body)
+        BlogPost.objects.create(
+            title='Published', content='Body', author=self.staff, status='published',
+            featured_image='blog/images/published.png'
+        )
+        self.draft = BlogPost.objects.create(
+            title='Draft', content='Body', author=self.staff, status='draft', featured_image='blog/images/draft.png'
+        )
+        GalleryImage.objects.create(src='gallery/images/shot.png', alt='Shot')
+
+    def get(self, name, **extra):
+        return self.client.get(reverse('serve_media', args=[name]), **extra)
+
+    def test_public_files(self):
+        for name in ('blog/images/published.png', 'gallery/images/shot.png'):
+            response = self.get(name)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), self.body)
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertEqual(response['Content-Length'], str(len(self.body)))
+            self.assertEqual(response['Accept-Ranges'], 'bytes')
+            self.assertTrue(response['ETag'].startswith('"'))
+            self.assertIn('public', response['Cache-Control'])
+
+    def test_unpublished_files_need_auth(self):
+        for name in ('blog/images/draft.png', 'uploads/images/loose.png'):
+            self.assertEqual(self.get(name).status_code, 404)
+            response = self.get(name, **self.auth())
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.get('blog/images/draft.png', HTTP_AUTHORIZATION='Bearer invalid').status_code, 404)
+
+    def test_publishing_makes_the_image_public(self):
+        self.assertEqual(self.get('blog/images/draft.png').status_code, 404)
+        self.draft.status = 'published'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.save()
+        self.assertEqual(self.get('blog/images/draft.png').status_code, 200)
+
+    def test_missing_and_outside_media_root(self):
+        self.assertEqual(self.get('gallery/images/missing.png', **self.auth()).status_code, 404)
+        self.assertEqual(self.get('../settings.py', **self.auth()).status_code, 404)
+
+    def test_missing_files_are_not_looked_up(self):
+        with mock.patch('upload.views.get_or_compute') as get_or_compute, self.assertNumQueries(0):
+            for name in ('blog/images/missing.png', 'gallery/images/missing.png', '../settings.py'):
+                self.assertEqual(self.get(name).status_code, 404)
+        get_or_compute.assert_not_called()
+
+    def test_only_get_and_head(self):
+        response = self.client.post(reverse('serve_media', args=['gallery/images/shot.png']))
+        self.assertEqual(response.status_code, 405)
+        response = self.client.head(reverse('serve_media', args=['gallery/images/shot.png']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified(self):
+        etag = self.get('gallery/images/shot.png')['ETag']
+        response = self.get('gallery/images/shot.png', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.get('gallery/images/shot.png', HTTP_IF_MATCH='"other"').status_code, 412)
+
+    def test_ranges(self):
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.body[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.body)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-5:])
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=1000-')
+        self.assertEqual(b''.join(response.streaming_content), self.body[1000:])
+
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.body)}')
+
+        # Several ranges, or a stale If-Range, get the whole file
+        self.assertEqual(self.get('gallery/images/shot.png', HTTP_RANGE='bytes=0-1,5-6').status_code, 200)
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.get('gallery/images/shot.png', HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_range_keeps_the_file_descriptor_for_sendfile(self):
+        with open(os.path.join(MEDIA_ROOT, 'gallery/images/shot.png'), 'rb') as file:
+            file_range = FileRange(file, 100, 50)
+            # What gunicorn's sendfile() reads the offset from
+            self.assertEqual(os.lseek(file_range.fileno(), 0, os.SEEK_CUR), 100)
+            self.assertEqual(file_range.read(), self.body[100:150])
+            self.assertEqual(file_range.read(), b'')
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/_protected_media/')
+    def test_accel_redirect(self):
+        response = self.get('gallery/images/shot.png', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/_protected_media/gallery/images/shot.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response.content, b'')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(self.get('blog/images/draft.png').status_code, 404)
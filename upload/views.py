@@ -1,10 +1,20 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.http import Http404
+from django.views.decorators.http import require_safe
+import time
 import uuid
 import os
+from auth_app.authentication import CachedJWTAuthentication
+from blog_app.models import BlogPost
+from clickexpress_api.cache import get_or_compute
+from clickexpress_api.media import media_path, serve_file
+from gallery.models import GalleryImage
+from monitoring.metrics import UPLOAD_BYTES, UPLOAD_SECONDS
 
 
 @api_view(['POST'])
@@ -50,9 +60,13 @@ def upload_image(request):
         upload_path = f'uploads/images/{unique_filename}'
     
     # Save file
+    metrics_category = category if category in ('blog', 'gallery') else 'other'
+    started = time.perf_counter()
     try:
         saved_path = default_storage.save(upload_path, ContentFile(image_file.read()))
         file_url = f'/media/{saved_path}'
+        UPLOAD_SECONDS.labels(metrics_category, 'stored').observe(time.perf_counter() - started)
+        UPLOAD_BYTES.labels(metrics_category).inc(image_file.size)
         
         return Response({
             'success': True,
@@ -65,10 +79,60 @@ def upload_image(request):
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
+        UPLOAD_SECONDS.labels(metrics_category, 'error').observe(time.perf_counter() - started)
         return Response({
             'success': False,
             'error': {
                 'code': 'UPLOAD_ERROR',
                 'message': f'Failed to upload image: {str(e)}'
             }
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def is_public_media(name):
+    """
+    Whether a media file may be served to anyone: images of published blog
+    posts and of the gallery. Drafts' images and files not attached to
+    anything yet are only served to authenticated users.
+
+    The answer is cached in the blog or gallery namespace, so it is dropped
+    with the rest of that namespace when a post or image changes.
+    """
+    if name.startswith('blog/'):
+        namespace = 'blog'
+        compute = lambda: BlogPost.objects.filter(featured_image=name, status='published').exists()
+    elif name.startswith('gallery/'):
+        namespace = 'gallery'
+        compute = lambda: GalleryImage.objects.filter(src=name).exists()
+    else:
+        return False
+    public, _ = get_or_compute(namespace, ('media', name), compute)
+    return public
+
+
+def is_authenticated(request):
+    """
+    Whether the request carries a valid access token. Media is fetched by
+    plain Django views (no DRF content negotiation: clients ask for image/*),
+    so the JWT authentication runs here directly.
+    """
+    try:
+        return CachedJWTAuthentication().authenticate(request) is not None
+    except AuthenticationFailed:
+        return False
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a media file, checking access to unpublished ones
+    GET /media/:path
+    """
+    # Missing names are answered before the lookup, which would otherwise
+    # cost a query and a cache entry per probed name
+    media_path(path)
+    public = is_public_media(path)
+    if not public and not is_authenticated(request):
+        # Same answer as a missing file, so unpublished names don't leak
+        raise Http404
+    return serve_file(request, path, cache_control='public, max-age=86400' if public else 'private, no-cache')